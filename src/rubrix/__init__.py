@@ -20,7 +20,7 @@ This module contains the interface to access Rubrix's REST API.
 import os
 import re
 from logging import getLogger
-from typing import Any, Dict, Iterable, List, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 
 import pandas
 import pkg_resources
@@ -159,16 +159,24 @@ def log(
     metadata: Optional[Dict[str, Any]] = None,
     chunk_size: int = 500,
     verbose: bool = True,
+    num_threads: int = 0,
+    total: Optional[int] = None,
+    ingest_mode: str = "default",
 ) -> BulkResponse:
     """Log Records to Rubrix.
 
     Args:
-        records: The record or an iterable of records.
+        records: The record or an iterable of records. Iterables are consumed lazily, chunk by chunk.
         name: The dataset name.
         tags: A dictionary of tags related to the dataset.
         metadata: A dictionary of extra info for the dataset.
         chunk_size: The chunk size for a data bulk.
         verbose: If True, shows a progress bar and prints out a quick summary at the end.
+        num_threads: If > 0, keeps up to `num_threads` bulk requests in flight concurrently.
+            Default: 0, chunks are sent sequentially.
+        total: The expected number of records, used as progress bar hint when `records` has no length.
+        ingest_mode: One of "default" or "bulk". Use "bulk" for backfills of a lot of records: the dataset
+            records index is not refreshed while loading, and records become searchable at the end.
 
     Returns:
         Summary of the response from the REST API
@@ -189,6 +197,9 @@ def log(
         metadata=metadata,
         chunk_size=chunk_size,
         verbose=verbose,
+        num_threads=num_threads,
+        total=total,
+        ingest_mode=ingest_mode,
     )
 
 
@@ -216,7 +227,8 @@ def load(
     ids: Optional[List[Union[str, int]]] = None,
     limit: Optional[int] = None,
     as_pandas: bool = True,
-) -> Union[pandas.DataFrame, Dataset]:
+    format: str = "json",
+) -> Union[pandas.DataFrame, Dataset, "datasets.Dataset"]:
     """Loads a dataset as a pandas DataFrame or a Dataset.
 
     Args:
@@ -226,6 +238,9 @@ def load(
         ids: If provided, load dataset records with given ids.
         limit: The number of records to retrieve.
         as_pandas: If True, return a pandas DataFrame. If False, return a Dataset.
+        format: The transfer format, "json" (default) or "arrow". The "arrow" format skips the creation of
+            record objects, and returns a pandas DataFrame or a `datasets.Dataset` (if `as_pandas=False`).
+            Only available for text classification datasets.
 
     Returns:
         The dataset as a pandas Dataframe or a Dataset.
@@ -235,7 +250,44 @@ def load(
         >>> dataframe = rb.load(name="example-dataset")
     """
     return _client_instance().load(
-        name=name, query=query, limit=limit, ids=ids, as_pandas=as_pandas
+        name=name,
+        query=query,
+        limit=limit,
+        ids=ids,
+        as_pandas=as_pandas,
+        format=format,
+    )
+
+
+def iter_records(
+    name: str,
+    query: Optional[str] = None,
+    ids: Optional[List[Union[str, int]]] = None,
+    limit: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Iterator[Union[Record, List[Record]]]:
+    """Iterates over the records of a dataset, without loading the whole dataset in memory.
+
+    Records are yielded as they arrive from the server, and are not sorted by id.
+
+    Args:
+        name: The dataset name.
+        query: An ElasticSearch query with the
+            `query string syntax <https://rubrix.readthedocs.io/en/stable/reference/webapp/search_records.html>`_
+        ids: If provided, iterate over the dataset records with given ids.
+        limit: The number of records to retrieve.
+        batch_size: If provided, records are yielded in lists of up to `batch_size` records.
+
+    Returns:
+        An iterator over the records, or over batches of records if `batch_size` is provided.
+
+    Examples:
+        >>> import rubrix as rb
+        >>> for record in rb.iter_records(name="example-dataset"):
+        ...     print(record.inputs)
+    """
+    return _client_instance().iter_records(
+        name=name, query=query, ids=ids, limit=limit, batch_size=batch_size
     )
 
 
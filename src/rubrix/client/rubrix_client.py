@@ -15,9 +15,24 @@
 
 """The Rubrix client, used by the rubrix.__init__ module"""
 
+import functools
+import itertools
 import logging
 import socket
-from typing import Any, Dict, Iterable, List, Optional, Union
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 import httpx
 import pandas
@@ -41,32 +56,49 @@ from rubrix.client.models import (
 from rubrix.client.sdk.client import AuthenticatedClient
 from rubrix.client.sdk.commons.errors import RubrixClientError
 from rubrix.client.sdk.commons.models import Response
-from rubrix.client.sdk.datasets.api import copy_dataset, delete_dataset, get_dataset
-from rubrix.client.sdk.datasets.models import CopyDatasetRequest, TaskType
+from rubrix.client.sdk.datasets.api import (
+    copy_dataset,
+    delete_dataset,
+    end_bulk_load,
+    get_dataset,
+    start_bulk_load,
+)
+from rubrix.client.sdk.datasets.models import CopyDatasetRequest
+from rubrix.client.sdk.datasets.models import Dataset as DatasetInfo
+from rubrix.client.sdk.datasets.models import TaskType
 from rubrix.client.sdk.metrics.api import compute_metric, get_dataset_metrics
 from rubrix.client.sdk.metrics.models import MetricInfo
 from rubrix.client.sdk.text2text.api import bulk as text2text_bulk
-from rubrix.client.sdk.text2text.api import data as text2text_data
+from rubrix.client.sdk.text2text.api import data_stream as text2text_data_stream
 from rubrix.client.sdk.text2text.models import (
     CreationText2TextRecord,
     Text2TextBulkData,
     Text2TextQuery,
 )
 from rubrix.client.sdk.text_classification.api import bulk as text_classification_bulk
-from rubrix.client.sdk.text_classification.api import data as text_classification_data
+from rubrix.client.sdk.text_classification.api import (
+    data_arrow as text_classification_data_arrow,
+)
+from rubrix.client.sdk.text_classification.api import (
+    data_stream as text_classification_data_stream,
+)
 from rubrix.client.sdk.text_classification.api import (
     dataset_rule_metrics,
     fetch_dataset_labeling_rules,
+    rules_matching_ids,
 )
 from rubrix.client.sdk.text_classification.models import (
     CreationTextClassificationRecord,
     LabelingRule,
     LabelingRuleMetricsSummary,
+    LabelingRulesMatchingIds,
     TextClassificationBulkData,
     TextClassificationQuery,
 )
 from rubrix.client.sdk.token_classification.api import bulk as token_classification_bulk
-from rubrix.client.sdk.token_classification.api import data as token_classification_data
+from rubrix.client.sdk.token_classification.api import (
+    data_stream as token_classification_data_stream,
+)
 from rubrix.client.sdk.token_classification.models import (
     CreationTokenClassificationRecord,
     TokenClassificationBulkData,
@@ -164,9 +196,15 @@ class RubrixClient:
         metadata: Optional[Dict[str, Any]] = None,
         chunk_size: int = 500,
         verbose: bool = True,
+        num_threads: int = 0,
+        total: Optional[int] = None,
+        ingest_mode: str = "default",
     ) -> BulkResponse:
         """Log records to Rubrix.
 
+        Records are consumed lazily in `chunk_size` windows, so iterables such as generators are never
+        fully loaded in memory.
+
         Args:
             records: The records to be logged.
             name: The dataset name.
@@ -174,6 +212,14 @@ class RubrixClient:
             metadata: A set of extra info for the dataset.
             chunk_size: Records are logged in chunks to the Rubrix server, this defines their sizes.
             verbose: If True, shows a progress bar and prints out a quick summary at the end.
+            num_threads: If > 0, chunks are sent concurrently, keeping up to `num_threads` bulk requests
+                in flight over a shared pool of http connections. Default: 0, chunks are sent one by one.
+            total: The expected number of records, shown in the progress bar. If not provided, it's computed
+                from `records` when possible (for example, for lists or datasets).
+            ingest_mode: One of "default" or "bulk". With "bulk", the dataset is switched to the bulk load mode
+                after the first chunk: the records index is not refreshed while loading, and the chunks do not
+                wait for the records to be searchable. All records are made available for search at the end.
+                Recommended for backfills of a lot of records.
 
         Returns:
             A summary response from the API.
@@ -182,20 +228,30 @@ class RubrixClient:
         if not name:
             raise InputValueError("Empty project name has been passed as argument.")
 
+        if ingest_mode not in ["default", "bulk"]:
+            raise InputValueError(
+                f"Ingest mode '{ingest_mode}' not supported. Choose one of: 'default', 'bulk'"
+            )
+
         if isinstance(records, Record.__args__):
             records = [records]
 
-        records = list(records)
+        if total is None and hasattr(records, "__len__"):
+            total = len(records)
+
+        records = iter(records)
         tags = tags or {}
         metadata = metadata or {}
 
         try:
-            record_type = type(records[0])
-        except IndexError:
+            first_record = next(records)
+        except StopIteration:
             raise InputValueError("Empty record list has been passed as argument.")
+        # The record type is resolved from the first record of the stream
+        record_type = type(first_record)
+        records = itertools.chain([first_record], records)
 
-        # Check chunk_size <= length of training dataset not needed, as the Python slice system will adjust
-        # a bigger-than-possible length to the whole list, having all input in the same chunk.
+        # Check chunk_size <= length of training dataset not needed, as the last chunk will just be smaller.
         # However, a desired check can be placed to create a custom chunk_size when that limit is exceeded
         if chunk_size > self.MAX_CHUNK_SIZE:
             self._LOGGER.warning(
@@ -223,24 +279,28 @@ class RubrixClient:
         # Record type is not recognised
         else:
             raise InputValueError(
-                f"Unknown record type passed as argument for [{','.join(map(str, records[0:5]))}...] "
+                f"Unknown record type passed as argument for [{first_record}...] "
                 f"Available values are {Record.__args__}"
             )
 
         processed = 0
         failed = 0
-        progress_bar = tqdm(total=len(records), disable=not verbose)
-        for i in range(0, len(records), chunk_size):
-            chunk = records[i : i + chunk_size]
+        progress_bar = tqdm(total=total, disable=not verbose)
+
+        def bulk_data(chunk: List[Record]):
+            return bulk_class(
+                tags=tags,
+                metadata=metadata,
+                records=[to_sdk_model(r) for r in chunk],
+            )
+
+        def send_chunk(chunk: List[Record]):
+            nonlocal processed, failed
 
             response = bulk_records_function(
                 client=self._client,
                 name=name,
-                json_body=bulk_class(
-                    tags=tags,
-                    metadata=metadata,
-                    records=[to_sdk_model(r) for r in chunk],
-                ),
+                json_body=bulk_data(chunk),
             )
 
             _check_response_errors(response)
@@ -248,7 +308,41 @@ class RubrixClient:
             failed += response.parsed.failed
 
             progress_bar.update(len(chunk))
-        progress_bar.close()
+
+        chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+        bulk_load = ingest_mode == "bulk"
+        try:
+            if bulk_load:
+                # the first chunk creates the dataset, if needed, before switching it to the bulk load mode
+                send_chunk(next(chunks))
+                response = start_bulk_load(client=self._client, name=name)
+                _check_response_errors(response)
+                bulk_records_function = functools.partial(
+                    bulk_records_function, ingest_mode="bulk"
+                )
+            try:
+                if num_threads > 0:
+                    pipelined_processed, pipelined_failed = self._pipelined_bulk(
+                        name=name,
+                        bulk_data=map(bulk_data, chunks),
+                        bulk_records_function=bulk_records_function,
+                        num_threads=num_threads,
+                        progress_bar=progress_bar,
+                    )
+                    processed += pipelined_processed
+                    failed += pipelined_failed
+                else:
+                    for chunk in chunks:
+                        send_chunk(chunk)
+            except BaseException:
+                if bulk_load:
+                    self._end_bulk_load_after_error(name)
+                raise
+            if bulk_load:
+                response = end_bulk_load(client=self._client, name=name)
+                _check_response_errors(response)
+        finally:
+            progress_bar.close()
 
         # TODO: improve logging policy in library
         if verbose:
@@ -259,6 +353,73 @@ class RubrixClient:
         # Creating a composite BulkResponse with the total processed and failed
         return BulkResponse(dataset=name, processed=processed, failed=failed)
 
+    def _end_bulk_load_after_error(self, name: str):
+        """Ends the bulk load of a dataset once logging failed, without hiding the logging error.
+
+        Args:
+            name: The dataset name.
+        """
+        try:
+            _check_response_errors(end_bulk_load(client=self._client, name=name))
+        except Exception as error:
+            self._LOGGER.error(
+                "Cannot end the bulk load of dataset %s after a logging error: %s",
+                name,
+                error,
+            )
+
+    def _pipelined_bulk(
+        self,
+        name: str,
+        bulk_data: Iterable[Any],
+        bulk_records_function: Callable[..., Response],
+        num_threads: int,
+        progress_bar: tqdm,
+    ) -> Tuple[int, int]:
+        """Sends the bulk data concurrently, keeping up to `num_threads` requests in flight.
+
+        The next chunk is converted while previous ones are being sent. All requests share the same
+        pooled http client, so the connections are reused between chunks.
+
+        Returns:
+            A tuple with the aggregated number of processed and failed records
+        """
+        processed = 0
+        failed = 0
+
+        def collect(future: Future, size: int):
+            nonlocal processed, failed
+
+            response = future.result()
+            _check_response_errors(response)
+            processed += response.parsed.processed
+            failed += response.parsed.failed
+
+            progress_bar.update(size)
+
+        in_flight = deque()
+        with httpx.Client(
+            limits=httpx.Limits(
+                max_connections=num_threads, max_keepalive_connections=num_threads
+            )
+        ) as http_client, ThreadPoolExecutor(max_workers=num_threads) as executor:
+            for data in bulk_data:
+                if len(in_flight) >= num_threads:
+                    collect(*in_flight.popleft())
+                future = executor.submit(
+                    bulk_records_function,
+                    client=self._client,
+                    name=name,
+                    json_body=data,
+                    http_client=http_client,
+                )
+                in_flight.append((future, len(data.records)))
+
+            while in_flight:
+                collect(*in_flight.popleft())
+
+        return processed, failed
+
     def load(
         self,
         name: str,
@@ -266,7 +427,8 @@ class RubrixClient:
         ids: Optional[List[Union[str, int]]] = None,
         limit: Optional[int] = None,
         as_pandas: bool = True,
-    ) -> Union[pandas.DataFrame, Dataset]:
+        format: str = "json",
+    ) -> Union[pandas.DataFrame, Dataset, "datasets.Dataset"]:
         """Loads a dataset as a pandas DataFrame or a Dataset.
 
         Args:
@@ -276,67 +438,183 @@ class RubrixClient:
             ids: If provided, load dataset records with given ids.
             limit: The number of records to retrieve.
             as_pandas: If True, return a pandas DataFrame. If False, return a Dataset.
+            format: The transfer format, "json" or "arrow". With "arrow", records are transferred as
+                Apache Arrow record batches and no record objects are created: the result is a pandas DataFrame,
+                or a `datasets.Dataset` if `as_pandas=False`. Only supported for text classification datasets.
 
         Returns:
             The dataset as a pandas Dataframe or a Dataset.
         """
+        if format not in ["json", "arrow"]:
+            raise InputValueError(
+                f"Wrong load format '{format}'. Available values are ['json', 'arrow']"
+            )
+
+        data_stream, request_class, dataset_class = self._get_dataset_task_config(name)
+        if format == "arrow":
+            return self._load_arrow(
+                name,
+                dataset_class=dataset_class,
+                request=request_class(ids=ids, query_text=query),
+                limit=limit,
+                as_pandas=as_pandas,
+            )
+
+        records = list(
+            self._stream_records(
+                name,
+                data_stream=data_stream,
+                request=request_class(ids=ids, query_text=query),
+                limit=limit,
+            )
+        )
+        try:
+            records_sorted_by_id = sorted(records, key=lambda x: x.id)
+        # record ids can be a mix of int/str -> sort all as str type
+        except TypeError:
+            records_sorted_by_id = sorted(records, key=lambda x: str(x.id))
+
+        dataset = dataset_class(records_sorted_by_id)
+
+        if not self._WARNED_ABOUT_AS_PANDAS:
+            self._LOGGER.warning(
+                "The argument 'as_pandas' in `rb.load` will be deprecated in the future, and we will always return a `Dataset`. "
+                "To emulate the future behavior set `as_pandas=False`. To get a pandas DataFrame, call `Dataset.to_pandas()`"
+            )
+            self._WARNED_ABOUT_AS_PANDAS = True
+
+        if as_pandas:
+            return dataset.to_pandas()
+        return dataset
+
+    def _load_arrow(
+        self,
+        name: str,
+        dataset_class: Type[Dataset],
+        request: Any,
+        limit: Optional[int],
+        as_pandas: bool,
+    ) -> Union[pandas.DataFrame, "datasets.Dataset"]:
+        """Loads the dataset records from its Apache Arrow stream, straight into columnar data"""
+        if dataset_class is not DatasetForTextClassification:
+            raise InputValueError(
+                "The 'arrow' load format is only supported for text classification datasets"
+            )
+
+        response = text_classification_data_arrow(
+            client=self._client, name=name, request=request, limit=limit
+        )
+        _check_response_errors(response)
+
+        table = response.parsed
+        if as_pandas:
+            return table.to_pandas()
+
+        try:
+            import datasets
+            from datasets.table import InMemoryTable
+        except ModuleNotFoundError:
+            raise ModuleNotFoundError(
+                "'datasets' must be installed to load data with `as_pandas=False` and `format='arrow'`! "
+                "You can install 'datasets' with the command: `pip install datasets>1.17.0`"
+            )
+        return datasets.Dataset(InMemoryTable(table))
+
+    def iter_records(
+        self,
+        name: str,
+        query: Optional[str] = None,
+        ids: Optional[List[Union[str, int]]] = None,
+        limit: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[Union[Record, List[Record]]]:
+        """Iterates over the dataset records as they arrive from the server.
+
+        Records are converted one by one, so memory usage does not grow with the dataset size.
+        Unlike `load`, records are not sorted by id.
+
+        Args:
+            name: The dataset name.
+            query: An ElasticSearch query with the
+                `query string syntax <https://rubrix.readthedocs.io/en/stable/reference/webapp/search_records.html>`_
+            ids: If provided, load dataset records with given ids.
+            limit: The number of records to retrieve.
+            batch_size: If provided, records are yielded in lists of up to `batch_size` records.
+
+        Returns:
+            An iterator over the dataset records, or over batches of records if `batch_size` is provided.
+        """
+        data_stream, request_class, _ = self._get_dataset_task_config(name)
+
+        records = self._stream_records(
+            name,
+            data_stream=data_stream,
+            request=request_class(ids=ids, query_text=query),
+            limit=limit,
+        )
+        if not batch_size:
+            return records
+        return iter(lambda: list(itertools.islice(records, batch_size)), [])
+
+    def _stream_records(
+        self,
+        name: str,
+        data_stream: Callable[..., Iterator[Any]],
+        request: Any,
+        limit: Optional[int] = None,
+    ) -> Iterator[Record]:
+        """Converts the dataset sdk records to client records, one by one"""
+        for sdk_record in data_stream(
+            client=self._client, name=name, request=request, limit=limit
+        ):
+            yield sdk_record.to_client()
+
+    def _get_dataset_task_config(self, name: str) -> Tuple[Callable, Type, Type]:
+        """Fetches the dataset task and returns its data stream function, query class and dataset class"""
         response = get_dataset(client=self._client, name=name)
         _check_response_errors(response)
         task = response.parsed.task
 
         task_config = {
             TaskType.text_classification: (
-                text_classification_data,
+                text_classification_data_stream,
                 TextClassificationQuery,
                 DatasetForTextClassification,
             ),
             TaskType.token_classification: (
-                token_classification_data,
+                token_classification_data_stream,
                 TokenClassificationQuery,
                 DatasetForTokenClassification,
             ),
             TaskType.text2text: (
-                text2text_data,
+                text2text_data_stream,
                 Text2TextQuery,
                 DatasetForText2Text,
             ),
         }
 
         try:
-            get_dataset_data, request_class, dataset_class = task_config[task]
+            return task_config[task]
         except KeyError:
             raise ValueError(
                 f"Sorry, load method not supported for the '{task}' task. Supported tasks: "
                 f"{[TaskType.text_classification, TaskType.token_classification, TaskType.text2text]}"
             )
-        response = get_dataset_data(
-            client=self._client,
-            name=name,
-            request=request_class(ids=ids, query_text=query),
-            limit=limit,
-        )
 
-        _check_response_errors(response)
-
-        records = [sdk_record.to_client() for sdk_record in response.parsed]
-        try:
-            records_sorted_by_id = sorted(records, key=lambda x: x.id)
-        # record ids can be a mix of int/str -> sort all as str type
-        except TypeError:
-            records_sorted_by_id = sorted(records, key=lambda x: str(x.id))
+    def get_dataset(self, name: str) -> DatasetInfo:
+        """Fetches the info of a dataset, like its task or its last update
 
-        dataset = dataset_class(records_sorted_by_id)
+        Args:
+            name: The dataset name
 
-        if not self._WARNED_ABOUT_AS_PANDAS:
-            self._LOGGER.warning(
-                "The argument 'as_pandas' in `rb.load` will be deprecated in the future, and we will always return a `Dataset`. "
-                "To emulate the future behavior set `as_pandas=False`. To get a pandas DataFrame, call `Dataset.to_pandas()`"
-            )
-            self._WARNED_ABOUT_AS_PANDAS = True
+        Returns:
+            The dataset info
+        """
+        # skip the sdk cache, to always get the latest update of the dataset
+        response = get_dataset.__wrapped__(client=self._client, name=name)
+        _check_response_errors(response)
 
-        if as_pandas:
-            return dataset.to_pandas()
-        return dataset
+        return response.parsed
 
     def copy(self, source: str, target: str, target_workspace: Optional[str] = None):
         """Makes a copy of the `source` dataset and saves it as `target`"""
@@ -418,6 +696,23 @@ class RubrixClient:
 
         return LabelingRuleMetricsSummary.parse_obj(response.parsed)
 
+    def rules_matching_ids(
+        self, dataset: str, queries: List[str]
+    ) -> Dict[str, List[Union[int, str]]]:
+        """Fetches the ids of the dataset records matching each rule query
+
+        Args:
+            dataset: The dataset name.
+            queries: The rule queries.
+
+        Returns:
+            The matching record ids, by rule query.
+        """
+        response = rules_matching_ids(self._client, name=dataset, queries=queries)
+        _check_response_errors(response)
+
+        return LabelingRulesMatchingIds.parse_obj(response.parsed).ids
+
 
 def _check_response_errors(response: Response) -> None:
     """Checks response status codes and raise corresponding error if found"""
@@ -26,10 +26,12 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 import json
-from typing import Any, Dict, List, Type, TypeVar, Union
+from typing import Any, Dict, Iterator, List, Optional, Type, TypeVar, Union
 
 import httpx
+from pydantic import BaseModel
 
+from rubrix.client.sdk.client import AuthenticatedClient
 from rubrix.client.sdk.commons.errors_handler import handle_response_error
 from rubrix.client.sdk.commons.models import (
     BulkResponse,
@@ -61,7 +63,7 @@ def build_data_response(
     response: httpx.Response, data_type: Type[T]
 ) -> Response[List[T]]:
     if 200 <= response.status_code < 400:
-        parsed_response = [data_type(**json.loads(r)) for r in response.iter_lines()]
+        parsed_response = list(build_data_stream(response, data_type=data_type))
         return Response(
             status_code=response.status_code,
             content=b"",
@@ -74,6 +76,75 @@ def build_data_response(
     return handle_response_error(response, **data, parse_response=False)
 
 
+def build_data_stream(response: httpx.Response, data_type: Type[T]) -> Iterator[T]:
+    """Parses the data records one by one, as the response lines arrive"""
+    if 200 <= response.status_code < 400:
+        for line in response.iter_lines():
+            yield data_type(**json.loads(line))
+        return
+
+    content = next(response.iter_lines())
+    data = json.loads(content)
+    handle_response_error(response, **data, parse_response=False)
+
+
+def build_search_stream(
+    client: AuthenticatedClient,
+    url: str,
+    data_type: Type[T],
+    request: Optional[BaseModel] = None,
+    page_size: int = 100,
+) -> Iterator[T]:
+    """Iterates over the records matching a search, page by page, following the
+    ``next_cursor`` of every search response"""
+    body = {"query": request.dict()} if request else {}
+    cursor = None
+    while True:
+        params = {"limit": page_size}
+        if cursor:
+            params["cursor"] = cursor
+        response = httpx.post(
+            url=url,
+            headers=client.get_headers(),
+            cookies=client.get_cookies(),
+            timeout=client.get_timeout(),
+            params=params,
+            json=body,
+        )
+        if not 200 <= response.status_code < 400:
+            handle_response_error(response)
+            return
+
+        page = response.json()
+        records = page.get("records") or []
+        for record in records:
+            yield data_type(**record)
+
+        cursor = page.get("next_cursor")
+        if not cursor or not records:
+            return
+
+
+def build_arrow_response(response: httpx.Response) -> Response["pyarrow.Table"]:
+    """Reads the Apache Arrow IPC stream of the response as an arrow table"""
+    if 200 <= response.status_code < 400:
+        try:
+            import pyarrow
+        except ModuleNotFoundError:
+            raise ModuleNotFoundError(
+                "'pyarrow' must be installed to load data in the Apache Arrow format! "
+                "You can install 'pyarrow' with the command: `pip install pyarrow`"
+            )
+        return Response(
+            status_code=response.status_code,
+            content=b"",
+            headers=response.headers,
+            parsed=pyarrow.ipc.open_stream(response.content).read_all(),
+        )
+
+    return handle_response_error(response)
+
+
 def build_list_response(
     response: httpx.Response,
     item_class: Type[T],
@@ -82,6 +82,56 @@ def delete_dataset(
     return handle_response_error(response, dataset=name)
 
 
+def start_bulk_load(
+    client: AuthenticatedClient,
+    name: str,
+    no_replicas: bool = False,
+) -> Response[None]:
+    url = "{}/api/datasets/{name}:start_bulk_load".format(client.base_url, name=name)
+
+    response = httpx.put(
+        url=url,
+        headers=client.get_headers(),
+        cookies=client.get_cookies(),
+        timeout=client.get_timeout(),
+        params={"no_replicas": no_replicas},
+    )
+
+    return _build_empty_response(response=response, name=name)
+
+
+def end_bulk_load(
+    client: AuthenticatedClient,
+    name: str,
+    force_merge: bool = False,
+) -> Response[None]:
+    url = "{}/api/datasets/{name}:end_bulk_load".format(client.base_url, name=name)
+
+    response = httpx.put(
+        url=url,
+        headers=client.get_headers(),
+        cookies=client.get_cookies(),
+        timeout=client.get_timeout(),
+        params={"force_merge": force_merge},
+    )
+
+    return _build_empty_response(response=response, name=name)
+
+
+def _build_empty_response(
+    response: httpx.Response, name: str
+) -> Response[Union[None, ErrorMessage, HTTPValidationError]]:
+
+    if response.status_code == 200:
+        return Response(
+            status_code=response.status_code,
+            content=response.content,
+            headers=response.headers,
+            parsed=None,
+        )
+    return handle_response_error(response, dataset=name)
+
+
 def _build_response(
     response: httpx.Response, name: str
 ) -> Response[Union[Dataset, ErrorMessage, HTTPValidationError]]:
@@ -12,15 +12,18 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-from typing import List, Optional, Union
+from typing import Iterator, List, Optional, Union
 
 import httpx
 
 from rubrix.client.sdk.client import AuthenticatedClient
 from rubrix.client.sdk.commons.api import (
+    build_arrow_response,
     build_bulk_response,
     build_data_response,
+    build_data_stream,
     build_list_response,
+    build_search_stream,
     build_typed_response,
 )
 from rubrix.client.sdk.commons.models import (
@@ -32,6 +35,7 @@ from rubrix.client.sdk.commons.models import (
 from rubrix.client.sdk.text_classification.models import (
     LabelingRule,
     LabelingRuleMetricsSummary,
+    LabelingRulesMatchingIds,
     TextClassificationBulkData,
     TextClassificationQuery,
     TextClassificationRecord,
@@ -42,16 +46,21 @@ def bulk(
     client: AuthenticatedClient,
     name: str,
     json_body: TextClassificationBulkData,
+    http_client: Optional[httpx.Client] = None,
+    ingest_mode: Optional[str] = None,
 ) -> Response[BulkResponse]:
     url = "{}/api/datasets/{name}/TextClassification:bulk".format(
         client.base_url, name=name
     )
 
-    response = httpx.post(
+    # A shared (pooled) http client, if provided, reuses open connections between calls
+    post = http_client.post if http_client else httpx.post
+    response = post(
         url=url,
         headers=client.get_headers(),
         cookies=client.get_cookies(),
         timeout=client.get_timeout(),
+        params={"ingest_mode": ingest_mode} if ingest_mode else None,
         json=json_body.dict(by_alias=True),
     )
 
@@ -82,6 +91,74 @@ def data(
         )
 
 
+def data_stream(
+    client: AuthenticatedClient,
+    name: str,
+    request: Optional[TextClassificationQuery] = None,
+    limit: Optional[int] = None,
+) -> Iterator[TextClassificationRecord]:
+    """Iterates over the dataset records, parsed one by one as they arrive from the server"""
+    url = "{}/api/datasets/{name}/TextClassification/data".format(
+        client.base_url, name=name
+    )
+
+    with httpx.stream(
+        method="POST",
+        url=url,
+        headers=client.get_headers(),
+        cookies=client.get_cookies(),
+        timeout=None,
+        params={"limit": limit} if limit else None,
+        json=request.dict() if request else {},
+    ) as response:
+        yield from build_data_stream(
+            response=response, data_type=TextClassificationRecord
+        )
+
+
+def search_stream(
+    client: AuthenticatedClient,
+    name: str,
+    request: Optional[TextClassificationQuery] = None,
+    page_size: int = 100,
+) -> Iterator[TextClassificationRecord]:
+    """Iterates over the records matching a search, fetching them page by page"""
+    url = "{}/api/datasets/{name}/TextClassification:search".format(
+        client.base_url, name=name
+    )
+
+    yield from build_search_stream(
+        client,
+        url=url,
+        data_type=TextClassificationRecord,
+        request=request,
+        page_size=page_size,
+    )
+
+
+def data_arrow(
+    client: AuthenticatedClient,
+    name: str,
+    request: Optional[TextClassificationQuery] = None,
+    limit: Optional[int] = None,
+) -> Response[Union["pyarrow.Table", HTTPValidationError, ErrorMessage]]:
+    """Fetches the dataset records as an arrow table, transferred in the Apache Arrow IPC format"""
+    url = "{}/api/datasets/{name}/TextClassification/data:arrow".format(
+        client.base_url, name=name
+    )
+
+    response = httpx.post(
+        url=url,
+        headers=client.get_headers(),
+        cookies=client.get_cookies(),
+        timeout=None,
+        params={"limit": limit} if limit else None,
+        json=request.dict() if request else {},
+    )
+
+    return build_arrow_response(response)
+
+
 def fetch_dataset_labeling_rules(
     client: AuthenticatedClient,
     name: str,
@@ -122,3 +199,26 @@ def dataset_rule_metrics(
     return build_typed_response(
         response, response_type_class=LabelingRuleMetricsSummary
     )
+
+
+def rules_matching_ids(
+    client: AuthenticatedClient,
+    name: str,
+    queries: List[str],
+) -> Response[Union[LabelingRulesMatchingIds, HTTPValidationError, ErrorMessage]]:
+    """Fetches the ids of the records matching each rule query, with no record data"""
+    url = (
+        "{}/api/datasets/TextClassification/{name}/labeling/rules/matching_ids".format(
+            client.base_url, name=name
+        )
+    )
+
+    response = httpx.post(
+        url=url,
+        headers=client.get_headers(),
+        cookies=client.get_cookies(),
+        timeout=None,
+        json={"queries": queries},
+    )
+
+    return build_typed_response(response, response_type_class=LabelingRulesMatchingIds)
@@ -199,3 +199,9 @@ class LabelingRuleMetricsSummary(BaseModel):
 
     total_records: int
     annotated_records: int
+
+
+class LabelingRulesMatchingIds(BaseModel):
+    """The matching record ids, by rule query"""
+
+    ids: Dict[str, List[Union[int, str]]]
@@ -13,12 +13,17 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-from typing import List, Optional, Union
+from typing import Iterator, List, Optional, Union
 
 import httpx
 
 from rubrix.client.sdk.client import AuthenticatedClient
-from rubrix.client.sdk.commons.api import build_bulk_response, build_data_response
+from rubrix.client.sdk.commons.api import (
+    build_bulk_response,
+    build_data_response,
+    build_data_stream,
+    build_search_stream,
+)
 from rubrix.client.sdk.commons.models import (
     BulkResponse,
     ErrorMessage,
@@ -36,16 +41,21 @@ def bulk(
     client: AuthenticatedClient,
     name: str,
     json_body: TokenClassificationBulkData,
+    http_client: Optional[httpx.Client] = None,
+    ingest_mode: Optional[str] = None,
 ) -> Response[Union[BulkResponse, ErrorMessage, HTTPValidationError]]:
     url = "{}/api/datasets/{name}/TokenClassification:bulk".format(
         client.base_url, name=name
     )
 
-    response = httpx.post(
+    # A shared (pooled) http client, if provided, reuses open connections between calls
+    post = http_client.post if http_client else httpx.post
+    response = post(
         url=url,
         headers=client.get_headers(),
         cookies=client.get_cookies(),
         timeout=client.get_timeout(),
+        params={"ingest_mode": ingest_mode} if ingest_mode else None,
         json=json_body.dict(by_alias=True),
     )
 
@@ -76,3 +86,48 @@ def data(
         return build_data_response(
             response=response, data_type=TokenClassificationRecord
         )
+
+
+def data_stream(
+    client: AuthenticatedClient,
+    name: str,
+    request: Optional[TokenClassificationQuery] = None,
+    limit: Optional[int] = None,
+) -> Iterator[TokenClassificationRecord]:
+    """Iterates over the dataset records, parsed one by one as they arrive from the server"""
+    url = "{}/api/datasets/{name}/TokenClassification/data".format(
+        client.base_url, name=name
+    )
+
+    with httpx.stream(
+        method="POST",
+        url=url,
+        headers=client.get_headers(),
+        cookies=client.get_cookies(),
+        timeout=None,
+        params={"limit": limit} if limit else None,
+        json=request.dict() if request else {},
+    ) as response:
+        yield from build_data_stream(
+            response=response, data_type=TokenClassificationRecord
+        )
+
+
+def search_stream(
+    client: AuthenticatedClient,
+    name: str,
+    request: Optional[TokenClassificationQuery] = None,
+    page_size: int = 100,
+) -> Iterator[TokenClassificationRecord]:
+    """Iterates over the records matching a search, fetching them page by page"""
+    url = "{}/api/datasets/{name}/TokenClassification:search".format(
+        client.base_url, name=name
+    )
+
+    yield from build_search_stream(
+        client,
+        url=url,
+        data_type=TokenClassificationRecord,
+        request=request,
+        page_size=page_size,
+    )
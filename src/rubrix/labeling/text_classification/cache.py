@@ -0,0 +1,151 @@
+#  coding=utf-8
+#  Copyright 2021-present, the Recognai S.L. team.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterable, List, Optional, Union
+
+import numpy as np
+
+from rubrix import _client_instance as client
+from rubrix.client.datasets import DatasetForTextClassification
+from rubrix.client.models import TextClassificationRecord
+from rubrix.labeling.text_classification.rule import Rule
+
+
+class WeakLabelsCache:
+    """A local on-disk cache of the records of a dataset and the records matched by its rules.
+
+    The cache is keyed by the dataset, its ``last_updated`` timestamp and the records filter (query and ids).
+    Each rule is keyed by a hash of its query and label, so when the dataset did not change,
+    only the new or edited rules have to be applied to the dataset again.
+
+    Records are stored as JSON lines and the rule matches as ``.npy`` arrays, so loading the cache
+    never unpickles objects from the cache directory.
+
+    Args:
+        cache_dir: The directory where the cache is stored.
+        dataset: Name of the dataset.
+        query: An optional query used to filter the records of the dataset.
+        ids: An optional list of record ids used to filter the records of the dataset.
+    """
+
+    _RECORDS_FILE = "records.jsonl"
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        dataset: str,
+        query: Optional[str] = None,
+        ids: Optional[List[Union[int, str]]] = None,
+    ):
+        dataset_info = client().get_dataset(dataset)
+
+        # one directory for each filter of the dataset, holding only its latest version
+        self._filter_dir = (
+            Path(cache_dir)
+            / dataset
+            / _hash(
+                {
+                    "owner": dataset_info.owner,
+                    "dataset": dataset,
+                    "query": query,
+                    "ids": ids,
+                }
+            )
+        )
+        self._version_dir = self._filter_dir / _hash(dataset_info.last_updated)
+
+    def load_records(self) -> Optional[DatasetForTextClassification]:
+        """Loads the cached records.
+
+        Returns:
+            The records, or None if they are not cached for the current version of the dataset.
+        """
+        path = self._version_dir / self._RECORDS_FILE
+        if not path.exists():
+            return None
+        with path.open("rb") as file:
+            return DatasetForTextClassification(
+                [TextClassificationRecord.parse_raw(line) for line in file]
+            )
+
+    def save_records(self, records: Iterable[TextClassificationRecord]):
+        """Caches the records, removing the cache of previous versions of the dataset.
+
+        Args:
+            records: The records of the current version of the dataset.
+        """
+        if self._filter_dir.exists():
+            for path in self._filter_dir.iterdir():
+                if path != self._version_dir:
+                    shutil.rmtree(path, ignore_errors=True)
+        self._version_dir.mkdir(parents=True, exist_ok=True)
+
+        _atomic_write(
+            self._version_dir / self._RECORDS_FILE,
+            lambda file: file.writelines(
+                record.json().encode("utf-8") + b"\n" for record in records
+            ),
+        )
+
+    def load_rows(self, rule: Rule) -> Optional[np.ndarray]:
+        """Loads the cached rows of the records matched by a rule, memory-mapped.
+
+        Args:
+            rule: The rule.
+
+        Returns:
+            The rows (positions in the cached records), or None if the rule is not cached.
+        """
+        path = self._rule_path(rule)
+        if not path.exists():
+            return None
+        return np.load(path, mmap_mode="r")
+
+    def save_rows(self, rule: Rule, rows: np.ndarray):
+        """Caches the rows of the records matched by a rule.
+
+        Args:
+            rule: The rule.
+            rows: The rows (positions in the cached records) of the matched records.
+        """
+        path = self._rule_path(rule)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(path, lambda file: np.save(file, rows))
+
+    def _rule_path(self, rule: Rule) -> Path:
+        return (
+            self._version_dir
+            / "rules"
+            / f"{_hash({'query': rule.query, 'label': rule.label})}.npy"
+        )
+
+
+def _hash(obj: Any) -> str:
+    """Stable hash of a json serializable object, used for the cache keys"""
+    return hashlib.sha1(
+        json.dumps(obj, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _atomic_write(path: Path, write: Callable[[BinaryIO], None]):
+    """Writes to a temporary file first, so readers never see a partially written cache file"""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("wb") as file:
+        write(file)
+    os.replace(tmp_path, path)
@@ -82,7 +82,7 @@ class Rule:
         """
         records = rb.load(name=dataset, query=self._query, as_pandas=False)
 
-        self._matching_ids = {record.id: None for record in records}
+        self._matching_ids = {str(record.id): None for record in records}
 
     def metrics(self, dataset: str) -> Dict[str, Union[int, float]]:
         """Compute the rule metrics for a given dataset:
@@ -135,13 +135,33 @@ class Rule:
             )
 
         try:
-            self._matching_ids[record.id]
+            self._matching_ids[str(record.id)]
         except KeyError:
             return None
         else:
             return self._label
 
 
+def apply_rules(dataset: str, rules: List[Rule]):
+    """Apply several rules to a dataset at once, and save matching ids of the records for each rule.
+
+    In contrast to calling ``Rule.apply`` for each rule, only the record ids are retrieved,
+    in a single scan of the dataset for all the rules.
+
+    Args:
+        dataset: The name of the dataset.
+        rules: The rules to apply.
+    """
+    current_client = client()
+    matching_ids = current_client.rules_matching_ids(
+        dataset=dataset, queries=[rule.query for rule in rules]
+    )
+    for rule in rules:
+        rule._matching_ids = {
+            str(record_id): None for record_id in matching_ids[rule.query]
+        }
+
+
 def load_rules(dataset: str) -> List[Rule]:
     """load the rules defined in a given dataset.
 
@@ -23,7 +23,8 @@ from tqdm.auto import tqdm
 from rubrix import load
 from rubrix.client.datasets import DatasetForTextClassification
 from rubrix.client.models import TextClassificationRecord
-from rubrix.labeling.text_classification.rule import Rule, load_rules
+from rubrix.labeling.text_classification.cache import WeakLabelsCache
+from rubrix.labeling.text_classification.rule import Rule, apply_rules, load_rules
 
 
 class WeakLabels:
@@ -39,6 +40,12 @@ class WeakLabels:
             to filter the dataset before applying the rules.
         label2int: An optional dict, mapping the labels to integers. Remember that the return type ``None`` means
             abstention (e.g. ``{None: -1}``). By default, we will build a mapping on the fly when applying the rules.
+        sparse: If True, the weak label matrix is stored in a sparse (CSC) format, keeping only the non-abstain
+            weak labels. This saves a lot of memory for big datasets with many mostly abstaining rules.
+            Requires `scipy`.
+        cache_dir: An optional directory to cache the records and the matches of the rules on disk.
+            When computing the weak labels of the same dataset again, the records are only downloaded if the
+            dataset was updated, and only the new or edited rules (in form of a ``Rule``) are applied again.
 
     Raises:
         NoRulesFoundError: When you do not provide rules, and the dataset has no rules either.
@@ -82,7 +89,19 @@ class WeakLabels:
         ids: Optional[List[Union[int, str]]] = None,
         query: Optional[str] = None,
         label2int: Optional[Dict[Optional[str], int]] = None,
+        sparse: bool = False,
+        cache_dir: Optional[str] = None,
     ):
+        if sparse:
+            try:
+                import scipy.sparse
+            except ModuleNotFoundError:
+                raise ModuleNotFoundError(
+                    "'scipy' must be installed to store the weak labels in a sparse matrix! "
+                    "You can install 'scipy' with the command: `pip install scipy`"
+                )
+        self._sparse = sparse
+
         if not isinstance(dataset, str):
             raise TypeError(
                 f"The name of the dataset must be a string, but you provided: {dataset}"
@@ -120,10 +139,20 @@ class WeakLabels:
             val: key for key, val in self._rules_index2name.items()
         }
 
+        self._cache = (
+            WeakLabelsCache(cache_dir, dataset, query=query, ids=ids)
+            if cache_dir is not None
+            else None
+        )
+
         # load records and check compatibility
-        self._records: DatasetForTextClassification = load(
-            dataset, query=query, ids=ids, as_pandas=False
+        self._records: Optional[DatasetForTextClassification] = (
+            self._cache.load_records() if self._cache is not None else None
         )
+        if self._records is None:
+            self._records = load(dataset, query=query, ids=ids, as_pandas=False)
+            if self._cache is not None and self._records:
+                self._cache.save_records(self._records)
         if not self._records:
             raise NoRecordsFoundError(
                 f"No records found in dataset '{dataset}'"
@@ -145,7 +174,9 @@ class WeakLabels:
 
     def _apply_rules(
         self, label2int: Optional[Dict[str, int]]
-    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, int]]:
+    ) -> Tuple[
+        Union[np.ndarray, "scipy.sparse.csc_matrix"], np.ndarray, Dict[str, int]
+    ]:
         """Apply the rules to the dataset.
 
         Args:
@@ -158,56 +189,120 @@ class WeakLabels:
             MissingLabelError: When provided with a ``label2int`` dict, and a
                 weak label or annotation label is not present in its keys.
         """
-        # call apply on the ElasticSearch rules
-        for rule in tqdm(self._rules, desc="Preparing rules"):
-            if isinstance(rule, Rule):
-                rule.apply(self._dataset)
-
-        # create weak label matrix, annotation array, final label2int
-        weak_label_matrix = np.empty(
-            (len(self._records), len(self._rules)), dtype=np.short
-        )
-        annotation_array = np.empty(len(self._records), dtype=np.short)
         _label2int = {None: -1} if label2int is None else label2int
         if None not in _label2int:
             raise MissingLabelError(
                 "Your provided `label2int` mapping does not contain the required abstention label `None`."
             )
 
-        for n, record in tqdm(
-            enumerate(self._records), total=len(self._records), desc="Applying rules"
-        ):
-            # First: fill annotation array
-            try:
-                annotation = _label2int[record.annotation]
-            except KeyError as error:
-                # When a label2int was provided, we want to raise an error if the label is missing!
-                if label2int is not None:
-                    raise MissingLabelError(
-                        f"The annotation label '{record.annotation}' is missing in the `label2int` dict {label2int}"
-                    ) from error
-                # we already have `None` -> we need to subtract 1
-                _label2int[record.annotation] = len(_label2int) - 1
-                annotation = _label2int[record.annotation]
-
-            annotation_array[n] = annotation
-
-            # Second: fill weak label matrix
+        # apply the ElasticSearch rules that are not cached, all at once and fetching only the matching ids
+        cached_rows = {}
+        if self._cache is not None:
             for m, rule in enumerate(self._rules):
-                weak_label = rule(record)
-
-                try:
-                    weak_label = _label2int[weak_label]
-                except KeyError as error:
-                    if label2int is not None:
-                        raise MissingLabelError(
-                            f"A rule returned the weak label '{weak_label}', "
-                            f"but it is missing in the `label2int` dict {label2int}"
-                        ) from error
-                    _label2int[weak_label] = len(_label2int) - 1
-                    weak_label = _label2int[weak_label]
-
-                weak_label_matrix[n, m] = weak_label
+                if isinstance(rule, Rule):
+                    rows = self._cache.load_rows(rule)
+                    if rows is not None:
+                        cached_rows[m] = rows
+        es_rules = [
+            rule
+            for m, rule in enumerate(self._rules)
+            if isinstance(rule, Rule) and m not in cached_rows
+        ]
+        if es_rules:
+            apply_rules(self._dataset, es_rules)
+
+        # collect the weak labels of each rule: matching rows + label for ElasticSearch rules,
+        # the label for each record otherwise. Record ids are compared as strings, the way the server returns them
+        id2row = {str(record.id): n for n, record in enumerate(self._records)}
+        annotations = [record.annotation for record in self._records]
+        weak_labels = []
+        for m, rule in enumerate(tqdm(self._rules, desc="Applying rules")):
+            if m in cached_rows:
+                weak_labels.append((cached_rows[m], rule.label))
+            elif isinstance(rule, Rule):
+                rows = np.fromiter(
+                    (id2row[idx] for idx in rule._matching_ids if idx in id2row),
+                    dtype=np.intp,
+                )
+                if self._cache is not None:
+                    self._cache.save_rows(rule, rows)
+                weak_labels.append((rows, rule.label))
+            else:
+                weak_labels.append([rule(record) for record in self._records])
+
+        # extend the label2int mapping in the order the labels first appear in the records,
+        # checking the annotation before the weak labels
+        first_occurrences = {}
+        for n, annotation in enumerate(annotations):
+            first_occurrences.setdefault(annotation, (n, 0))
+        for m, rule_weak_labels in enumerate(weak_labels, start=1):
+            if isinstance(rule_weak_labels, tuple):
+                rows, label = rule_weak_labels
+                if len(rows) > 0 and (
+                    label not in first_occurrences
+                    or (rows.min(), m) < first_occurrences[label]
+                ):
+                    first_occurrences[label] = (rows.min(), m)
+            else:
+                for n, label in enumerate(rule_weak_labels):
+                    if (
+                        label not in first_occurrences
+                        or (n, m) < first_occurrences[label]
+                    ):
+                        first_occurrences[label] = (n, m)
+
+        for label, (_, m) in sorted(first_occurrences.items(), key=lambda x: x[1]):
+            if label in _label2int:
+                continue
+            # When a label2int was provided, we want to raise an error if the label is missing!
+            if label2int is not None:
+                if m == 0:
+                    raise MissingLabelError(
+                        f"The annotation label '{label}' is missing in the `label2int` dict {label2int}"
+                    )
+                raise MissingLabelError(
+                    f"A rule returned the weak label '{label}', "
+                    f"but it is missing in the `label2int` dict {label2int}"
+                )
+            # we already have `None` -> we need to subtract 1
+            _label2int[label] = len(_label2int) - 1
+
+        # create weak label matrix and annotation array, filling them column by column
+        annotation_array = np.fromiter(
+            (_label2int[annotation] for annotation in annotations),
+            dtype=np.short,
+            count=len(annotations),
+        )
+        # rows and integer weak labels of the non-abstain entries, by rule
+        columns = []
+        for rule_weak_labels in weak_labels:
+            if isinstance(rule_weak_labels, tuple):
+                rows, label = rule_weak_labels
+                values = np.full(len(rows), _label2int[label], dtype=np.short)
+            else:
+                column = np.fromiter(
+                    (_label2int[label] for label in rule_weak_labels),
+                    dtype=np.short,
+                    count=len(rule_weak_labels),
+                )
+                rows = np.flatnonzero(column != _label2int[None])
+                values = column[rows]
+            columns.append((rows, values))
+
+        shape = (len(self._records), len(self._rules))
+        if self._sparse:
+            weak_label_matrix = _sparse_weak_label_matrix(
+                rows=np.concatenate([rows for rows, _ in columns]),
+                cols=np.concatenate(
+                    [np.full(len(rows), m) for m, (rows, _) in enumerate(columns)]
+                ),
+                values=np.concatenate([values for _, values in columns]),
+                shape=shape,
+            )
+        else:
+            weak_label_matrix = np.full(shape, _label2int[None], dtype=np.short)
+            for m, (rows, values) in enumerate(columns):
+                weak_label_matrix[rows, m] = values
 
         return weak_label_matrix, annotation_array, _label2int
 
@@ -226,23 +321,57 @@ class WeakLabels:
         """The dictionary that maps integers to weak/annotation labels."""
         return self._int2label
 
-    def matrix(self, has_annotation: Optional[bool] = None) -> np.ndarray:
+    def matrix(
+        self, has_annotation: Optional[bool] = None, sparse: bool = False
+    ) -> Union[np.ndarray, "scipy.sparse.csr_matrix"]:
         """Returns the weak label matrix, or optionally just a part of it.
 
         Args:
             has_annotation: If True, return only the part of the matrix that has a corresponding annotation.
                 If False, return only the part of the matrix that has NOT a corresponding annotation.
                 By default, we return the whole weak label matrix.
+            sparse: If True, return the matrix in a sparse CSR format, in which only the non-abstain weak labels
+                are stored (be aware that a label mapped to 0 is stored as an explicit zero). Requires `scipy`.
+                By default, we return a dense matrix.
 
         Returns:
             The weak label matrix, or optionally just a part of it.
         """
-        if has_annotation is True:
-            return self._matrix[self._annotation_array != self._label2int[None]]
-        if has_annotation is False:
-            return self._matrix[self._annotation_array == self._label2int[None]]
+        if has_annotation is None:
+            matrix = self._matrix
+        else:
+            has_annotation_mask = self._annotation_array != self._label2int[None]
+            matrix = self._matrix[
+                has_annotation_mask if has_annotation else ~has_annotation_mask
+            ]
 
-        return self._matrix
+        if sparse:
+            if self._sparse:
+                return matrix.tocsr()
+            rows, cols = np.nonzero(matrix != self._label2int[None])
+            return _sparse_weak_label_matrix(
+                rows, cols, values=matrix[rows, cols], shape=matrix.shape
+            ).tocsr()
+
+        if self._sparse:
+            return self._to_dense(matrix)
+        return matrix
+
+    def _to_dense(self, sparse_matrix: "scipy.sparse.spmatrix") -> np.ndarray:
+        """Helper method to build the dense version of a sparse weak label matrix"""
+        entries = sparse_matrix.tocoo()
+        matrix = np.full(sparse_matrix.shape, self._label2int[None], dtype=np.short)
+        matrix[entries.row, entries.col] = entries.data
+        return matrix
+
+    def _weak_label_entries(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Helper method returning the rows, columns and integer labels of the non-abstain weak labels"""
+        if self._sparse:
+            entries = self._matrix.tocoo()
+            return entries.row, entries.col, entries.data
+
+        rows, cols = np.nonzero(self._matrix != self._label2int[None])
+        return rows, cols, self._matrix[rows, cols]
 
     def records(
         self, has_annotation: Optional[bool] = None
@@ -316,18 +445,18 @@ class WeakLabels:
         Returns:
             The summary statistics for each rule in a pandas DataFrame.
         """
+        if self._sparse:
+            return self._sparse_summary(normalize_by_coverage, annotation=annotation)
+
         has_weak_label = self._matrix != self._label2int[None]
 
-        # polarity (label)
-        polarity = [
-            set(
-                self._int2label[integer]
-                for integer in np.unique(
-                    self._matrix[:, i][self._matrix[:, i] != self._label2int[None]]
-                )
-            )
-            for i in range(len(self._rules))
-        ]
+        # polarity (label): one pass over the matrix per label
+        polarity = [set() for _ in range(len(self._rules))]
+        for integer, label in self._int2label.items():
+            if label is None:
+                continue
+            for i in np.flatnonzero((self._matrix == integer).any(axis=0)):
+                polarity[i].add(label)
         polarity.append(set().union(*polarity))
 
         # coverage
@@ -343,20 +472,15 @@ class WeakLabels:
             has_weak_label, has_overlaps, coverage, normalize_by_coverage
         )
 
-        # conflicts
-        # TODO: For a lot of records (~1e6), this could become slow (~10s) ... a vectorized solution would be better.
-        has_conflicts = np.apply_along_axis(
-            lambda x: len(np.unique(x[x != self._label2int[None]])) > 1,
-            axis=1,
-            arr=self._matrix,
-        )
+        # conflicts: the min and max weak label of a record differ, ignoring abstentions
+        dtype_info = np.iinfo(self._matrix.dtype)
+        has_conflicts = np.where(has_weak_label, self._matrix, dtype_info.max).min(
+            axis=1
+        ) < np.where(has_weak_label, self._matrix, dtype_info.min).max(axis=1)
         conflicts = self._compute_overlaps_conflicts(
             has_weak_label, has_conflicts, coverage, normalize_by_coverage
         )
 
-        # index for the summary
-        index = list(self._rules_name2index.keys()) + ["total"]
-
         # only add annotated_coverage, correct, incorrect and precision if we have annotations
         if (
             any(self._annotation_array != self._label2int[None])
@@ -381,29 +505,142 @@ class WeakLabels:
                 annotation if annotation is not None else self._annotation_array,
             )
 
-            # precision
-            precision = correct / (correct + incorrect)
+            return self._summary_frame(
+                polarity,
+                coverage,
+                overlaps,
+                conflicts,
+                annotated_coverage=annotated_coverage,
+                correct=correct,
+                incorrect=incorrect,
+            )
+
+        return self._summary_frame(polarity, coverage, overlaps, conflicts)
 
+    def _sparse_summary(
+        self, normalize_by_coverage: bool, annotation: Optional[np.ndarray]
+    ) -> pd.DataFrame:
+        """Helper method computing the summary statistics straight from the non-abstain weak labels.
+
+        See ``self.summary``.
+        """
+        rows, cols, values = self._weak_label_entries()
+        n_records, n_rules = len(self._records), len(self._rules)
+
+        # polarity (label)
+        polarity = [set() for _ in range(n_rules)]
+        for integer, label in self._int2label.items():
+            if label is None:
+                continue
+            for col in np.flatnonzero(
+                np.bincount(cols[values == integer], minlength=n_rules)
+            ):
+                polarity[col].add(label)
+        polarity.append(set().union(*polarity))
+
+        # coverage
+        weak_labels_per_record = np.bincount(rows, minlength=n_records)
+        coverage = np.append(
+            np.bincount(cols, minlength=n_rules) / n_records,
+            (weak_labels_per_record > 0).sum() / n_records,
+        )
+
+        def overlaps_or_conflicts(record_mask: np.ndarray) -> np.ndarray:
+            result = np.append(
+                np.bincount(cols[record_mask[rows]], minlength=n_rules) / n_records,
+                record_mask.sum() / n_records,
+            )
+            if normalize_by_coverage:
+                result /= coverage
+                return np.nan_to_num(result)
+            return result
+
+        # overlaps
+        has_overlaps = weak_labels_per_record > 1
+        overlaps = overlaps_or_conflicts(has_overlaps)
+
+        # conflicts: the min and max weak label of a record differ
+        dtype_info = np.iinfo(values.dtype)
+        record_min = np.full(n_records, dtype_info.max, dtype=values.dtype)
+        np.minimum.at(record_min, rows, values)
+        record_max = np.full(n_records, dtype_info.min, dtype=values.dtype)
+        np.maximum.at(record_max, rows, values)
+        has_conflicts = has_overlaps & (record_min < record_max)
+        conflicts = overlaps_or_conflicts(has_conflicts)
+
+        # only add annotated_coverage, correct, incorrect and precision if we have annotations
+        if (
+            any(self._annotation_array != self._label2int[None])
+            or annotation is not None
+        ):
+            annotation = (
+                annotation if annotation is not None else self._annotation_array
+            )
+            has_annotation = annotation != self._label2int[None]
+
+            # annotated coverage
+            annotated = has_annotation[rows]
+            annotated_coverage = np.append(
+                np.bincount(cols[annotated], minlength=n_rules) / has_annotation.sum(),
+                ((weak_labels_per_record > 0) & has_annotation).sum()
+                / has_annotation.sum(),
+            )
+
+            # correct/incorrect
+            is_correct = values == annotation[rows]
+            correct = np.bincount(cols[is_correct], minlength=n_rules)
+            incorrect = np.bincount(cols[annotated & ~is_correct], minlength=n_rules)
+
+            return self._summary_frame(
+                polarity,
+                coverage,
+                overlaps,
+                conflicts,
+                annotated_coverage=annotated_coverage,
+                correct=np.append(correct, correct.sum()),
+                incorrect=np.append(incorrect, incorrect.sum()),
+            )
+
+        return self._summary_frame(polarity, coverage, overlaps, conflicts)
+
+    def _summary_frame(
+        self,
+        polarity: List[set],
+        coverage: np.ndarray,
+        overlaps: np.ndarray,
+        conflicts: np.ndarray,
+        annotated_coverage: Optional[np.ndarray] = None,
+        correct: Optional[np.ndarray] = None,
+        incorrect: Optional[np.ndarray] = None,
+    ) -> pd.DataFrame:
+        """Helper method to build the summary DataFrame, adding the precision if annotations are available"""
+        # index for the summary
+        index = list(self._rules_name2index.keys()) + ["total"]
+
+        if annotated_coverage is None:
             return pd.DataFrame(
                 {
                     "label": polarity,
                     "coverage": coverage,
-                    "annotated_coverage": annotated_coverage,
                     "overlaps": overlaps,
                     "conflicts": conflicts,
-                    "correct": correct,
-                    "incorrect": incorrect,
-                    "precision": precision,
                 },
                 index=index,
             )
 
+        # precision
+        precision = correct / (correct + incorrect)
+
         return pd.DataFrame(
             {
                 "label": polarity,
                 "coverage": coverage,
+                "annotated_coverage": annotated_coverage,
                 "overlaps": overlaps,
                 "conflicts": conflicts,
+                "correct": correct,
+                "incorrect": incorrect,
+                "precision": precision,
             },
             index=index,
         )
@@ -416,12 +653,9 @@ class WeakLabels:
         normalize_by_coverage: bool,
     ) -> np.ndarray:
         """Helper method to compute the overlaps/conflicts and optionally normalize them by the respective coverage"""
-        overlaps_or_conflicts = (
-            has_weak_label
-            * np.repeat(has_overlaps_or_conflicts, len(self._rules)).reshape(
-                has_weak_label.shape
-            )
-        ).sum(axis=0) / len(self._records)
+        overlaps_or_conflicts = has_weak_label[has_overlaps_or_conflicts].sum(
+            axis=0
+        ) / len(self._records)
         # total
         overlaps_or_conflicts = np.append(
             overlaps_or_conflicts, has_overlaps_or_conflicts.sum() / len(self._records)
@@ -437,20 +671,17 @@ class WeakLabels:
         self, has_weak_label: np.ndarray, annotation: np.ndarray
     ) -> Tuple[np.ndarray, np.ndarray]:
         """Helper method to compute the correctly and incorrectly predicted annotations by the rules"""
-        annotation_matrix = np.repeat(annotation, len(self._rules)).reshape(
-            self._matrix.shape
-        )
+        # broadcast the annotation over the rules, instead of repeating it
+        annotation_column = annotation.reshape(-1, 1)
 
         # correct
-        correct_with_abstain = annotation_matrix == self._matrix
-        correct = np.where(has_weak_label, correct_with_abstain, False).sum(axis=0)
+        correct = (has_weak_label & (annotation_column == self._matrix)).sum(axis=0)
 
         # incorrect
-        incorrect_with_abstain = annotation_matrix != self._matrix
-        incorrect = np.where(
-            has_weak_label & (annotation_matrix != self._label2int[None]),
-            incorrect_with_abstain,
-            False,
+        incorrect = (
+            has_weak_label
+            & (annotation_column != self._label2int[None])
+            & (annotation_column != self._matrix)
         ).sum(axis=0)
 
         # add totals at the end
@@ -476,7 +707,13 @@ class WeakLabels:
         # get labels mask
         if labels is not None:
             labels = [self._label2int[label] for label in labels]
-            idx_by_labels = np.isin(self._matrix, labels).sum(axis=1) >= len(labels)
+            if self._sparse:
+                rows, _, values = self._weak_label_entries()
+                idx_by_labels = np.bincount(
+                    rows[np.isin(values, labels)], minlength=len(self._records)
+                ) >= len(labels)
+            else:
+                idx_by_labels = np.isin(self._matrix, labels).sum(axis=1) >= len(labels)
         else:
             idx_by_labels = np.ones_like(self._records).astype(bool)
 
@@ -486,9 +723,15 @@ class WeakLabels:
                 self._rules_name2index[rule] if isinstance(rule, str) else rule
                 for rule in rules
             ]
-            idx_by_rules = (self._matrix[:, rules] != self._label2int[None]).sum(
-                axis=1
-            ) == len(rules)
+            if self._sparse:
+                rows, cols, _ = self._weak_label_entries()
+                idx_by_rules = np.bincount(
+                    rows[np.isin(cols, rules)], minlength=len(self._records)
+                ) == len(rules)
+            else:
+                idx_by_rules = (self._matrix[:, rules] != self._label2int[None]).sum(
+                    axis=1
+                ) == len(rules)
         else:
             idx_by_rules = np.ones_like(self._records).astype(bool)
 
@@ -505,7 +748,8 @@ class WeakLabels:
         Args:
             label2int: New label to integer mapping. Must cover all previous labels.
         """
-        # save masks for swapping
+        # save masks for swapping, for sparse matrices only the stored non-abstain weak labels need to be swapped
+        matrix_values = self._matrix.data if self._sparse else self._matrix
         label_masks = {}
         annotation_masks = {}
 
@@ -516,12 +760,12 @@ class WeakLabels:
                     f"The label '{label}' is missing in the new mapping."
                 )
             # compute masks
-            label_masks[label] = self._matrix == self._label2int[label]
+            label_masks[label] = matrix_values == self._label2int[label]
             annotation_masks[label] = self._annotation_array == self._label2int[label]
 
         # swap integers
         for label in self._label2int:
-            self._matrix[label_masks[label]] = label2int[label]
+            matrix_values[label_masks[label]] = label2int[label]
             self._annotation_array[annotation_masks[label]] = label2int[label]
 
         # update mapping dicts
@@ -551,3 +795,14 @@ class MultiLabelError(WeakLabelsError):
 
 class MissingLabelError(WeakLabelsError):
     pass
+
+
+def _sparse_weak_label_matrix(
+    rows: np.ndarray, cols: np.ndarray, values: np.ndarray, shape: Tuple[int, int]
+) -> "scipy.sparse.csc_matrix":
+    """Helper function to build a sparse (CSC) weak label matrix from its non-abstain entries"""
+    import scipy.sparse
+
+    return scipy.sparse.csc_matrix(
+        (values.astype(np.short), (rows, cols)), shape=shape, dtype=np.short
+    )
@@ -1,7 +1,6 @@
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple, Union
 
-import rubrix
 from rubrix import TokenClassificationRecord
 from rubrix.monitoring.base import BaseMonitor
 from rubrix.monitoring.types import MissingType
@@ -34,10 +33,9 @@ class FlairMonitor(BaseMonitor):
             for sentence, meta in data
         ]
 
-        rubrix.log(
+        self._log_records(
             records,
             name=self.dataset,
-            verbose=False,
             tags={**(self.tags or {}), "flair_version": _flair_version},
         )
 
@@ -1,7 +1,6 @@
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-import rubrix as rb
 from rubrix import TokenClassificationRecord
 from rubrix.monitoring.base import BaseMonitor
 from rubrix.monitoring.types import MissingType
@@ -49,12 +48,11 @@ class SpacyNERMonitor(BaseMonitor):
         record = self.doc2token_classification(
             doc, agent=self.__wrapped__.path.name, metadata=metadata
         )
-        rb.log(
-            record,
+        self._log_records(
+            [record],
             name=self.dataset,
             tags={k: v for k, v in self.__wrapped__.meta.items() if isinstance(v, str)},
             metadata=self.__model__.meta,
-            verbose=False,
         )
 
     def pipe(self, *args, **kwargs):
@@ -3,7 +3,6 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 
 from pydantic import BaseModel
 
-import rubrix
 from rubrix import TextClassificationRecord
 from rubrix.monitoring.base import BaseMonitor
 from rubrix.monitoring.types import MissingType
@@ -61,7 +60,7 @@ class HuggingFaceMonitor(BaseMonitor):
         if multi_label:
             dataset_name += "_multi"
 
-        rubrix.log(
+        self._log_records(
             records,
             name=dataset_name,
             tags={
@@ -71,9 +70,7 @@ class HuggingFaceMonitor(BaseMonitor):
                 "task": self.__model__.task,
             },
             metadata=config.to_dict(),
-            verbose=False,
         )
-        pass
 
 
 class ZeroShotMonitor(HuggingFaceMonitor):
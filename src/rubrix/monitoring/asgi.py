@@ -16,17 +16,18 @@
 import datetime
 import json
 import logging
+import random
 import re
-import threading
-from queue import Queue
-from typing import Any, Callable, Dict, List, Optional, Tuple
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Union
 
-import rubrix
 from rubrix import Record, TextClassificationRecord, TokenClassificationRecord
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from rubrix.monitoring.log_buffer import MonitorLogBuffer
+from starlette.datastructures import URL
 from starlette.requests import Request
-from starlette.responses import JSONResponse, Response, StreamingResponse
-from starlette.types import Message, Receive
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 _logger = logging.getLogger(__name__)
 _spaces_regex = re.compile(r"\s+")
@@ -61,109 +62,125 @@ def text_classification_mapper(inputs, outputs):
     )
 
 
-class CachedJsonRequest(Request):
+class RubrixLogHTTPMiddleware:
     """
-    We must a cached version of incoming requests since request body cannot be read from middleware directly.
-    See <https://github.com/encode/starlette/issues/847> for more information
-
-    TODO Remove usage of CachedRequest when https://github.com/encode/starlette/pull/848 is released
+    An ASGI middleware that enables rubrix logs for http prediction requests
+
+    The sampling is decided before any work on the request, so requests left out pass
+    straight through. Sampled request and response bodies are captured as they flow
+    through, with no extra copies, and are parsed and mapped into records by a pool
+    of ``max_workers`` threads.
+
+    Args:
+        app: The ASGI application
+        api_endpoint: The path of the endpoint to monitor
+        dataset: The rubrix dataset name
+        records_mapper: The function that maps the request inputs and the response
+            outputs into a rubrix record. Defaults to ``text_classification_mapper``
+        sample_rate: The portion of the requests to log. Default = 1.0
+        sampling_key: An optional function returning a key of the request, e.g. a header
+            value. Requests with a key are sampled deterministically, by the key hash,
+            so the same key is always logged or always left out
+        max_workers: The number of threads mapping the requests into records
     """
 
-    @property
-    def receive(self) -> Receive:
-        body = None
-        if hasattr(self, "_body"):
-            body = self._body
-        if body is not None:
-
-            async def cached_receive() -> Message:
-                return dict(type="http.request", body=body)
-
-            return cached_receive
-        return self._receive
-
-
-class RubrixLogHTTPMiddleware(BaseHTTPMiddleware):
-    """An standard starlette middleware that enables rubrix logs for http prediction requests"""
-
     def __init__(
         self,
+        app: ASGIApp,
         api_endpoint: str,
         dataset: str,
         records_mapper: Optional[Callable[[dict, dict], Record]] = None,
-        *args,
-        **kwargs
+        sample_rate: float = 1.0,
+        sampling_key: Optional[Callable[[Request], Optional[str]]] = None,
+        max_workers: int = 1,
     ):
-        super().__init__(*args, **kwargs)
+        assert (
+            0.0 < sample_rate <= 1.0
+        ), "Wrong sample rate. Set a value in (0, 1] range."
+
+        self.app = app
         self._endpoint = api_endpoint
         self._dataset = dataset
         self._records_mapper = records_mapper or text_classification_mapper
-        self._queue = Queue()
-        self._worker_task = threading.Thread(
-            target=self.__worker__, name=RubrixLogHTTPMiddleware.__name__, daemon=True
+        self._sample_rate = sample_rate
+        self._sampling_key = sampling_key
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=RubrixLogHTTPMiddleware.__name__
         )
-        self._worker_task.start()
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        if self._endpoint != request.url.path:  # Filtering endpoint path
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["path"] != self._endpoint  # Filtering endpoint path
+            or not self._is_request_sampled(scope)
+            or b"application/json" not in _header(scope, b"content-type")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # The request body is read before calling the app, which may not read it,
+        # and the received messages are replayed as they are
+        request_messages = deque()
+        while True:
+            message = await receive()
+            request_messages.append(message)
+            if message["type"] != "http.request" or not message.get("more_body"):
+                break
+        request_body = [
+            message.get("body", b"")
+            for message in request_messages
+            if message["type"] == "http.request"
+        ]
+        response_body: List[bytes] = []
+        capture_response = False
 
-        content_type = request.headers.get("Content-type", None)
-        if "application/json" not in content_type:
-            return await call_next(request)
+        async def replay_receive() -> Message:
+            if request_messages:
+                return request_messages.popleft()
+            return await receive()
 
-        cached_request = CachedJsonRequest(
-            scope=request.scope, receive=request.receive, send=request._send
-        )
-        # Must read body before call_next
-        inputs = await cached_request.json()
-        response: Response = await call_next(cached_request)
-        try:
-            if (
-                not isinstance(response, (JSONResponse, StreamingResponse))
-                or response.status_code >= 400
-            ):
-                return response
-
-            new_response, outputs = await self._extract_response_content(response)
-            self._queue.put_nowait((inputs, outputs, str(request.url)))
-            return new_response
-        except Exception as ex:
-            _logger.error("Cannot log to rubrix", exc_info=ex)
-            return response
-
-    def __worker__(self):
-        while True:
+        async def send_and_capture(message: Message):
+            nonlocal capture_response
+            await send(message)
             try:
-                inputs, outputs, url = self._queue.get()
-                self._log_to_rubrix(inputs, outputs, url)
+                if message["type"] == "http.response.start":
+                    content_type = _header(message, b"content-type")
+                    capture_response = (
+                        message["status"] < 400 and b"application/json" in content_type
+                    )
+                elif message["type"] == "http.response.body" and capture_response:
+                    response_body.append(message.get("body", b""))
+                    if not message.get("more_body", False):
+                        self._executor.submit(
+                            self._log_captured, scope, request_body, response_body
+                        )
             except Exception as ex:
-                # Run thread FOREVER!!!
-                _logger.error("Error sending records to rubrix", exc_info=ex)
-            finally:
-                self._queue.task_done()
-
-    async def _extract_response_content(
-        self, response: Response
-    ) -> Tuple[Response, List[Dict[str, Any]]]:
-        """Extracts response body content from response and returns a new processable response"""
-        body = b""
-        new_response = response
-        if isinstance(response, StreamingResponse):
-            async for chunk in response.body_iterator:
-                body += chunk
-            new_response = StreamingResponse(
-                content=(chunk for chunk in [body]),
-                status_code=response.status_code,
-                headers={k: v for k, v in response.headers.items()},
-                media_type=response.media_type,
-                background=response.background,
+                _logger.error("Cannot log to rubrix", exc_info=ex)
+
+        await self.app(scope, replay_receive, send_and_capture)
+
+    def _is_request_sampled(self, scope: Scope) -> bool:
+        """Return True if the request should be logged to rubrix"""
+        if self._sample_rate >= 1.0:
+            return True
+        if self._sampling_key:
+            key = self._sampling_key(Request(scope))
+            if key is not None:
+                return zlib.crc32(key.encode("utf-8")) < self._sample_rate * 2**32
+        return random.uniform(0.0, 1.0) <= self._sample_rate
+
+    def _log_captured(
+        self, scope: Scope, request_body: List[bytes], response_body: List[bytes]
+    ):
+        """Parses the captured bodies and logs them as records"""
+        try:
+            self._log_to_rubrix(
+                json.loads(b"".join(request_body)),
+                json.loads(b"".join(response_body)),
+                str(URL(scope=scope)),
             )
-        else:
-            body = response.body
-        return new_response, json.loads(body)
+        except Exception as ex:
+            _logger.error("Error sending records to rubrix", exc_info=ex)
 
     def _log_to_rubrix(
         self,
@@ -182,4 +199,12 @@ class RubrixLogHTTPMiddleware(BaseHTTPMiddleware):
         if records:
             for r in records:
                 r.prediction_agent = url
-            rubrix.log(records=records, name=self._dataset, tags=tags)
+            MonitorLogBuffer.get_instance().add(records, name=self._dataset, tags=tags)
+
+
+def _header(scope_or_message: Union[Scope, Message], name: bytes) -> bytes:
+    """The value of a header in an ASGI scope or response start message"""
+    for key, value in scope_or_message.get("headers", []):
+        if key.lower() == name:
+            return value
+    return b""
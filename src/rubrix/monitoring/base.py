@@ -1,19 +1,10 @@
-import asyncio
 import random
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import wrapt
 
-from rubrix.monitoring.helpers import start_loop_in_thread
-
-_LOGGING_LOOP = None
-
-
-def _get_current_loop():
-    global _LOGGING_LOOP
-    if not _LOGGING_LOOP:
-        _LOGGING_LOOP = start_loop_in_thread()
-    return _LOGGING_LOOP
+from rubrix.client.models import Record
+from rubrix.monitoring.log_buffer import MonitorLogBuffer
 
 
 class ModelNotSupportedError(Exception):
@@ -68,11 +59,18 @@ class BaseMonitor(wrapt.ObjectProxy):
     def _log2rubrix(self, *args, **kwargs):
         raise NotImplementedError()
 
-    def log_async(self, *args, **kwargs):
-        wrapped_func = self._log2rubrix
-        loop = _get_current_loop()
-
-        async def f():
-            return wrapped_func(*args, **kwargs)
+    def _log_records(
+        self,
+        records: List[Record],
+        name: str,
+        tags: Optional[Dict[str, str]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        """Sends the records to the shared log buffer, which logs them into rubrix in bulk"""
+        MonitorLogBuffer.get_instance().add(
+            records, name=name, tags=tags, metadata=metadata
+        )
 
-        asyncio.run_coroutine_threadsafe(f(), loop)
+    def log_async(self, *args, **kwargs):
+        """Queues the monitored data in the shared log buffer, to be logged in background"""
+        MonitorLogBuffer.get_instance().submit(self._log2rubrix, *args, **kwargs)
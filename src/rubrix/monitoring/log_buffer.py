@@ -0,0 +1,449 @@
+#  coding=utf-8
+#  Copyright 2021-present, the Recognai S.L. team.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import rubrix
+from rubrix.client.models import Record
+from rubrix.monitoring.spool import MonitorSpool
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class OverflowPolicy(str, Enum):
+    """
+    What to do when the log buffer is full
+
+    drop_oldest:
+        The oldest pending data is discarded to make room for the new one
+    drop_new:
+        The new data is discarded
+    block:
+        The caller waits until there is room for the new data
+    """
+
+    drop_oldest = "drop_oldest"
+    drop_new = "drop_new"
+    block = "block"
+
+
+class _PendingLog:
+    """The records pending to be logged into a dataset, with the same tags and metadata"""
+
+    def __init__(
+        self,
+        name: str,
+        tags: Optional[Dict[str, str]],
+        metadata: Optional[Dict[str, Any]],
+    ):
+        self.name = name
+        self.tags = tags
+        self.metadata = metadata
+        self.records: List[Record] = []
+
+
+class MonitorLogBuffer:
+    """
+    A buffer shared by the model monitors. Accumulates the monitored records and
+    logs them into Rubrix in a few big requests, instead of one per monitored call.
+
+    Monitored calls are queued with ``submit`` and turned into records in a background
+    thread, so monitoring never blocks the monitored model. Pending records are logged
+    once they reach ``max_batch_size``, or once the oldest of them has waited for
+    ``max_latency_ms``, with up to ``max_concurrent_logs`` requests at a time. Whatever
+    is still pending is logged on the interpreter exit.
+
+    Both the queued calls and the pending records are bounded by ``max_pending``. Once
+    reached, the ``overflow`` policy decides what to drop, or whether to wait. See
+    ``stats`` for the backlog and drop counters.
+
+    With a ``spool``, records are written into the local spool instead, and its
+    shipper logs them into Rubrix, so they survive a slow or down server.
+
+    Args:
+        max_batch_size: The number of pending records that triggers a log.
+            Defaults to the ``RUBRIX_MONITOR_MAX_BATCH_SIZE`` environment variable, or 500.
+        max_latency_ms: The max time, in milliseconds, a record stays pending.
+            Defaults to the ``RUBRIX_MONITOR_MAX_LATENCY_MS`` environment variable, or 1000.
+        max_pending: The max number of queued calls, and of pending records.
+            Defaults to the ``RUBRIX_MONITOR_MAX_PENDING`` environment variable, or 10000.
+        overflow: The policy applied once ``max_pending`` is reached. Defaults to the
+            ``RUBRIX_MONITOR_OVERFLOW`` environment variable, or "drop_oldest".
+        max_concurrent_logs: The max number of concurrent log requests. Defaults to the
+            ``RUBRIX_MONITOR_MAX_CONCURRENT_LOGS`` environment variable, or 2.
+        spool: An optional local spool for the records. The shared buffer uses a spool
+            under the ``RUBRIX_MONITOR_SPOOL_DIR`` environment variable, if defined. The
+            directory can be shared by several processes, like the workers of a server.
+    """
+
+    _INSTANCE: Optional["MonitorLogBuffer"] = None
+    _INSTANCE_LOCK = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> "MonitorLogBuffer":
+        """The log buffer shared by all the monitors"""
+        with cls._INSTANCE_LOCK:
+            if cls._INSTANCE is None:
+                spool_dir = os.getenv("RUBRIX_MONITOR_SPOOL_DIR")
+                cls._INSTANCE = cls(
+                    spool=MonitorSpool(spool_dir) if spool_dir else None
+                )
+        return cls._INSTANCE
+
+    def __init__(
+        self,
+        max_batch_size: Optional[int] = None,
+        max_latency_ms: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        overflow: Optional[OverflowPolicy] = None,
+        max_concurrent_logs: Optional[int] = None,
+        spool: Optional[MonitorSpool] = None,
+    ):
+        self.max_batch_size = max_batch_size or int(
+            os.getenv("RUBRIX_MONITOR_MAX_BATCH_SIZE", 500)
+        )
+        self.max_latency_ms = max_latency_ms or int(
+            os.getenv("RUBRIX_MONITOR_MAX_LATENCY_MS", 1000)
+        )
+        self.max_pending = max_pending or int(
+            os.getenv("RUBRIX_MONITOR_MAX_PENDING", 10000)
+        )
+        self.overflow = OverflowPolicy(
+            overflow or os.getenv("RUBRIX_MONITOR_OVERFLOW", OverflowPolicy.drop_oldest)
+        )
+        self.max_concurrent_logs = max_concurrent_logs or int(
+            os.getenv("RUBRIX_MONITOR_MAX_CONCURRENT_LOGS", 2)
+        )
+        assert self.max_batch_size > 0, "Wrong max batch size. Set a positive value."
+        assert self.max_latency_ms > 0, "Wrong max latency. Set a positive value."
+        assert self.max_pending > 0, "Wrong max pending. Set a positive value."
+        assert (
+            self.max_concurrent_logs > 0
+        ), "Wrong max concurrent logs. Set a positive value."
+        self.spool = spool
+
+        self._calls = queue.Queue(maxsize=self.max_pending)
+        self._condition = threading.Condition()
+        self._pending: Dict[Tuple[str, str, str], _PendingLog] = {}
+        self._pending_records = 0
+        self._oldest_record_at: Optional[float] = None
+        self._closed = False
+
+        self._in_flight: Set[Future] = set()
+        self._in_flight_records = 0
+        self._log_slots = threading.BoundedSemaphore(self.max_concurrent_logs)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_logs,
+            thread_name_prefix=MonitorLogBuffer.__name__,
+        )
+        self._counters = {
+            "logged": 0,
+            "failed": 0,
+            "dropped_calls": 0,
+            "dropped_records": 0,
+        }
+
+        self._collector = threading.Thread(
+            target=self.__collector__,
+            name=f"{MonitorLogBuffer.__name__}-collector",
+            daemon=True,
+        )
+        self._collector.start()
+        self._worker = threading.Thread(
+            target=self.__worker__, name=MonitorLogBuffer.__name__, daemon=True
+        )
+        self._worker.start()
+        atexit.register(self.close)
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> bool:
+        """
+        Queues a monitored call, which will add its records to the buffer from a
+        background thread
+
+        Args:
+            func: The function building and adding the records. Usually a monitor ``_log2rubrix``
+            *args: The function positional args
+            **kwargs: The function keyword args
+
+        Returns:
+            False if the call was dropped because the buffer is full, True otherwise
+        """
+        if self._closed:
+            func(*args, **kwargs)
+            return True
+
+        call = (func, args, kwargs)
+        if self.overflow == OverflowPolicy.block:
+            self._calls.put(call)
+            return True
+
+        while True:
+            try:
+                self._calls.put_nowait(call)
+                return True
+            except queue.Full:
+                if self.overflow == OverflowPolicy.drop_new:
+                    self._count("dropped_calls")
+                    return False
+            try:
+                self._calls.get_nowait()
+                self._calls.task_done()
+                self._count("dropped_calls")
+            except queue.Empty:
+                pass
+
+    def add(
+        self,
+        records: List[Record],
+        name: str,
+        tags: Optional[Dict[str, str]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Adds records to be logged into a dataset
+
+        Args:
+            records: The records to log
+            name: The dataset name
+            tags: The dataset tags, passed on to ``rubrix.log``
+            metadata: The dataset metadata, passed on to ``rubrix.log``
+        """
+        if not records:
+            return
+
+        with self._condition:
+            if not self._closed:
+                records = self._make_room(records)
+                if records:
+                    key = (name, _json_key(tags), _json_key(metadata))
+                    pending = self._pending.get(key)
+                    if pending is None:
+                        pending = self._pending[key] = _PendingLog(name, tags, metadata)
+                    pending.records.extend(records)
+
+                    self._pending_records += len(records)
+                    if self._oldest_record_at is None:
+                        self._oldest_record_at = time.monotonic()
+                    self._condition.notify_all()
+                return
+
+        # Once closed, records are logged right away
+        pending = _PendingLog(name, tags, metadata)
+        pending.records.extend(records)
+        self._log(pending)
+
+    def flush(self):
+        """Logs all the queued calls and pending records, and waits until they are logged"""
+        self._calls.join()
+        with self._condition:
+            pending_logs = self._take_pending()
+            in_flight = set(self._in_flight)
+        for pending in pending_logs:
+            self._log(pending)
+        wait(in_flight)
+
+    def close(self):
+        """Logs the pending records, and stops the background threads"""
+        if self._closed:
+            return
+        atexit.unregister(self.close)
+        self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._calls.put(None)
+        self._collector.join(timeout=self.max_latency_ms / 1000)
+        # the worker logs what it took out of the buffer before leaving
+        self._worker.join()
+        self.flush()
+        self._executor.shutdown(wait=True)
+        if self.spool:
+            self.spool.close()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        The buffer counters:
+
+        - ``backlog``: the queued calls, waiting to be turned into records
+        - ``pending``: the records waiting to be logged
+        - ``in_flight``: the records being logged
+        - ``logged`` and ``failed``: the records logged into rubrix, or into the spool
+          if any, or failed to
+        - ``dropped_calls`` and ``dropped_records``: the calls and records discarded
+          by the overflow policy
+        """
+        with self._condition:
+            return {
+                "backlog": self._calls.qsize(),
+                "pending": self._pending_records,
+                "in_flight": self._in_flight_records,
+                **self._counters,
+            }
+
+    def _make_room(self, records: List[Record]) -> List[Record]:
+        """
+        Applies the overflow policy for the new records, and returns the ones
+        that can be added. Must be called holding the lock
+        """
+        if self.overflow == OverflowPolicy.block:
+            while (
+                not self._closed
+                and self._pending_records
+                and self._pending_records + len(records) > self.max_pending
+            ):
+                self._condition.wait()
+            return records
+
+        room = self.max_pending - self._pending_records
+        if len(records) <= room:
+            return records
+
+        if self.overflow == OverflowPolicy.drop_new:
+            self._counters["dropped_records"] += len(records) - max(room, 0)
+            return records[: max(room, 0)]
+
+        if len(records) > self.max_pending:
+            self._counters["dropped_records"] += len(records) - self.max_pending
+            records = records[-self.max_pending :]
+        to_drop = len(records) - room
+        self._counters["dropped_records"] += to_drop
+        self._pending_records -= to_drop
+        for key in list(self._pending):
+            pending = self._pending[key]
+            dropped = min(to_drop, len(pending.records))
+            del pending.records[:dropped]
+            if not pending.records:
+                del self._pending[key]
+            to_drop -= dropped
+            if not to_drop:
+                break
+        return records
+
+    def _take_pending(self) -> List[_PendingLog]:
+        """Takes the pending records out of the buffer. Must be called holding the lock"""
+        pending_logs = list(self._pending.values())
+        self._pending.clear()
+        self._pending_records = 0
+        self._oldest_record_at = None
+        self._condition.notify_all()
+        return pending_logs
+
+    def _wait_for_flush(self):
+        """Waits until the pending records must be logged. Must be called holding the lock"""
+        max_latency = self.max_latency_ms / 1000
+        while not self._closed and self._pending_records < self.max_batch_size:
+            if self._oldest_record_at is None:
+                self._condition.wait()
+                continue
+            remaining = self._oldest_record_at + max_latency - time.monotonic()
+            if remaining <= 0:
+                return
+            self._condition.wait(remaining)
+
+    def __collector__(self):
+        while True:
+            call = self._calls.get()
+            try:
+                if call is None:
+                    return
+                func, args, kwargs = call
+                func(*args, **kwargs)
+            except Exception as ex:
+                _LOGGER.error("Cannot build the monitored records", exc_info=ex)
+            finally:
+                self._calls.task_done()
+
+    def __worker__(self):
+        while True:
+            with self._condition:
+                self._wait_for_flush()
+                closed = self._closed
+                pending_logs = self._take_pending()
+            for pending in pending_logs:
+                self._log_in_background(pending)
+            if closed:
+                return
+
+    def _log_in_background(self, pending: _PendingLog):
+        """
+        Logs the records from the executor, waiting for a free log slot. Once the buffer
+        is closing, or the executor is shut down (on the interpreter exit, executors are
+        shut down before the buffer is closed), the records are logged right away
+        """
+        self._log_slots.acquire()
+        with self._condition:
+            self._in_flight_records += len(pending.records)
+            future = None
+            if not self._closed:
+                try:
+                    future = self._executor.submit(self._log, pending)
+                    self._in_flight.add(future)
+                except RuntimeError:
+                    pass
+
+        def release(done: Optional[Future]):
+            with self._condition:
+                self._in_flight.discard(done)
+                self._in_flight_records -= len(pending.records)
+            self._log_slots.release()
+
+        if future is not None:
+            future.add_done_callback(release)
+            return
+
+        try:
+            self._log(pending)
+        finally:
+            release(None)
+
+    def _log(self, pending: _PendingLog):
+        try:
+            if self.spool:
+                self.spool.write(
+                    pending.records,
+                    name=pending.name,
+                    tags=pending.tags,
+                    metadata=pending.metadata,
+                )
+            else:
+                rubrix.log(
+                    pending.records,
+                    name=pending.name,
+                    tags=pending.tags,
+                    metadata=pending.metadata,
+                    verbose=False,
+                )
+            self._count("logged", len(pending.records))
+        except Exception as ex:
+            self._count("failed", len(pending.records))
+            _LOGGER.error("Error sending records to rubrix", exc_info=ex)
+
+    def _count(self, counter: str, value: int = 1):
+        with self._condition:
+            self._counters[counter] += value
+
+
+def _json_key(data: Optional[Dict[str, Any]]) -> str:
+    """A hashable key for the dataset tags and metadata"""
+    return json.dumps(data, sort_keys=True, default=str)
@@ -0,0 +1,503 @@
+#  coding=utf-8
+#  Copyright 2021-present, the Recognai S.L. team.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import rubrix
+from rubrix.client.models import (
+    Record,
+    Text2TextRecord,
+    TextClassificationRecord,
+    TokenClassificationRecord,
+)
+from rubrix.client.sdk.commons.errors import RubrixApiResponseError
+
+_LOGGER = logging.getLogger(__name__)
+
+_RECORD_TYPES = {
+    record_type.__name__: record_type
+    for record_type in [
+        TextClassificationRecord,
+        TokenClassificationRecord,
+        Text2TextRecord,
+    ]
+}
+
+
+class MonitorSpool:
+    """
+    A local, write-ahead spool for monitored records.
+
+    Records are appended to segment files under ``directory``, which is cheap and does
+    not depend on the Rubrix server. A background shipper replays the full segments,
+    oldest first, into Rubrix in big batches, and removes them once logged. If the
+    server is slow or down, the shipper retries with an exponential backoff, and the
+    records wait on disk, even across restarts. Records are logged at least once: a
+    segment failing in the middle is fully replayed.
+
+    Lines that cannot be decoded (a segment truncated by a crash, for example) are
+    skipped. A segment rejected by the server (a 4xx error other than an auth one), or
+    failing ``max_attempts`` times in a row, is quarantined: renamed with a ``.failed``
+    suffix and never shipped again, so it does not hold back the later segments.
+
+    Several processes can share the spool directory. Each spool writes and ships the
+    segments of its own process directory, named after the process id and locked
+    while the spool is open. The segments left by dead processes, whose process
+    directories are not locked anymore, are adopted by the live spools.
+
+    Args:
+        directory: The spool directory. Created if missing
+        max_segment_bytes: The size from which the segment being written is closed,
+            and a new one is started
+        max_total_bytes: The max disk usage of the process directory. Once reached, the
+            oldest segments are discarded
+        batch_size: The number of records sent per bulk request when shipping
+        min_backoff: The seconds to wait before retrying a failed segment. Doubled on
+            every consecutive failure
+        max_backoff: The max seconds to wait before retrying a failed segment
+        max_attempts: The shipments of a segment before quarantining it
+    """
+
+    SEGMENT_SUFFIX = ".spool"
+    OPEN_SEGMENT_SUFFIX = ".open"
+    FAILED_SEGMENT_SUFFIX = ".failed"
+    LOCK_FILE_NAME = ".lock"
+
+    def __init__(
+        self,
+        directory: str,
+        max_segment_bytes: int = 8 * 1024 * 1024,
+        max_total_bytes: int = 512 * 1024 * 1024,
+        batch_size: int = 500,
+        min_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+        max_attempts: int = 5,
+    ):
+        assert (
+            0 < max_segment_bytes <= max_total_bytes
+        ), "Wrong spool sizes. Segment size must be positive, and not above the total size."
+
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_total_bytes = max_total_bytes
+        self.batch_size = batch_size
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.segments_directory, self._directory_lock = self._lock_process_directory()
+        self._lock = threading.Lock()
+        self._segment: Optional[IO[str]] = None
+        self._segment_path: Optional[str] = None
+        self._segment_bytes = 0
+        self._segment_sequence = 0
+        self._counters = {
+            "shipped_records": 0,
+            "dropped_records": 0,
+            "dropped_segments": 0,
+            "failed_shipments": 0,
+            "skipped_lines": 0,
+            "quarantined_segments": 0,
+        }
+        # Consecutive failed shipments of the segment at the head of the spool
+        self._attempts: Dict[str, int] = {}
+
+        # Segments left open by a previous process with the same id are ready to ship
+        for file_name in os.listdir(self.segments_directory):
+            if file_name.endswith(self.OPEN_SEGMENT_SUFFIX):
+                path = os.path.join(self.segments_directory, file_name)
+                os.replace(
+                    path, path[: -len(self.OPEN_SEGMENT_SUFFIX)] + self.SEGMENT_SUFFIX
+                )
+        self._total_bytes = sum(
+            os.path.getsize(path)
+            for path in self._failed_segments() + self._ready_segments()
+        )
+        self._adopt_orphans()
+
+        self._stop = threading.Event()
+        self._shipper = threading.Thread(
+            target=self.__shipper__, name=MonitorSpool.__name__, daemon=True
+        )
+        self._shipper.start()
+
+    def write(
+        self,
+        records: List[Record],
+        name: str,
+        tags: Optional[Dict[str, str]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Appends records to the spool
+
+        Args:
+            records: The records to log
+            name: The dataset name
+            tags: The dataset tags, passed on to ``rubrix.log``
+            metadata: The dataset metadata, passed on to ``rubrix.log``
+        """
+        lines = []
+        for record_type, typed_records in _group_by_type(records).items():
+            lines.append(
+                json.dumps(
+                    {
+                        "name": name,
+                        "tags": tags,
+                        "metadata": metadata,
+                        "type": record_type,
+                        "records": [record.dict() for record in typed_records],
+                    },
+                    default=str,
+                )
+                + "\n"
+            )
+        data = "".join(lines)
+        size = len(data.encode("utf-8"))
+
+        with self._lock:
+            if not self._make_room(size):
+                self._counters["dropped_records"] += len(records)
+                return
+            if self._segment is None:
+                self._open_segment()
+            self._segment.write(data)
+            self._segment.flush()
+            self._segment_bytes += size
+            self._total_bytes += size
+            if self._segment_bytes >= self.max_segment_bytes:
+                self._close_segment()
+
+    def close(self):
+        """Stops the shipper. Not shipped records are kept on disk, for the next spool"""
+        self._stop.set()
+        self._shipper.join(timeout=self.max_backoff)
+        with self._lock:
+            self._close_segment()
+            if self._directory_lock is None:
+                return
+            if os.listdir(self.segments_directory) == [self.LOCK_FILE_NAME]:
+                _remove_process_directory(self.segments_directory)
+            os.close(self._directory_lock)
+            self._directory_lock = None
+
+    def stats(self) -> Dict[str, int]:
+        """The spool disk usage and counters"""
+        with self._lock:
+            return {
+                "spooled_bytes": self._total_bytes,
+                "segments": len(self._ready_segments()) + (self._segment is not None),
+                **self._counters,
+            }
+
+    def _lock_process_directory(self) -> Tuple[str, int]:
+        """
+        Creates and locks the directory for the segments of this process. Returns the
+        directory path and the lock file descriptor
+        """
+        pid, sequence = os.getpid(), 0
+        while True:
+            path = os.path.join(
+                self.directory, f"{pid}.{sequence}" if sequence else str(pid)
+            )
+            os.makedirs(path, exist_ok=True)
+            lock = _lock_file(os.path.join(path, self.LOCK_FILE_NAME))
+            if lock is not None:
+                return path, lock
+            if os.path.isdir(path):
+                # Used by another spool with the same process id
+                sequence += 1
+
+    def _adopt_orphans(self):
+        """
+        Moves the segments of the process directories no longer locked, left by dead
+        processes, into the process directory of this spool
+        """
+        for file_name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, file_name)
+            lock_path = os.path.join(path, self.LOCK_FILE_NAME)
+            if path == self.segments_directory or not os.path.isfile(lock_path):
+                continue
+            lock = _lock_file(lock_path)
+            if lock is None:
+                continue
+            try:
+                with self._lock:
+                    adopted = self._adopt_segments(path)
+                _remove_process_directory(path)
+            except OSError as ex:
+                _LOGGER.warning(
+                    f"Cannot adopt monitoring spool directory {path} ({ex!r})"
+                )
+                continue
+            finally:
+                os.close(lock)
+            if adopted:
+                _LOGGER.info(
+                    f"Adopted {adopted} monitoring segments left by a dead process in {path}"
+                )
+
+    def _adopt_segments(self, path: str) -> int:
+        """Moves the segments of an orphan process directory. Must be called holding the lock"""
+        adopted = 0
+        for file_name in sorted(os.listdir(path)):
+            target_name = file_name
+            if file_name.endswith(self.OPEN_SEGMENT_SUFFIX):
+                target_name = (
+                    file_name[: -len(self.OPEN_SEGMENT_SUFFIX)] + self.SEGMENT_SUFFIX
+                )
+            elif not file_name.endswith(
+                (self.SEGMENT_SUFFIX, self.FAILED_SEGMENT_SUFFIX)
+            ):
+                continue
+            segment = os.path.join(path, file_name)
+            size = os.path.getsize(segment)
+            os.replace(segment, os.path.join(self.segments_directory, target_name))
+            self._total_bytes += size
+            adopted += 1
+        return adopted
+
+    def _make_room(self, size: int) -> bool:
+        """
+        Discards the quarantined segments, and then the oldest full segments, until
+        the new data fits in the spool. Returns False if it does not fit anyway.
+        Must be called holding the lock
+        """
+        if self._total_bytes + size <= self.max_total_bytes:
+            return True
+        for path in self._failed_segments() + self._ready_segments():
+            if self._total_bytes + size <= self.max_total_bytes:
+                break
+            try:
+                segment_size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                # Just shipped
+                continue
+            self._total_bytes -= segment_size
+            self._counters["dropped_segments"] += 1
+            _LOGGER.warning(f"Monitoring spool is full. Discarding segment {path}")
+        return self._total_bytes + size <= self.max_total_bytes
+
+    def _open_segment(self):
+        """Starts a new segment. Must be called holding the lock"""
+        self._segment_sequence += 1
+        file_name = f"{time.time_ns():020d}-{self._segment_sequence:06d}"
+        self._segment_path = os.path.join(
+            self.segments_directory, file_name + self.OPEN_SEGMENT_SUFFIX
+        )
+        self._segment = open(self._segment_path, "a", encoding="utf-8")
+        self._segment_bytes = 0
+
+    def _close_segment(self):
+        """Closes the current segment, making it ready to ship. Must be called holding the lock"""
+        if self._segment is None:
+            return
+        self._segment.close()
+        os.replace(
+            self._segment_path,
+            self._segment_path[: -len(self.OPEN_SEGMENT_SUFFIX)] + self.SEGMENT_SUFFIX,
+        )
+        self._segment = None
+        self._segment_path = None
+        self._segment_bytes = 0
+
+    def _ready_segments(self) -> List[str]:
+        """The full segment paths, oldest first"""
+        return [
+            os.path.join(self.segments_directory, file_name)
+            for file_name in sorted(os.listdir(self.segments_directory))
+            if file_name.endswith(self.SEGMENT_SUFFIX)
+        ]
+
+    def _failed_segments(self) -> List[str]:
+        """The quarantined segment paths, oldest first"""
+        return [
+            os.path.join(self.segments_directory, file_name)
+            for file_name in sorted(os.listdir(self.segments_directory))
+            if file_name.endswith(self.FAILED_SEGMENT_SUFFIX)
+        ]
+
+    def _next_segment(self) -> Optional[str]:
+        """
+        The next segment to ship. If there are no full segments, the current one is
+        closed, or the segments left by dead processes are adopted
+        """
+        with self._lock:
+            segments = self._ready_segments()
+            if not segments and self._segment_bytes:
+                self._close_segment()
+                segments = self._ready_segments()
+        if not segments:
+            self._adopt_orphans()
+            with self._lock:
+                segments = self._ready_segments()
+        return segments[0] if segments else None
+
+    def __shipper__(self):
+        backoff = self.min_backoff
+        while not self._stop.is_set():
+            segment = self._next_segment()
+            if segment is None:
+                self._stop.wait(self.min_backoff)
+                continue
+            try:
+                self._ship(segment)
+                self._attempts.pop(segment, None)
+                backoff = self.min_backoff
+            except FileNotFoundError:
+                # Discarded while shipping
+                self._attempts.pop(segment, None)
+                continue
+            except Exception as ex:
+                with self._lock:
+                    self._counters["failed_shipments"] += 1
+                attempts = self._attempts.pop(segment, 0) + 1
+                if attempts >= self.max_attempts or not _is_retryable(ex):
+                    self._quarantine(segment, ex)
+                    backoff = self.min_backoff
+                    continue
+                self._attempts[segment] = attempts
+                _LOGGER.warning(
+                    f"Cannot ship monitoring segment {segment} ({ex!r}). "
+                    f"Retrying in {backoff}s"
+                )
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    def _quarantine(self, segment: str, error: Exception):
+        """Moves a segment out of the shipping queue, keeping it on disk for inspection"""
+        with self._lock:
+            try:
+                os.replace(
+                    segment,
+                    segment[: -len(self.SEGMENT_SUFFIX)] + self.FAILED_SEGMENT_SUFFIX,
+                )
+            except FileNotFoundError:
+                # Discarded meanwhile
+                return
+            self._counters["quarantined_segments"] += 1
+        _LOGGER.warning(
+            f"Cannot ship monitoring segment {segment} ({error!r}). "
+            "Quarantined as failed"
+        )
+
+    def _ship(self, segment: str):
+        """Logs the segment records into rubrix, and removes the segment"""
+        logs: Dict[Tuple[str, str, str, str], Tuple[Dict[str, Any], List[Record]]] = {}
+        skipped_lines = 0
+        with open(segment, encoding="utf-8") as segment_file:
+            for line in segment_file:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    record_type = _RECORD_TYPES[entry["type"]]
+                    key = (
+                        entry["name"],
+                        entry["type"],
+                        json.dumps(entry["tags"], sort_keys=True),
+                        json.dumps(entry["metadata"], sort_keys=True),
+                    )
+                    entry_records = [
+                        record_type.parse_obj(record) for record in entry["records"]
+                    ]
+                except (ValueError, TypeError, KeyError) as ex:
+                    # A line half written before a crash, for example
+                    skipped_lines += 1
+                    _LOGGER.warning(
+                        f"Skipping an undecodable line of monitoring segment {segment} ({ex!r})"
+                    )
+                    continue
+                _, records = logs.setdefault(key, (entry, []))
+                records.extend(entry_records)
+
+        for entry, records in logs.values():
+            rubrix.log(
+                records,
+                name=entry["name"],
+                tags=entry["tags"],
+                metadata=entry["metadata"],
+                chunk_size=self.batch_size,
+                verbose=False,
+            )
+
+        with self._lock:
+            size = os.path.getsize(segment)
+            os.remove(segment)
+            self._total_bytes -= size
+            self._counters["shipped_records"] += sum(
+                len(records) for _, records in logs.values()
+            )
+            self._counters["skipped_lines"] += skipped_lines
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Client errors from the server, other than auth ones, won't pass on a retry"""
+    if not isinstance(error, RubrixApiResponseError):
+        return True
+    status = getattr(error, "HTTP_STATUS", 500)
+    return not 400 <= status < 500 or status in (401, 403)
+
+
+def _lock_file(path: str) -> Optional[int]:
+    """
+    Opens and exclusively locks a file, without waiting. Returns the file descriptor,
+    or None if the file is locked by another spool, or removed meanwhile
+    """
+    try:
+        lock = os.open(path, os.O_RDWR | os.O_CREAT)
+    except FileNotFoundError:
+        return None
+    try:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(lock, msvcrt.LK_NBLCK, 1)
+        # An adopting spool may have removed the file before it was locked here
+        if os.stat(path).st_ino == os.fstat(lock).st_ino:
+            return lock
+    except OSError:
+        pass
+    os.close(lock)
+    return None
+
+
+def _remove_process_directory(path: str):
+    """Removes an empty process directory and its lock file, while holding the lock"""
+    try:
+        os.remove(os.path.join(path, MonitorSpool.LOCK_FILE_NAME))
+        os.rmdir(path)
+    except OSError as ex:
+        _LOGGER.warning(f"Cannot remove monitoring spool directory {path} ({ex!r})")
+
+
+def _group_by_type(records: List[Record]) -> Dict[str, List[Record]]:
+    groups = {}
+    for record in records:
+        groups.setdefault(type(record).__name__, []).append(record)
+    return groups
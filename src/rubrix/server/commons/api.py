@@ -1,9 +1,19 @@
 from dataclasses import dataclass
+from typing import Any, Callable
 
-from fastapi import Header, Query
+from fastapi import Header, Query, Request, Response
+from fastapi.routing import APIRoute
 
 from rubrix._constants import RUBRIX_WORKSPACE_HEADER_NAME
 
+try:
+    from orjson import loads as json_loads
+except ModuleNotFoundError:
+    try:
+        from ujson import loads as json_loads
+    except ModuleNotFoundError:
+        from json import loads as json_loads
+
 
 @dataclass
 class CommonTaskQueryParams:
@@ -21,3 +31,28 @@ class CommonTaskQueryParams:
     def workspace(self) -> str:
         """Return read workspace. Query param prior to header param"""
         return self.__workspace_param__ or self.__workspace_header__
+
+
+class FastJsonRequest(Request):
+    """A request decoding json bodies with the fastest json parser available"""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = json_loads(await self.body())
+        return self._json
+
+
+class FastJsonRoute(APIRoute):
+    """
+    An api route parsing request bodies with ``FastJsonRequest``. Used by
+    routes receiving big payloads, like records bulk data
+    """
+
+    def get_route_handler(self) -> Callable:
+        route_handler = super().get_route_handler()
+
+        async def fast_json_route_handler(request: Request) -> Response:
+            request = FastJsonRequest(request.scope, request.receive)
+            return await route_handler(request)
+
+        return fast_json_route_handler
@@ -166,6 +166,15 @@ class MissingDatasetRecordsError(BadRequestError):
         self.message = message
 
 
+class StaleDatasetError(RubrixServerError):
+    """Error raised when records were ingested with dataset info changed by another process"""
+
+    HTTP_STATUS = status.HTTP_409_CONFLICT
+
+    def __init__(self, name: str):
+        self.name = name
+
+
 __ALL__ = [
     BadRequestError,
     EntityNotFoundError,
@@ -175,4 +184,5 @@ __ALL__ = [
     GenericRubrixServerError,
     ClosedDatasetError,
     MissingDatasetRecordsError,
+    StaleDatasetError,
 ]
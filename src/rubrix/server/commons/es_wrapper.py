@@ -13,12 +13,19 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-from typing import Any, Callable, Dict, Iterable, List, Optional
+import asyncio
+import itertools
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import deprecated
 from opensearchpy import NotFoundError, OpenSearch, OpenSearchException, RequestError
-from opensearchpy.helpers import bulk as es_bulk
+from opensearchpy.helpers import expand_action
 from opensearchpy.helpers import scan as es_scan
+from opensearchpy.helpers import streaming_bulk as es_streaming_bulk
+from starlette.concurrency import run_in_threadpool
 
 from rubrix.logging import LoggingMixin
 from rubrix.server.commons.errors import InvalidTextSearchError
@@ -64,13 +71,19 @@ class ElasticsearchWrapper(LoggingMixin):
         """
 
         if cls._INSTANCE is None:
-            es_client = OpenSearch(hosts=settings.elasticsearch)
+            es_client = OpenSearch(
+                hosts=settings.elasticsearch,
+                maxsize=settings.es_connection_pool_maxsize,
+            )
             cls._INSTANCE = cls(es_client)
 
         return cls._INSTANCE
 
     def __init__(self, es_client: OpenSearch):
         self.__client__ = es_client
+        self._bulk_executor = ThreadPoolExecutor(
+            max_workers=settings.es_bulk_threads, thread_name_prefix="es-bulk"
+        )
 
     @property
     def client(self):
@@ -146,22 +159,8 @@ class ElasticsearchWrapper(LoggingMixin):
                 rest_total_hits_as_int=True,
                 size=size,
             )
-        except RequestError as rex:
-
-            if rex.error == "search_phase_execution_exception":
-                detail = rex.info["error"]
-                detail = detail.get("root_cause")
-                detail = detail[0].get("reason") if detail else rex.info["error"]
-
-                raise InvalidTextSearchError(detail)
-
-            if rex.error == "index_closed_exception":
-                raise ClosedIndexError(index)
-            raise GenericSearchError(rex)
-        except NotFoundError as nex:
-            raise IndexNotFoundError(nex)
         except OpenSearchException as ex:
-            raise GenericSearchError(ex)
+            raise _search_error(index, ex)
 
     def create_index(
         self,
@@ -287,11 +286,18 @@ class ElasticsearchWrapper(LoggingMixin):
         documents: List[Dict[str, Any]],
         routing: Callable[[Dict[str, Any]], str] = None,
         doc_id: Callable[[Dict[str, Any]], str] = None,
-    ) -> int:
+        extra_actions: Iterable[Dict[str, Any]] = (),
+        refresh: Union[bool, str] = "wait_for",
+        extra_failures: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Adds or updated a set of documents to an index. Documents can contains
         partial information of document.
 
+        Documents are sent in bulk requests of at most ``settings.es_bulk_max_bytes``,
+        up to ``settings.es_bulk_threads`` requests at once. Documents rejected with
+        a 429 status are retried with an exponential backoff.
+
         See <https://www.elastic.co/guide/en/elasticsearch/reference/current/docs-bulk.html>
 
         Parameters
@@ -302,36 +308,52 @@ class ElasticsearchWrapper(LoggingMixin):
             The set of documents
         routing:
             The routing key
-        doc_id
+        doc_id:
+            The document id resolver
+        extra_actions:
+            Other bulk actions sent in the same request, like partial updates of other documents
+        refresh:
+            The bulk refresh policy. By default, waits for the next index refresh,
+            so documents are searchable once the request finishes. Use False to skip the wait
+        extra_failures:
+            If provided, the failed extra actions are appended to this list,
+            with their index, id, status and error type
 
         Returns
         -------
-            The number of failed documents
-        """
-
-        def map_doc_2_action(doc: Dict[str, Any]) -> Dict[str, Any]:
-            """Configures bulk action"""
-            data = {
-                "_op_type": "index",
-                "_index": index,
-                "_routing": routing(doc) if routing else None,
-                **doc,
-            }
-
-            _id = doc_id(doc) if doc_id else None
-            if _id is not None:
-                data["_id"] = _id
+            The failed documents of the index, with their id, status and error reason
+        """
+
+        def send_batch(batch: List[Tuple[str, Optional[str]]]) -> List[Dict[str, Any]]:
+            return [
+                info
+                for _, info in es_streaming_bulk(
+                    self.__client__,
+                    batch,
+                    **_bulk_batch_params(batch),
+                    refresh=refresh,
+                )
+            ]
+
+        batches = _bulk_batches(
+            itertools.chain(
+                _bulk_actions(index, documents, routing=routing, doc_id=doc_id),
+                extra_actions,
+            ),
+            serializer=self.__client__.transport.serializer,
+        )
 
-            return data
+        failed, in_flight = [], deque()
+        for batch in batches:
+            if len(in_flight) >= settings.es_bulk_threads:
+                failed.extend(in_flight.popleft().result())
+            in_flight.append(self._bulk_executor.submit(send_batch, batch))
+        while in_flight:
+            failed.extend(in_flight.popleft().result())
 
-        success, failed = es_bulk(
-            self.__client__,
-            index=index,
-            actions=map(map_doc_2_action, documents),
-            raise_on_error=True,
-            refresh="wait_for",
+        return _bulk_failures(
+            index, failed, logger=self.logger, extra_failures=extra_failures
         )
-        return len(failed)
 
     def get_mapping(self, index: str) -> Dict[str, Any]:
         """
@@ -522,6 +544,45 @@ class ElasticsearchWrapper(LoggingMixin):
             index=index, body={"settings": {"index.blocks.write": read_only}}
         )
 
+    def update_index_settings(self, index: str, settings: Dict[str, Any]):
+        """
+        Updates the dynamic settings of an index. A None value restores the setting default
+
+        See `<https://www.elastic.co/guide/en/elasticsearch/reference/7.x/indices-update-settings.html>`_
+
+        Parameters
+        ----------
+        index:
+            The index name
+        settings:
+            The index settings, in flat format (`index.refresh_interval`, ...)
+
+        """
+        self.__client__.indices.put_settings(index=index, body={"settings": settings})
+
+    def refresh_index(self, index: str):
+        """Makes all the index operations performed so far available for search"""
+        self.__client__.indices.refresh(index=index)
+
+    def force_merge_index(self, index: str, max_num_segments: int = 1):
+        """
+        Merges the index segments, reducing their number. Only recommended for indices
+        that will not receive more writes for a while
+
+        See `<https://www.elastic.co/guide/en/elasticsearch/reference/7.x/indices-forcemerge.html>`_
+
+        Parameters
+        ----------
+        index:
+            The index name
+        max_num_segments:
+            The number of segments to merge to
+
+        """
+        self.__client__.indices.forcemerge(
+            index=index, max_num_segments=max_num_segments
+        )
+
     def create_field_mapping(
         self,
         index: str,
@@ -542,6 +603,328 @@ class ElasticsearchWrapper(LoggingMixin):
             return {"error": ex}
 
 
+class AsyncElasticsearchWrapper(LoggingMixin):
+    """
+    An elasticsearch client wrapper built on top of the async opensearch client.
+
+    Covers the operations used in the hot request paths (record searches and bulk
+    indexing), so they can be awaited without holding a server worker thread
+    during es I/O.
+    """
+
+    _INSTANCE = None
+
+    @classmethod
+    def get_instance(cls) -> "AsyncElasticsearchWrapper":
+        """
+        Creates an instance of AsyncElasticsearchWrapper.
+
+        This function is used in fastapi for resolve component dependencies.
+
+        Returns
+        -------
+            The async es wrapper instance
+
+        """
+        if cls._INSTANCE is None:
+            cls._INSTANCE = cls(
+                hosts=settings.elasticsearch,
+                maxsize=settings.es_connection_pool_maxsize,
+            )
+
+        return cls._INSTANCE
+
+    def __init__(self, **client_kwargs):
+        try:
+            from opensearchpy import AsyncOpenSearch
+        except ImportError:
+            raise ModuleNotFoundError(
+                "'aiohttp' must be installed to use the async elasticsearch client! "
+                "You can install it with the command: `pip install opensearch-py[async]`"
+            )
+        self.__client_class__ = AsyncOpenSearch
+        self.__client_kwargs__ = client_kwargs
+        self.__client__ = None
+        self.__loop__ = None
+
+    @property
+    def client(self):
+        """
+        The async elasticsearch client.
+
+        Client connections are bound to an event loop, so a new client is
+        created if the running loop changes (after an app restart, for example)
+        """
+        loop = asyncio.get_event_loop()
+        if self.__client__ is None or self.__loop__ is not loop:
+            self.__client__ = self.__client_class__(**self.__client_kwargs__)
+            self.__loop__ = loop
+        return self.__client__
+
+    async def close(self):
+        """Closes the client connections. Used on app shutdown"""
+        if self.__client__ is not None:
+            await self.__client__.close()
+            self.__client__ = None
+
+    async def index_exists(self, index: str) -> bool:
+        """
+        Checks if provided index exists
+
+        Parameters
+        ----------
+        index:
+            The index name
+
+        Returns
+        -------
+            True if index exists. False otherwise
+        """
+        return await self.client.indices.exists(index)
+
+    async def search(
+        self,
+        index: str,
+        routing: str = None,
+        size: int = 100,
+        query: Dict[str, Any] = None,
+    ) -> Dict[str, Any]:
+        """
+        Apply a search over a index. See ``ElasticsearchWrapper.search``
+
+        Parameters
+        ----------
+        index:
+            The index name
+        routing:
+            The routing key. Optional
+        size:
+            Number of results to return. Default=100
+        query:
+            The elasticsearch query. Optional
+
+        Returns
+        -------
+            The search response
+        """
+        try:
+            return await self.client.search(
+                index=index,
+                body=query or {},
+                routing=routing,
+                track_total_hits=True,
+                rest_total_hits_as_int=True,
+                size=size,
+            )
+        except OpenSearchException as ex:
+            raise _search_error(index, ex)
+
+    async def add_documents(
+        self,
+        index: str,
+        documents: List[Dict[str, Any]],
+        routing: Callable[[Dict[str, Any]], str] = None,
+        doc_id: Callable[[Dict[str, Any]], str] = None,
+        extra_actions: Iterable[Dict[str, Any]] = (),
+        refresh: Union[bool, str] = "wait_for",
+        extra_failures: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Adds or updated a set of documents to an index. See ``ElasticsearchWrapper.add_documents``
+
+        Parameters
+        ----------
+        index:
+            The index name
+        documents:
+            The set of documents
+        routing:
+            The routing key
+        doc_id:
+            The document id resolver
+        extra_actions:
+            Other bulk actions sent in the same request
+        refresh:
+            The bulk refresh policy
+        extra_failures:
+            If provided, the failed extra actions are appended to this list
+
+        Returns
+        -------
+            The failed documents of the index, with their id, status and error reason
+        """
+        from opensearchpy.helpers import async_streaming_bulk
+
+        client = self.client
+
+        async def send_batch(
+            batch: List[Tuple[str, Optional[str]]]
+        ) -> List[Dict[str, Any]]:
+            return [
+                info
+                async for _, info in async_streaming_bulk(
+                    client,
+                    batch,
+                    **_bulk_batch_params(batch),
+                    refresh=refresh,
+                )
+            ]
+
+        batches = _bulk_batches(
+            itertools.chain(
+                _bulk_actions(index, documents, routing=routing, doc_id=doc_id),
+                extra_actions,
+            ),
+            serializer=client.transport.serializer,
+        )
+
+        # batches are serialized one at a time in the threadpool, while up to
+        # es_bulk_threads of the previous ones are being sent
+        failed, in_flight = [], deque()
+        try:
+            while True:
+                batch = await run_in_threadpool(next, batches, None)
+                if batch is None:
+                    break
+                if len(in_flight) >= settings.es_bulk_threads:
+                    failed.extend(await in_flight.popleft())
+                in_flight.append(asyncio.ensure_future(send_batch(batch)))
+            while in_flight:
+                failed.extend(await in_flight.popleft())
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+        return _bulk_failures(
+            index, failed, logger=self.logger, extra_failures=extra_failures
+        )
+
+
+def _search_error(index: str, error: OpenSearchException) -> Exception:
+    """Translates an es search error into the corresponding wrapper error"""
+    if isinstance(error, RequestError):
+        if error.error == "search_phase_execution_exception":
+            detail = error.info["error"]
+            detail = detail.get("root_cause")
+            detail = detail[0].get("reason") if detail else error.info["error"]
+
+            return InvalidTextSearchError(detail)
+
+        if error.error == "index_closed_exception":
+            return ClosedIndexError(index)
+        return GenericSearchError(error)
+    if isinstance(error, NotFoundError):
+        return IndexNotFoundError(error)
+    return GenericSearchError(error)
+
+
+def _bulk_actions(
+    index: str,
+    documents: Iterable[Dict[str, Any]],
+    routing: Callable[[Dict[str, Any]], str] = None,
+    doc_id: Callable[[Dict[str, Any]], str] = None,
+) -> Iterable[Dict[str, Any]]:
+    """Configures the bulk index actions for a set of documents"""
+    for doc in documents:
+        data = {
+            "_op_type": "index",
+            "_index": index,
+            "_routing": routing(doc) if routing else None,
+            **doc,
+        }
+
+        _id = doc_id(doc) if doc_id else None
+        if _id is not None:
+            data["_id"] = _id
+
+        yield data
+
+
+def _bulk_batches(
+    actions: Iterable[Dict[str, Any]],
+    serializer: Any,
+    max_bytes: Optional[int] = None,
+) -> Iterator[List[Tuple[str, Optional[str]]]]:
+    """
+    Serializes the bulk actions once, grouping them in batches of at most
+    ``max_bytes`` (``settings.es_bulk_max_bytes`` by default)
+    """
+    max_bytes = max_bytes or settings.es_bulk_max_bytes
+
+    batch, batch_bytes = [], 0
+    for action in actions:
+        action_line, data_line = expand_action(action)
+        lines = (
+            serializer.dumps(action_line),
+            serializer.dumps(data_line) if data_line is not None else None,
+        )
+        # the bulk body is newline delimited
+        action_bytes = sum(len(line.encode("utf-8")) + 1 for line in lines if line)
+        if batch and batch_bytes + action_bytes > max_bytes:
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(lines)
+        batch_bytes += action_bytes
+    if batch:
+        yield batch
+
+
+def _bulk_batch_params(batch: List[Tuple[str, Optional[str]]]) -> Dict[str, Any]:
+    """Common streaming bulk params for sending a serialized batch in a single request"""
+    return dict(
+        chunk_size=len(batch),
+        max_chunk_bytes=settings.es_bulk_max_bytes,
+        # actions are already serialized by `_bulk_batches`
+        expand_action_callback=lambda lines: lines,
+        raise_on_error=False,
+        max_retries=settings.es_bulk_max_retries,
+        initial_backoff=1,
+        max_backoff=30,
+        yield_ok=False,
+    )
+
+
+def _bulk_failures(
+    index: str,
+    failed: List[Dict[str, Any]],
+    logger: logging.Logger,
+    extra_failures: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Normalizes the failed bulk items of an index. Failures of actions
+    on other indices (the extra bulk actions) are logged, and collected
+    into ``extra_failures`` if provided
+    """
+    failures = []
+    for info in failed:
+        ((op_type, item),) = info.items()
+        error = item.get("error")
+        error_type = error.get("type") if isinstance(error, dict) else None
+        if isinstance(error, dict):
+            error = f"{error_type}: {error.get('reason')}"
+        if item.get("_index") != index:
+            logger.warning(
+                "Bulk %s action on index %s failed: %s",
+                op_type,
+                item.get("_index"),
+                error,
+            )
+            if extra_failures is not None:
+                extra_failures.append(
+                    {
+                        "index": item.get("_index"),
+                        "id": item.get("_id"),
+                        "status": item.get("status"),
+                        "type": error_type,
+                    }
+                )
+            continue
+        failures.append(
+            {"id": item.get("_id"), "status": item.get("status"), "reason": str(error)}
+        )
+    return failures
+
+
 _instance = None  # The singleton instance
 
 
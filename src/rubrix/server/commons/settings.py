@@ -17,7 +17,7 @@
 Common environment vars / settings
 """
 import logging
-from typing import List
+from typing import List, Optional
 from urllib.parse import urlparse
 
 from pydantic import BaseSettings, Field, validator
@@ -51,6 +51,49 @@ class ApiSettings(BaseSettings):
     disable_es_index_template_creation: (DISABLE_ES_INDEX_TEMPLATE_CREATION env var)
          Allowing advanced users to create their own es index settings and mappings. Default=False
 
+    es_connection_pool_maxsize: (RUBRIX_ES_CONNECTION_POOL_MAXSIZE env var)
+        The max number of open connections kept per elasticsearch node, for both sync and
+        async clients. Default=10
+
+    es_bulk_max_bytes: (RUBRIX_ES_BULK_MAX_BYTES env var)
+        The max size in bytes of a single elasticsearch bulk request. Bigger record chunks
+        are split in several bulk requests. Must be lower than the es `http.max_content_length`.
+        Default=10MB
+
+    es_bulk_threads: (RUBRIX_ES_BULK_THREADS env var)
+        The max number of bulk requests sent concurrently for a chunk of records. Default=4
+
+    es_bulk_max_retries: (RUBRIX_ES_BULK_MAX_RETRIES env var)
+        The max number of retries for documents rejected by elasticsearch with a 429 status
+        (too many requests), waiting with an exponential backoff between retries. Default=3
+
+    record_metrics_workers: (RUBRIX_RECORD_METRICS_WORKERS env var)
+        The number of processes computing record metrics during records ingestion.
+        Default=None (the number of cpus)
+
+    record_metrics_parallel_tasks: (RUBRIX_RECORD_METRICS_PARALLEL_TASKS env var)
+        Tasks which record metrics are computed in the processes pool, as a json list.
+        Record metrics for other tasks are computed in the request thread.
+        Default=["TokenClassification"]
+
+    record_metrics_min_records: (RUBRIX_RECORD_METRICS_MIN_RECORDS env var)
+        The min number of records in a bulk request to compute their metrics in parallel.
+        Smaller bulks are computed in the request thread. Default=100
+
+    compact_token_metrics: (RUBRIX_COMPACT_TOKEN_METRICS env var)
+        If True, token classification records store their token metrics as parallel arrays
+        instead of a nested document per token, which makes indices smaller and bulk
+        requests faster. Token metrics (frequency, length and capitalness) then count
+        records instead of tokens. Default=False
+
+    datasets_cache_size: (RUBRIX_DATASETS_CACHE_SIZE env var)
+        The max number of datasets kept in the in-process datasets cache. Default=1000
+
+    datasets_cache_ttl: (RUBRIX_DATASETS_CACHE_TTL env var)
+        Seconds a cached dataset is valid. Since the cache lives in each server process,
+        this is also the max delay to see dataset changes made by other server processes.
+        Use 0 to disable the cache. Default=60
+
     """
 
     __LOGGER__ = logging.getLogger(__name__)
@@ -76,6 +119,37 @@ class ApiSettings(BaseSettings):
     # TODO(@frascuchon): remove in v0.12.0
     disable_es_index_template_creation: bool = False
 
+    es_connection_pool_maxsize: int = Field(
+        default=10, gt=0, description="Max number of connections per es node"
+    )
+
+    es_bulk_max_bytes: int = Field(
+        default=10 * 1024 * 1024, gt=0, description="Max size of an es bulk request"
+    )
+    es_bulk_threads: int = Field(
+        default=4, gt=0, description="Max number of concurrent es bulk requests"
+    )
+    es_bulk_max_retries: int = Field(
+        default=3, ge=0, description="Max number of retries for rejected documents"
+    )
+
+    record_metrics_workers: Optional[int] = Field(
+        default=None, gt=0, description="Number of record metrics processes"
+    )
+    record_metrics_parallel_tasks: List[str] = ["TokenClassification"]
+    record_metrics_min_records: int = Field(
+        default=100, gt=0, description="Min number of records to compute in parallel"
+    )
+
+    compact_token_metrics: bool = False
+
+    datasets_cache_size: int = Field(
+        default=1000, ge=0, description="Max number of cached datasets"
+    )
+    datasets_cache_ttl: float = Field(
+        default=60, ge=0, description="Seconds a cached dataset is valid"
+    )
+
     metadata_fields_limit: int = Field(
         default=50, gt=0, le=100, description="Max number of fields in metadata"
     )
@@ -117,6 +191,18 @@ class ApiSettings(BaseSettings):
         # TODO: include a common prefix for all rubrix env vars.
         fields = {
             "metadata_fields_limit": {"env": "RUBRIX_METADATA_FIELDS_LIMIT"},
+            "es_connection_pool_maxsize": {"env": "RUBRIX_ES_CONNECTION_POOL_MAXSIZE"},
+            "es_bulk_max_bytes": {"env": "RUBRIX_ES_BULK_MAX_BYTES"},
+            "es_bulk_threads": {"env": "RUBRIX_ES_BULK_THREADS"},
+            "es_bulk_max_retries": {"env": "RUBRIX_ES_BULK_MAX_RETRIES"},
+            "record_metrics_workers": {"env": "RUBRIX_RECORD_METRICS_WORKERS"},
+            "record_metrics_parallel_tasks": {
+                "env": "RUBRIX_RECORD_METRICS_PARALLEL_TASKS"
+            },
+            "record_metrics_min_records": {"env": "RUBRIX_RECORD_METRICS_MIN_RECORDS"},
+            "compact_token_metrics": {"env": "RUBRIX_COMPACT_TOKEN_METRICS"},
+            "datasets_cache_size": {"env": "RUBRIX_DATASETS_CACHE_SIZE"},
+            "datasets_cache_ttl": {"env": "RUBRIX_DATASETS_CACHE_TTL"},
             "namespace": {
                 "env": "RUBRIX_NAMESPACE",
             },
@@ -228,6 +228,83 @@ def open_dataset(
     service.open_dataset(name, user=current_user, workspace=ds_params.workspace)
 
 
+@router.put(
+    "/{name}:start_bulk_load",
+    operation_id="start_bulk_load",
+)
+def start_bulk_load(
+    name: str,
+    no_replicas: bool = Query(
+        False, description="If enabled, removes the index replicas during the load"
+    ),
+    ds_params: CommonTaskQueryParams = Depends(),
+    service: DatasetsService = Depends(DatasetsService.get_instance),
+    current_user: User = Security(auth.get_user, scopes=[]),
+):
+    """
+    Switches a dataset to the bulk load mode, for a high throughput ingestion of records.
+    Bulk requests should be sent with `ingest_mode=bulk` until the load ends
+
+    Parameters
+    ----------
+    name:
+        The dataset name
+    no_replicas:
+        If True, removes the index replicas during the load
+    ds_params:
+        Common dataset query params
+    service:
+        The datasets service
+    current_user:
+        The current user
+
+    """
+    service.start_bulk_load(
+        name,
+        user=current_user,
+        workspace=ds_params.workspace,
+        no_replicas=no_replicas,
+    )
+
+
+@router.put(
+    "/{name}:end_bulk_load",
+    operation_id="end_bulk_load",
+)
+def end_bulk_load(
+    name: str,
+    force_merge: bool = Query(
+        False, description="If enabled, merges the index segments once loaded"
+    ),
+    ds_params: CommonTaskQueryParams = Depends(),
+    service: DatasetsService = Depends(DatasetsService.get_instance),
+    current_user: User = Security(auth.get_user, scopes=[]),
+):
+    """
+    Ends the dataset bulk load mode, making all the loaded records available for search
+
+    Parameters
+    ----------
+    name:
+        The dataset name
+    force_merge:
+        If True, merges the index segments once loaded
+    ds_params:
+        Common dataset query params
+    service:
+        The datasets service
+    current_user:
+        The current user
+
+    """
+    service.end_bulk_load(
+        name,
+        user=current_user,
+        workspace=ds_params.workspace,
+        force_merge=force_merge,
+    )
+
+
 @router.put(
     "/{name}:copy",
     operation_id="copy_dataset",
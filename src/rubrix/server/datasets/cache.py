@@ -0,0 +1,115 @@
+#  coding=utf-8
+#  Copyright 2021-present, the Recognai S.L. team.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import threading
+import time
+from collections import OrderedDict
+from typing import ClassVar, Dict, Optional, Tuple
+
+from rubrix.server.commons.settings import settings
+from rubrix.server.datasets.model import DatasetDB
+
+# The (owner, name) dataset key
+_CacheKey = Tuple[Optional[str], str]
+
+
+class DatasetsCache:
+    """
+    In-process LRU cache of datasets found by name, with a time to live per entry.
+
+    Entries are keyed by (owner, name) and every operation modifying a dataset
+    (create, update, delete, close, open, copy and records ingestion) must invalidate
+    the dataset name. Since the cache lives in the server process, changes made by
+    other server processes are visible once the entries expire.
+    """
+
+    _INSTANCE: ClassVar["DatasetsCache"] = None
+
+    @classmethod
+    def get_instance(cls) -> "DatasetsCache":
+        if not cls._INSTANCE:
+            cls._INSTANCE = cls(
+                max_size=settings.datasets_cache_size,
+                ttl=settings.datasets_cache_ttl,
+            )
+        return cls._INSTANCE
+
+    def __init__(self, max_size: int = 1000, ttl: float = 60):
+        """
+        Parameters
+        ----------
+        max_size:
+            The max number of cached datasets. Least recently used are discarded first
+        ttl:
+            Seconds a cached dataset is considered valid. 0 disables the cache
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: Dict[_CacheKey, Tuple[float, DatasetDB]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0 and self._max_size > 0
+
+    def get(self, owner: Optional[str], name: str) -> Optional[DatasetDB]:
+        """Returns a copy of the cached dataset, if any and not expired"""
+        key = (owner, name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return entry[1].copy(deep=True)
+
+    def put(self, owner: Optional[str], name: str, dataset: DatasetDB):
+        """Caches a found dataset"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[(owner, name)] = (
+                time.monotonic() + self._ttl,
+                dataset.copy(deep=True),
+            )
+            self._entries.move_to_end((owner, name))
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, name: str):
+        """Discards all cached entries for a dataset name, whatever the owner"""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == name]:
+                del self._entries[key]
+
+    def clear(self):
+        """Discards all cached entries and resets the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """The cache hits, misses and current size"""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._entries),
+            }
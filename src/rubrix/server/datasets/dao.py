@@ -19,10 +19,12 @@ from typing import Any, Dict, List, Optional, Type, TypeVar
 from fastapi import Depends
 
 from rubrix.server.commons.es_wrapper import ElasticsearchWrapper
+from rubrix.server.commons.settings import settings
 from rubrix.server.tasks.commons import TaskType
 
 from ..commons.es_settings import DATASETS_INDEX_NAME, DATASETS_INDEX_TEMPLATE
 from ..tasks.commons.dao.dao import DatasetRecordsDAO, dataset_records_index
+from .cache import DatasetsCache
 from .model import DatasetDB
 
 BaseDatasetDB = TypeVar("BaseDatasetDB", bound=DatasetDB)
@@ -59,9 +61,15 @@ class DatasetsDAO:
             cls._INSTANCE = cls(es, records_dao)
         return cls._INSTANCE
 
-    def __init__(self, es: ElasticsearchWrapper, records_dao: DatasetRecordsDAO):
+    def __init__(
+        self,
+        es: ElasticsearchWrapper,
+        records_dao: DatasetRecordsDAO,
+        datasets_cache: Optional[DatasetsCache] = None,
+    ):
         self._es = es
         self.__records_dao__ = records_dao
+        self.__cache__ = datasets_cache or DatasetsCache.get_instance()
         self.init()
 
     def init(self):
@@ -115,6 +123,7 @@ class DatasetsDAO:
             doc_id=dataset.id,
             document=self._dataset_to_es_doc(dataset),
         )
+        self.__cache__.invalidate(dataset.name)
         self.__records_dao__.create_dataset_index(dataset, force_recreate=True)
         return dataset
 
@@ -143,6 +152,7 @@ class DatasetsDAO:
             document=self._dataset_to_es_doc(dataset),
             partial_update=True,
         )
+        self.__cache__.invalidate(dataset.name)
         return dataset
 
     def delete_dataset(self, dataset: DatasetDB):
@@ -159,6 +169,7 @@ class DatasetsDAO:
             self._es.delete_index(dataset_records_index(dataset.id))
         finally:
             self._es.delete_document(index=DATASETS_INDEX_NAME, doc_id=dataset.id)
+            self.__cache__.invalidate(dataset.name)
 
     def find_by_id(
         self, dataset_id: str, ds_class: Type[BaseDatasetDB] = DatasetDB
@@ -186,7 +197,7 @@ class DatasetsDAO:
 
     def find_by_name(self, name: str, owner: Optional[str]) -> Optional[DatasetDB]:
         """
-        Finds a dataset by name
+        Finds a dataset by name. Found datasets are kept in the datasets cache
 
         Parameters
         ----------
@@ -199,6 +210,15 @@ class DatasetsDAO:
         -------
             The found dataset if any. None otherwise
         """
+        dataset = self.__cache__.get(owner, name)
+        if dataset is None:
+            dataset = self._find_by_name(name, owner=owner)
+            if dataset is not None:
+                self.__cache__.put(owner, name, dataset)
+        return dataset
+
+    def _find_by_name(self, name: str, owner: Optional[str]) -> Optional[DatasetDB]:
+        """Finds a dataset by name in elasticsearch"""
         dataset = DatasetDB(name=name, owner=owner, task=TaskType.text_classification)
         document = self._es.get_document_by_id(
             index=DATASETS_INDEX_NAME, doc_id=dataset.id
@@ -273,6 +293,7 @@ class DatasetsDAO:
                 **self._dataset_to_es_doc(target),
             },
         )
+        self.__cache__.invalidate(target.name)
         index_from = dataset_records_index(source.id)
         index_to = dataset_records_index(target.id)
         self._es.clone_index(index=index_from, clone_to=index_to)
@@ -280,7 +301,52 @@ class DatasetsDAO:
     def close(self, dataset: DatasetDB):
         """Close a dataset. It's mean that release all related resources, like elasticsearch index"""
         self._es.close_index(dataset_records_index(dataset.id))
+        self.__cache__.invalidate(dataset.name)
 
     def open(self, dataset: DatasetDB):
         """Make available a dataset"""
         self._es.open_index(dataset_records_index(dataset.id))
+        self.__cache__.invalidate(dataset.name)
+
+    def start_bulk_load(self, dataset: DatasetDB, no_replicas: bool = False):
+        """
+        Prepares the dataset records index for a high throughput load,
+        disabling the periodic index refresh
+
+        Parameters
+        ----------
+        dataset:
+            The dataset
+        no_replicas:
+            If True, also removes the index replicas during the load
+        """
+        index_settings = {"index.refresh_interval": "-1"}
+        if no_replicas:
+            index_settings["index.number_of_replicas"] = 0
+        self._es.update_index_settings(
+            dataset_records_index(dataset.id), settings=index_settings
+        )
+
+    def end_bulk_load(self, dataset: DatasetDB, force_merge: bool = False):
+        """
+        Restores the dataset records index settings after a bulk load,
+        making all loaded records available for search
+
+        Parameters
+        ----------
+        dataset:
+            The dataset
+        force_merge:
+            If True, merges the index segments once loaded
+        """
+        index = dataset_records_index(dataset.id)
+        self._es.update_index_settings(
+            index,
+            settings={
+                "index.refresh_interval": None,
+                "index.number_of_replicas": settings.es_records_index_replicas,
+            },
+        )
+        self._es.refresh_index(index)
+        if force_merge:
+            self._es.force_merge_index(index)
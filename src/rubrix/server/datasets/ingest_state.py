@@ -0,0 +1,130 @@
+#  coding=utf-8
+#  Copyright 2021-present, the Recognai S.L. team.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import dataclasses
+import threading
+import time
+from typing import ClassVar, Dict, Optional, Set
+
+from rubrix.server.commons.settings import settings
+from rubrix.server.datasets.model import BaseDatasetDB
+
+
+@dataclasses.dataclass
+class DatasetIngestState:
+    """
+    Dataset info resolved during records ingestion, kept to skip
+    the elasticsearch round trips of the following bulk requests
+
+    Attributes:
+    -----------
+    dataset:
+        The stored dataset
+    index_ready:
+        If True, the dataset records index was already created
+    metadata_fields:
+        The metadata fields already configured in the records index
+    multi_label:
+        For text classification datasets, whether stored records are multi-label.
+        None if not resolved yet
+    expires_at:
+        The monotonic time from which the state is not valid anymore
+    """
+
+    dataset: BaseDatasetDB
+    index_ready: bool = False
+    metadata_fields: Set[str] = dataclasses.field(default_factory=set)
+    multi_label: Optional[bool] = None
+    expires_at: float = 0
+
+
+class DatasetIngestStates:
+    """
+    In-process cache of the dataset ingest states, by dataset id, with a time to live
+    per state.
+
+    Every operation modifying a dataset outside the records ingestion
+    (update, delete, close, open) must invalidate its state. Since the cache lives
+    in the server process, changes made by other server processes are visible once
+    the states expire, or when a records bulk finds the dataset missing.
+    """
+
+    _INSTANCE: ClassVar["DatasetIngestStates"] = None
+
+    @classmethod
+    def get_instance(cls) -> "DatasetIngestStates":
+        if not cls._INSTANCE:
+            cls._INSTANCE = cls(ttl=settings.datasets_cache_ttl)
+        return cls._INSTANCE
+
+    def __init__(self, ttl: float = 60):
+        """
+        Parameters
+        ----------
+        ttl:
+            Seconds an ingest state is considered valid. 0 disables the fast path
+        """
+        self._ttl = ttl
+        self._states: Dict[str, DatasetIngestState] = {}
+        self._lock = threading.Lock()
+
+    def get(self, dataset_id: str) -> Optional[DatasetIngestState]:
+        """Returns the ingest state for a dataset id, if any and not expired"""
+        state = self._states.get(dataset_id)
+        if state is None or state.expires_at > time.monotonic():
+            return state
+        with self._lock:
+            if self._states.get(dataset_id) is state:
+                del self._states[dataset_id]
+        return None
+
+    def register(self, dataset: BaseDatasetDB) -> DatasetIngestState:
+        """
+        Registers a dataset for the ingestion fast path, keeping the already
+        resolved state if the dataset task did not change and it has not expired
+
+        Parameters
+        ----------
+        dataset:
+            The stored dataset
+
+        Returns
+        -------
+            The dataset ingest state
+        """
+        with self._lock:
+            state = self._states.get(dataset.id)
+            if (
+                state is None
+                or state.dataset.task != dataset.task
+                or state.expires_at <= time.monotonic()
+            ):
+                state = DatasetIngestState(
+                    dataset=dataset, expires_at=time.monotonic() + self._ttl
+                )
+            else:
+                state = dataclasses.replace(state, dataset=dataset)
+            self._states[dataset.id] = state
+            return state
+
+    def invalidate(self, dataset_id: str):
+        """Drops the ingest state of a dataset"""
+        with self._lock:
+            self._states.pop(dataset_id, None)
+
+    def clear(self):
+        """Drops all ingest states"""
+        with self._lock:
+            self._states.clear()
@@ -27,6 +27,7 @@ from rubrix.server.commons.errors import (
 
 from ..security.model import User
 from .dao import DatasetsDAO
+from .ingest_state import DatasetIngestStates
 from .model import (
     CopyDatasetRequest,
     CreationDatasetRequest,
@@ -44,7 +45,9 @@ class DatasetsService:
 
     @classmethod
     def get_instance(
-        cls, dao: DatasetsDAO = Depends(DatasetsDAO.get_instance)
+        cls,
+        dao: DatasetsDAO = Depends(DatasetsDAO.get_instance),
+        ingest_states: DatasetIngestStates = Depends(DatasetIngestStates.get_instance),
     ) -> "DatasetsService":
 
         """
@@ -54,6 +57,8 @@ class DatasetsService:
         ----------
         dao:
             The datasets dao
+        ingest_states:
+            The dataset ingest states cache
 
         Returns
         -------
@@ -62,11 +67,14 @@ class DatasetsService:
         """
 
         if not cls._INSTANCE:
-            cls._INSTANCE = cls(dao)
+            cls._INSTANCE = cls(dao, ingest_states=ingest_states)
         return cls._INSTANCE
 
-    def __init__(self, dao: DatasetsDAO):
+    def __init__(
+        self, dao: DatasetsDAO, ingest_states: Optional[DatasetIngestStates] = None
+    ):
         self.__dao__ = dao
+        self.__ingest_states__ = ingest_states or DatasetIngestStates.get_instance()
 
     def list(
         self, user: User, workspaces: List[str], task_type: Optional[TaskType] = None
@@ -184,6 +192,7 @@ class DatasetsService:
         owner = user.check_workspace(workspace)
         found = self.__dao__.find_by_name(name, owner)
         if found:
+            self.__ingest_states__.invalidate(found.id)
             self.__dao__.delete_dataset(found)
 
     def update(
@@ -217,6 +226,7 @@ class DatasetsService:
         """
 
         found = self.find_by_name(name, task=task, user=user, workspace=workspace)
+        self.__ingest_states__.invalidate(found.id)
 
         data.tags = {**found.tags, **data.tags}
         data.metadata = {**found.metadata, **data.metadata}
@@ -235,7 +245,12 @@ class DatasetsService:
         workspace: Optional[str],
     ) -> Dataset:
         """
-        Inserts or updates the dataset. Updates only affects to updatable fields
+        Inserts or updates the dataset. Updates only affects to updatable fields.
+
+        Since this is called for every records bulk, an already upserted dataset
+        is taken from the ingest states cache when the request brings no new
+        tags or metadata. Then, its ``last_updated`` field is refreshed by the
+        records bulk itself.
 
         Parameters
         ----------
@@ -255,8 +270,20 @@ class DatasetsService:
             The updated or created dataset
 
         """
+        owner = user.check_workspace(workspace)
+        state = self.__ingest_states__.get(
+            DatasetDB(name=dataset.name, owner=owner, task=task).id
+        )
+        if (
+            state
+            and state.dataset.task == task
+            and dataset.tags.items() <= state.dataset.tags.items()
+            and dataset.metadata.items() <= state.dataset.metadata.items()
+        ):
+            return state.dataset
+
         try:
-            return self.update(
+            upserted = self.update(
                 name=dataset.name,
                 data=UpdateDatasetRequest(tags=dataset.tags, metadata=dataset.metadata),
                 user=user,
@@ -264,9 +291,15 @@ class DatasetsService:
                 task=task,
             )
         except EntityNotFoundError:
-            return self.create(
+            # Any state left is stale, since the dataset was deleted
+            self.__ingest_states__.invalidate(
+                DatasetDB(name=dataset.name, owner=owner, task=task).id
+            )
+            upserted = self.create(
                 dataset=dataset, task=task, user=user, workspace=workspace
             )
+        self.__ingest_states__.register(upserted)
+        return upserted
 
     def copy_dataset(
         self,
@@ -346,6 +379,7 @@ class DatasetsService:
 
         """
         found = self.find_by_name(name, task=None, user=user, workspace=workspace)
+        self.__ingest_states__.invalidate(found.id)
         self.__dao__.close(found)
 
     def open_dataset(self, name: str, user: User, workspace: Optional[str]):
@@ -364,4 +398,58 @@ class DatasetsService:
 
         """
         found = self.find_by_name(name, task=None, user=user, workspace=workspace)
+        self.__ingest_states__.invalidate(found.id)
         self.__dao__.open(found)
+
+    def start_bulk_load(
+        self,
+        name: str,
+        user: User,
+        workspace: Optional[str],
+        no_replicas: bool = False,
+    ):
+        """
+        Switches the dataset to the bulk load mode: its records index is not refreshed
+        periodically, speeding up the ingestion of a lot of records. Records logged
+        meanwhile may not be available for search until the load ends
+
+        Parameters
+        ----------
+        name:
+            The dataset name
+        user:
+            The current user
+        workspace:
+            The workspace where dataset belongs to
+        no_replicas:
+            If True, the index replicas are removed during the load
+
+        """
+        found = self.find_by_name(name, task=None, user=user, workspace=workspace)
+        self.__dao__.start_bulk_load(found, no_replicas=no_replicas)
+
+    def end_bulk_load(
+        self,
+        name: str,
+        user: User,
+        workspace: Optional[str],
+        force_merge: bool = False,
+    ):
+        """
+        Ends the dataset bulk load mode, restoring the records index settings
+        and making all loaded records available for search
+
+        Parameters
+        ----------
+        name:
+            The dataset name
+        user:
+            The current user
+        workspace:
+            The workspace where dataset belongs to
+        force_merge:
+            If True, the records index segments are merged once loaded
+
+        """
+        found = self.find_by_name(name, task=None, user=user, workspace=workspace)
+        self.__dao__.end_bulk_load(found, force_merge=force_merge)
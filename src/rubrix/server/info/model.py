@@ -29,3 +29,4 @@ class ApiStatus(ApiInfo):
 
     elasticsearch: Dict[str, Any]
     mem_info: Dict[str, Any]
+    datasets_cache: Dict[str, int] = None
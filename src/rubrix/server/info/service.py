@@ -23,6 +23,7 @@ from hurry.filesize import size
 from rubrix import __version__ as rubrix_version
 
 from ..commons.es_wrapper import ElasticsearchWrapper
+from ..datasets.cache import DatasetsCache
 from .model import ApiStatus
 
 
@@ -40,6 +41,7 @@ class ApiInfoService:
             rubrix_version=str(rubrix_version),
             elasticsearch=self._elasticsearch_info(),
             mem_info=self._api_memory_info(),
+            datasets_cache=DatasetsCache.get_instance().stats(),
         )
 
     def _elasticsearch_info(self) -> Dict[str, Any]:
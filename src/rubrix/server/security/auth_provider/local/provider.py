@@ -13,6 +13,9 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends
 from fastapi.security import (
@@ -28,7 +31,7 @@ from rubrix.server.security.auth_provider.base import (
 )
 from rubrix.server.security.auth_provider.local.users.service import UsersService
 from rubrix.server.security.model import Token, User
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from .settings import Settings, settings
 
@@ -44,6 +47,8 @@ class LocalAuthProvider(AuthProvider):
         self.users = users
         self.router = APIRouter(tags=["security"])
         self.settings = settings
+        self.__token_claims__: Dict[str, Dict[str, Any]] = OrderedDict()
+        self.__token_claims_lock__ = threading.Lock()
 
         @self.router.post(
             settings.token_api_url,
@@ -121,17 +126,52 @@ class LocalAuthProvider(AuthProvider):
             An User instance if a valid token was provided. None otherwise
         """
         try:
-            payload = jwt.decode(
-                token,
-                self.settings.secret_key,
-                algorithms=[self.settings.algorithm],
-            )
+            payload = self._decode_token(token)
             username: str = payload.get("sub")
             if username:
                 return self.users.get_user(username=username)
         except JWTError:
             return None
 
+    def _decode_token(self, token: str) -> Dict[str, Any]:
+        """
+        Decodes an access token, keeping the decoded claims of the last
+        ``settings.token_cache_size`` used tokens until they expire
+
+        Parameters
+        ----------
+        token:
+            The access token
+
+        Returns
+        -------
+            The token claims. Raises a ``JWTError`` for invalid or expired tokens
+        """
+        with self.__token_claims_lock__:
+            claims = self.__token_claims__.get(token)
+            if claims is not None:
+                self.__token_claims__.move_to_end(token)
+
+        if claims is not None:
+            expiration = claims.get("exp")
+            if expiration is None or expiration > time.time():
+                return claims
+            with self.__token_claims_lock__:
+                self.__token_claims__.pop(token, None)
+            raise JWTError("Signature has expired.")
+
+        claims = jwt.decode(
+            token,
+            self.settings.secret_key,
+            algorithms=[self.settings.algorithm],
+        )
+        if self.settings.token_cache_size > 0:
+            with self.__token_claims_lock__:
+                self.__token_claims__[token] = claims
+                while len(self.__token_claims__) > self.settings.token_cache_size:
+                    self.__token_claims__.popitem(last=False)
+        return claims
+
     async def get_user(
         self,
         security_scopes: SecurityScopes,
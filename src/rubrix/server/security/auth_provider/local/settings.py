@@ -13,7 +13,7 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-from pydantic import BaseSettings
+from pydantic import BaseSettings, Field
 from rubrix import DEFAULT_API_KEY
 
 
@@ -32,6 +32,18 @@ class Settings(BaseSettings):
     token_expiration_in_minutes:
         The session token expiration in minutes. Default=30000
 
+    token_cache_size:
+        The max number of decoded session tokens kept in memory. 0 disables the cache.
+        Default=1000
+
+    users_db_file:
+        The users yaml file. Default=.users.yml
+
+    users_db_reload_interval:
+        Min seconds between checks for changes of the users file. Users are loaded
+        again when the file changes, without restarting the server. 0 disables the reload.
+        Default=5
+
     """
 
     secret_key: str = "secret"
@@ -43,7 +55,9 @@ class Settings(BaseSettings):
     default_password: str = (
         "$2y$12$MPcRR71ByqgSI8AaqgxrMeSdrD4BcxDIdYkr.ePQoKz7wsGK7SAca"  # 1234
     )
+    token_cache_size: int = Field(default=1000, ge=0)
     users_db_file: str = ".users.yml"
+    users_db_reload_interval: float = Field(default=5, ge=0)
 
     class Config:
         env_prefix = "RUBRIX_LOCAL_AUTH_"
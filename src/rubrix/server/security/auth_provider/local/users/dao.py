@@ -13,9 +13,17 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import hashlib
+import hmac
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
 import yaml
+
 from rubrix.server.security.auth_provider.local.settings import settings
-from typing import Dict, Optional
 
 from .model import UserInDB
 
@@ -25,29 +33,93 @@ _DEFAULT_USER = UserInDB(
     api_key=settings.default_apikey,
 )
 
+_LOGGER = logging.getLogger(__name__)
+
+
+def _api_key_hash(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
 
 class UsersDAO:
-    def __init__(self, users_file: str):
+    def __init__(self, users_file: str, reload_interval: float = 0):
+        """
+        Parameters
+        ----------
+        users_file:
+            The users yaml file
+        reload_interval:
+            Min seconds between checks of users file changes. If the file changed,
+            users are loaded again. 0 disables the reload
+        """
+        self.__users_file__ = users_file
+        self.__reload_interval__ = reload_interval
         self.__users__: Dict[str, UserInDB] = {}
+        self.__users_by_api_key__: Dict[str, UserInDB] = {}
+        self.__file_version__: Optional[Tuple[int, int]] = None
+        self.__last_check__ = time.monotonic()
+        self.__lock__ = threading.Lock()
+
         try:
-            with open(users_file) as file:
-                user_list = [
-                    UserInDB(**user_data) for user_data in yaml.safe_load(file)
-                ]
-                self.__users__ = {user.username: user for user in user_list}
+            self.__load_users__()
         except FileNotFoundError:
-            self.__users__ = {_DEFAULT_USER.username: _DEFAULT_USER}
+            self.__index_users__([_DEFAULT_USER])
+
+    def __load_users__(self):
+        """Loads users from the users file, building the users indices"""
+        # A wrong file version is not loaded again until it changes
+        self.__file_version__ = self.__users_file_version__()
+        with open(self.__users_file__) as file:
+            user_list = [UserInDB(**user_data) for user_data in yaml.safe_load(file)]
+        self.__index_users__(user_list)
+
+    def __index_users__(self, user_list):
+        users = {user.username: user for user in user_list}
+        users_by_api_key = {_api_key_hash(user.api_key): user for user in user_list}
+        self.__users__, self.__users_by_api_key__ = users, users_by_api_key
+
+    def __users_file_version__(self) -> Tuple[int, int]:
+        stat = os.stat(self.__users_file__)
+        return stat.st_mtime_ns, stat.st_size
+
+    def __reload_if_changed__(self):
+        """Loads users again if the users file changed since last load"""
+        if (
+            self.__reload_interval__ <= 0
+            or time.monotonic() - self.__last_check__ < self.__reload_interval__
+        ):
+            return
+
+        with self.__lock__:
+            if time.monotonic() - self.__last_check__ < self.__reload_interval__:
+                return
+            self.__last_check__ = time.monotonic()
+            try:
+                if self.__users_file_version__() != self.__file_version__:
+                    self.__load_users__()
+                    _LOGGER.info("Users loaded from %s", self.__users_file__)
+            except FileNotFoundError:
+                pass
+            except Exception as error:
+                # Keep the current users until the file is fixed
+                _LOGGER.error(
+                    "Cannot load users from %s: %s", self.__users_file__, error
+                )
 
     def get_user(self, user_name: str) -> Optional[UserInDB]:
         """Fetch user info for a given user name"""
-        if user_name in self.__users__:
-            return self.__users__[user_name]
+        self.__reload_if_changed__()
+        return self.__users__.get(user_name)
 
     async def get_user_by_api_key(self, api_key: str) -> Optional[UserInDB]:
         """Find a user for a given api key"""
-        for user in self.__users__.values():
-            if api_key == user.api_key:
-                return user
+        if not isinstance(api_key, str) or not api_key:
+            return None
+        self.__reload_if_changed__()
+        user = self.__users_by_api_key__.get(_api_key_hash(api_key))
+        if user and hmac.compare_digest(
+            user.api_key.encode("utf-8"), api_key.encode("utf-8")
+        ):
+            return user
 
 
 _instance: Optional[UsersDAO] = None
@@ -58,5 +130,7 @@ def create_users_dao() -> UsersDAO:
     global _instance
 
     if _instance is None:
-        _instance = UsersDAO(settings.users_db_file)
+        _instance = UsersDAO(
+            settings.users_db_file, reload_interval=settings.users_db_reload_interval
+        )
     return _instance
@@ -26,11 +26,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import ConfigError
 
 from rubrix import __version__ as rubrix_version
-from rubrix.server.commons.es_wrapper import create_es_wrapper
+from rubrix.server.commons.es_wrapper import (
+    AsyncElasticsearchWrapper,
+    create_es_wrapper,
+)
 from rubrix.server.commons.static_rewrite import RewriteStaticFiles
 from rubrix.server.datasets.dao import DatasetsDAO
 from rubrix.server.security import auth
 from rubrix.server.tasks.commons.dao.dao import DatasetRecordsDAO
+from rubrix.server.tasks.storage.record_metrics import RecordMetricsExecutor
 
 from ..logging import configure_logging
 from .commons.errors import APIErrorHandler
@@ -106,6 +110,16 @@ def configure_app_storage(app: FastAPI):
                 "Once you have verified this, restart the Rubrix server.\n"
             ) from error
 
+    @app.on_event("shutdown")
+    async def close_elasticsearch():
+        if AsyncElasticsearchWrapper._INSTANCE is not None:
+            await AsyncElasticsearchWrapper._INSTANCE.close()
+
+    @app.on_event("shutdown")
+    def close_record_metrics_executor():
+        if RecordMetricsExecutor._INSTANCE is not None:
+            RecordMetricsExecutor._INSTANCE.close()
+
 
 def configure_app_security(app: FastAPI):
 
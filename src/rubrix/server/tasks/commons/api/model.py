@@ -63,6 +63,26 @@ class SortableField(BaseModel):
     order: SortOrder = SortOrder.asc
 
 
+class BulkError(BaseModel):
+    """
+    Info about a record that could not be stored
+
+    Attributes
+    ----------
+
+    id:
+        The record id
+    status:
+        The elasticsearch status code for the record
+    reason:
+        The error description
+    """
+
+    id: Optional[Union[int, str]] = None
+    status: Optional[int] = None
+    reason: str
+
+
 class BulkResponse(BaseModel):
     """
     Data info for bulk results
@@ -76,11 +96,29 @@ class BulkResponse(BaseModel):
         Number of records in bulk
     failed:
         Number of failed records
+    errors:
+        Info about the failed records, if any
     """
 
     dataset: str
     processed: int
     failed: int = 0
+    errors: Optional[List[BulkError]] = None
+
+
+class IngestMode(str, Enum):
+    """
+    Records ingestion modes
+
+    default:
+        Each bulk request waits until its records are available for search
+    bulk:
+        Bulk requests do not wait for the index refresh. Used along with the dataset
+        bulk load mode, for high throughput ingestion of many records
+    """
+
+    default = "default"
+    bulk = "bulk"
 
 
 @dataclass
@@ -91,6 +129,11 @@ class PaginationParams:
     from_: int = Query(
         0, ge=0, le=10000, alias="from", description="Record sequence from"
     )
+    cursor: Optional[str] = Query(
+        None,
+        description="The `next_cursor` of a previous search response. "
+        "Used to fetch the following records with no `from` limit",
+    )
 
 
 class BaseAnnotation(BaseModel):
@@ -334,11 +377,14 @@ class BaseSearchResults(GenericModel, Generic[Record, Aggregations]):
         The selected records to return
     aggregations:
         Requested aggregations
+    next_cursor:
+        The cursor to fetch the next page of records. None if there are no more records
     """
 
     total: int = 0
     records: List[Record] = Field(default_factory=list)
     aggregations: Aggregations = None
+    next_cursor: Optional[str] = None
 
 
 class ScoreRange(BaseModel):
@@ -0,0 +1,158 @@
+#  coding=utf-8
+#  Copyright 2021-present, the Recognai S.L. team.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Helpers for streaming dataset records in the Apache Arrow columnar format.
+
+The `pyarrow` package is only required when these helpers are used.
+"""
+
+import io
+import itertools
+import json
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from fastapi.responses import StreamingResponse
+
+from rubrix.server.tasks.commons.helpers import takeuntil
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def import_pyarrow():
+    """Imports the pyarrow module, with a helpful message if it is not installed"""
+    try:
+        import pyarrow
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError(
+            "'pyarrow' must be installed to export data in the Apache Arrow format! "
+            "You can install 'pyarrow' with the command: `pip install pyarrow`"
+        )
+    return pyarrow
+
+
+def es_field_type2arrow(es_type: str) -> "pyarrow.DataType":
+    """Maps an elasticsearch field type to the arrow data type used for its values"""
+    pa = import_pyarrow()
+
+    if es_type in ["long", "integer", "short", "byte"]:
+        return pa.int64()
+    if es_type in ["float", "double", "half_float", "scaled_float"]:
+        return pa.float64()
+    if es_type == "boolean":
+        return pa.bool_()
+    return pa.string()
+
+
+def coerce_value(value: Any, data_type: "pyarrow.DataType") -> Any:
+    """
+    Adapts a python value to the arrow data type of its column
+
+    Non string values stored in string columns are serialized as json. Values
+    that cannot be represented with the column data type are dropped.
+    """
+    pa = import_pyarrow()
+
+    if value is None:
+        return None
+    if pa.types.is_string(data_type):
+        return value if isinstance(value, str) else json.dumps(value, default=str)
+    if pa.types.is_list(data_type):
+        values = value if isinstance(value, (list, tuple)) else [value]
+        return [coerce_value(v, data_type.value_type) for v in values]
+    if pa.types.is_struct(data_type):
+        if not isinstance(value, dict):
+            return None
+        return {
+            field.name: coerce_value(value.get(field.name), field.type)
+            for field in data_type
+        }
+    if pa.types.is_boolean(data_type):
+        return value if isinstance(value, bool) else None
+    if pa.types.is_integer(data_type) or pa.types.is_floating(data_type):
+        is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+        return value if is_number else None
+    return value
+
+
+def arrow_data_response(
+    data_stream: Iterable[Any],
+    schema: "pyarrow.Schema",
+    to_row: Callable[[Any], Dict[str, Any]],
+    chunk_size: int = 1000,
+    limit: Optional[int] = None,
+) -> StreamingResponse:
+    """
+    Generates an Apache Arrow IPC stream response for a dataset scan
+
+    Parameters
+    ----------
+    data_stream:
+        The dataset records stream
+    schema:
+        The arrow schema of the generated record batches
+    to_row:
+        Converts a record into a row dictionary with schema field names as keys
+    chunk_size:
+        The number of records per record batch
+    limit:
+        If provided, the max number of streamed records
+
+    Returns
+    -------
+        A streaming response with the record batches
+    """
+    pa = import_pyarrow()
+
+    if limit:
+        data_stream = takeuntil(data_stream, limit=limit)
+
+    def record_batch(rows) -> "pyarrow.RecordBatch":
+        return pa.RecordBatch.from_arrays(
+            [
+                pa.array(
+                    [coerce_value(row.get(field.name), field.type) for row in rows],
+                    type=field.type,
+                )
+                for field in schema
+            ],
+            schema=schema,
+        )
+
+    def stream_generator(stream):
+        """Writes record batches of the dataset scan, yielding bytes as they are written"""
+        sink = io.BytesIO()
+
+        def flush() -> bytes:
+            data = sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+            return data
+
+        rows = map(to_row, stream)
+        with pa.ipc.new_stream(sink, schema) as writer:
+            # Write the schema even if there are no records
+            writer.write_batch(record_batch([]))
+            while True:
+                batch = list(itertools.islice(rows, chunk_size))
+                if not batch:
+                    break
+                writer.write_batch(record_batch(batch))
+                yield flush()
+        yield flush()
+
+    return StreamingResponse(
+        stream_generator(data_stream), media_type=ARROW_STREAM_MEDIA_TYPE
+    )
@@ -15,15 +15,24 @@
 
 import dataclasses
 import datetime
-from typing import Any, Dict, Iterable, List, Optional, Type, TypeVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
 
 import deprecated
 from fastapi import Depends
+from starlette.concurrency import run_in_threadpool
 
-from rubrix.server.commons.errors import ClosedDatasetError, MissingDatasetRecordsError
-from rubrix.server.commons.es_helpers import aggregations, parse_aggregations
-from rubrix.server.commons.es_settings import DATASETS_RECORDS_INDEX_NAME
+from rubrix.server.commons.errors import (
+    ClosedDatasetError,
+    MissingDatasetRecordsError,
+    StaleDatasetError,
+)
+from rubrix.server.commons.es_helpers import aggregations, filters, parse_aggregations
+from rubrix.server.commons.es_settings import (
+    DATASETS_INDEX_NAME,
+    DATASETS_RECORDS_INDEX_NAME,
+)
 from rubrix.server.commons.es_wrapper import (
+    AsyncElasticsearchWrapper,
     ClosedIndexError,
     ElasticsearchWrapper,
     IndexNotFoundError,
@@ -31,6 +40,8 @@ from rubrix.server.commons.es_wrapper import (
 )
 from rubrix.server.commons.helpers import unflatten_dict
 from rubrix.server.commons.settings import settings
+from rubrix.server.datasets.cache import DatasetsCache
+from rubrix.server.datasets.ingest_state import DatasetIngestStates
 from rubrix.server.datasets.model import BaseDatasetDB
 from rubrix.server.tasks.commons import BaseRecord, MetadataLimitExceededError, TaskType
 from rubrix.server.tasks.commons.dao.es_config import (
@@ -87,6 +98,7 @@ class DatasetRecordsDAO:
     def get_instance(
         cls,
         es: ElasticsearchWrapper = Depends(ElasticsearchWrapper.get_instance),
+        ingest_states: DatasetIngestStates = Depends(DatasetIngestStates.get_instance),
     ) -> "DatasetRecordsDAO":
         """
         Creates a dataset records dao instance
@@ -95,14 +107,23 @@ class DatasetRecordsDAO:
         ----------
         es:
             The elasticserach wrapper dependency
+        ingest_states:
+            The dataset ingest states cache
 
         """
         if not cls._INSTANCE:
-            cls._INSTANCE = cls(es)
+            cls._INSTANCE = cls(es, ingest_states=ingest_states)
         return cls._INSTANCE
 
-    def __init__(self, es: ElasticsearchWrapper):
+    def __init__(
+        self,
+        es: ElasticsearchWrapper,
+        ingest_states: Optional[DatasetIngestStates] = None,
+        datasets_cache: Optional[DatasetsCache] = None,
+    ):
         self._es = es
+        self._ingest_states = ingest_states or DatasetIngestStates.get_instance()
+        self._datasets_cache = datasets_cache or DatasetsCache.get_instance()
         self.init()
 
     def init(self):
@@ -114,7 +135,8 @@ class DatasetRecordsDAO:
         dataset: BaseDatasetDB,
         records: List[BaseRecord],
         record_class: Type[DBRecord],
-    ) -> int:
+        refresh: bool = True,
+    ) -> List[Dict[str, Any]]:
         """
         Add records to dataset
 
@@ -126,38 +148,140 @@ class DatasetRecordsDAO:
             The list of records
         record_class:
             Record class used to convert records to
+        refresh:
+            If True, waits until the records are available for search
         Returns
         -------
-            The number of failed records
+            The failed records, with their id, status and error reason
+
+        """
+
+        documents, metadata_values = self._records2documents(records, record_class)
 
+        index_name = self._prepare_records_index(dataset, metadata_values)
+        extra_failures = []
+        failures = self._es.add_documents(
+            index=index_name,
+            documents=documents,
+            doc_id=lambda _record: _record.get("id"),
+            extra_actions=[self._touch_dataset_action(dataset)],
+            refresh="wait_for" if refresh else False,
+            extra_failures=extra_failures,
+        )
+        # The dataset last update has changed
+        self._datasets_cache.invalidate(dataset.name)
+        self._check_stale_dataset(dataset, failures, extra_failures)
+        return failures
+
+    def _ready_records_index(
+        self, dataset: BaseDatasetDB, metadata_values: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        Returns the records index name if, according to the dataset ingest state,
+        the index exists and already has the metadata fields configured. None otherwise
         """
+        state = self._ingest_states.get(dataset.id)
+        if (
+            state
+            and state.index_ready
+            and state.metadata_fields.issuperset(metadata_values)
+        ):
+            return dataset_records_index(dataset.id)
+
+    def _prepare_records_index(
+        self, dataset: BaseDatasetDB, metadata_values: Dict[str, Any]
+    ) -> str:
+        """Creates the records index and configures its metadata fields, if not done yet"""
+        index_name = self._ready_records_index(dataset, metadata_values)
+        if index_name:
+            return index_name
+
+        index_name = self.create_dataset_index(dataset)
+        self._configure_metadata_fields(index_name, metadata_values)
+
+        state = self._ingest_states.get(dataset.id)
+        if state:
+            state.index_ready = True
+            state.metadata_fields.update(metadata_values)
+        return index_name
 
+    def _check_stale_dataset(
+        self,
+        dataset: BaseDatasetDB,
+        failures: List[Dict[str, Any]],
+        extra_failures: List[Dict[str, Any]],
+    ):
+        """
+        Checks that the bulk did not miss the records index or the dataset document.
+        Both mean the dataset was deleted by another server process, so its ingest
+        state is dropped and a ``StaleDatasetError`` is raised. Records must be sent
+        again once the dataset is upserted through the slow path
+        """
+        if any(
+            failure["reason"].startswith("index_not_found_exception")
+            for failure in failures
+        ) or any(
+            failure["index"] == DATASETS_INDEX_NAME
+            and failure["type"]
+            in ["document_missing_exception", "index_not_found_exception"]
+            for failure in extra_failures
+        ):
+            self._ingest_states.invalidate(dataset.id)
+            raise StaleDatasetError(name=dataset.name)
+
+    @staticmethod
+    def _touch_dataset_action(dataset: BaseDatasetDB) -> Dict[str, Any]:
+        """The bulk action refreshing the dataset last update, sent along with the records"""
+        return {
+            "_op_type": "update",
+            "_index": DATASETS_INDEX_NAME,
+            "_id": dataset.id,
+            "doc": {"last_updated": datetime.datetime.utcnow()},
+        }
+
+    @staticmethod
+    def _records2documents(
+        records: List[BaseRecord], record_class: Type[DBRecord]
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Converts records into es documents, collecting found metadata values.
+
+        Records already validated as a base class of the db record class (for example,
+        the bulk api creation records) are not validated again. They are just copied
+        into the db record shape before dumping them into documents
+        """
         now = None
         documents = []
         metadata_values = {}
 
-        if "last_updated" in record_class.schema()["properties"]:
+        if "last_updated" in record_class.__fields__:
             now = datetime.datetime.utcnow()
 
         for r in records:
             metadata_values.update(r.metadata or {})
-            db_record = record_class.parse_obj(r)
+            if isinstance(r, record_class) or (
+                isinstance(r, BaseRecord) and issubclass(record_class, type(r))
+            ):
+                db_record = record_class.construct(
+                    _fields_set=r.__fields_set__, **r.__dict__
+                )
+            else:
+                db_record = record_class.parse_obj(r)
             if now:
                 db_record.last_updated = now
             documents.append(db_record.dict(exclude_none=False))
-
-        index_name = self.create_dataset_index(dataset)
-        self._configure_metadata_fields(index_name, metadata_values)
-        return self._es.add_documents(
-            index=index_name,
-            documents=documents,
-            doc_id=lambda _record: _record.get("id"),
-        )
+        return documents, metadata_values
 
     def get_metadata_schema(self, dataset: BaseDatasetDB) -> Dict[str, str]:
         """Get metadata fields schema for provided dataset"""
+        return self.get_fields_schema(dataset, field_name="metadata.*")
+
+    def get_fields_schema(
+        self, dataset: BaseDatasetDB, field_name: str
+    ) -> Dict[str, str]:
+        """Get the schema of dataset fields matching the field name pattern (wildcards accepted)"""
         records_index = dataset_records_index(dataset.id)
-        return self._es.get_field_mapping(index=records_index, field_name="metadata.*")
+        return self._es.get_field_mapping(index=records_index, field_name=field_name)
 
     def search_records(
         self,
@@ -166,6 +290,7 @@ class DatasetRecordsDAO:
         size: int = 100,
         record_from: int = 0,
         exclude_fields: List[str] = None,
+        search_after: Optional[List[Any]] = None,
     ) -> RecordSearchResults:
         """
         SearchRequest records under a dataset given a search parameters.
@@ -182,6 +307,10 @@ class DatasetRecordsDAO:
             Record from which to retrieve the records (for pagination)
         exclude_fields:
             a list of fields to exclude from the result source. Wildcards are accepted
+        search_after:
+            The sort values of the last record of the previous page. If provided,
+            records are fetched after them (deep pagination) and ``record_from``
+            is ignored
         Returns
         -------
             The search result
@@ -189,19 +318,10 @@ class DatasetRecordsDAO:
         """
         search = search or RecordSearch()
         records_index = dataset_records_index(dataset.id)
-        compute_aggregations = record_from == 0
-        aggregation_requests = (
-            {**(search.aggregations or {})} if compute_aggregations else {}
+        es_query = self._search_request(
+            search, record_from, exclude_fields, search_after=search_after
         )
 
-        es_query = {
-            "_source": {"excludes": exclude_fields or []},
-            "from": record_from,
-            "query": search.query or {"match_all": {}},
-            "sort": search.sort or [{"_id": {"order": "asc"}}],
-            "aggs": aggregation_requests,
-        }
-
         try:
             results = self._es.search(index=records_index, query=es_query, size=size)
         except ClosedIndexError:
@@ -211,8 +331,53 @@ class DatasetRecordsDAO:
                 f"No records index found for dataset {dataset.name}"
             )
 
-        if compute_aggregations and search.include_default_aggregations:
+        first_page = record_from == 0 and not search_after
+        if first_page and search.include_default_aggregations:
             current_aggrs = results.get("aggregations", {})
+            for aggr in self._default_aggregations(dataset):
+                aggr_results = self._es.search(
+                    index=records_index,
+                    query={"query": es_query["query"], "aggs": aggr},
+                )
+                current_aggrs.update(aggr_results["aggregations"])
+            results["aggregations"] = current_aggrs
+
+        return self._search_results(results, search, size=size)
+
+    @staticmethod
+    def _search_request(
+        search: RecordSearch,
+        record_from: int,
+        exclude_fields: Optional[List[str]],
+        search_after: Optional[List[Any]] = None,
+    ) -> Dict[str, Any]:
+        """Builds the es search body for a records search"""
+        compute_aggregations = record_from == 0 and not search_after
+        aggregation_requests = (
+            {**(search.aggregations or {})} if compute_aggregations else {}
+        )
+        # The record id works as tiebreaker, so every record has a unique sort
+        # position and pages can be fetched after the last seen sort values
+        sort = list(search.sort or [])
+        if not any("_id" in sort_field for sort_field in sort):
+            sort.append({"_id": {"order": "asc"}})
+
+        es_query = {
+            "_source": {"excludes": exclude_fields or []},
+            "query": search.query or {"match_all": {}},
+            "sort": sort,
+            "aggs": aggregation_requests,
+        }
+        if search_after:
+            es_query["search_after"] = search_after
+        else:
+            es_query["from"] = record_from
+        return es_query
+
+    def _default_aggregations(self, dataset: BaseDatasetDB) -> List[Dict[str, Any]]:
+        """The default aggregations computed for the first page of a search"""
+        return [
+            aggr
             for aggr in [
                 aggregations.predicted_by(),
                 aggregations.annotated_by(),
@@ -221,15 +386,17 @@ class DatasetRecordsDAO:
                 aggregations.words_cloud(),
                 aggregations.score(),
                 aggregations.custom_fields(self.get_metadata_schema(dataset)),
-            ]:
-                if aggr:
-                    aggr_results = self._es.search(
-                        index=records_index,
-                        query={"query": es_query["query"], "aggs": aggr},
-                    )
-                    current_aggrs.update(aggr_results["aggregations"])
-            results["aggregations"] = current_aggrs
+            ]
+            if aggr
+        ]
 
+    def _search_results(
+        self,
+        results: Dict[str, Any],
+        search: RecordSearch,
+        size: Optional[int] = None,
+    ) -> RecordSearchResults:
+        """Parses an es search response as the records search results"""
         hits = results["hits"]
         total = hits["total"]
         docs = hits["hits"]
@@ -239,6 +406,9 @@ class DatasetRecordsDAO:
             total=total,
             records=list(map(self.esdoc2record, docs)),
         )
+        # A partial page means there are no more records to fetch
+        if docs and (size is None or len(docs) >= size):
+            result.next_search_after = docs[-1].get("sort")
         if search_aggregations:
             parsed_aggregations = parse_aggregations(search_aggregations)
 
@@ -281,6 +451,43 @@ class DatasetRecordsDAO:
         for doc in docs:
             yield self.esdoc2record(doc)
 
+    def scan_matching_queries(
+        self,
+        dataset: BaseDatasetDB,
+        queries: Dict[str, Dict[str, Any]],
+    ) -> Iterable[Tuple[str, List[str]]]:
+        """
+        Iterates over the dataset records matching any of the provided queries, in a
+        single scan. No record data is fetched, just the record ids.
+
+        Parameters
+        ----------
+        dataset:
+            The dataset
+        queries:
+            The es queries, by query name
+
+        Returns
+        -------
+            An iterable over the matching record ids, along with the names of
+            the queries they match
+        """
+        if not queries:
+            return
+        es_query = {
+            "_source": False,
+            "query": filters.boolean_filter(
+                should_filters=[
+                    {"bool": {"filter": query, "_name": name}}
+                    for name, query in queries.items()
+                ]
+            ),
+        }
+        for doc in self._es.list_documents(
+            dataset_records_index(dataset.id), query=es_query
+        ):
+            yield doc["_id"], doc.get("matched_queries", [])
+
     def esdoc2record(self, doc):
         return {**doc["_source"], "id": doc["_id"]}
 
@@ -362,6 +569,156 @@ class DatasetRecordsDAO:
         return self._es.__client__.indices.get_mapping(index=index_name)
 
 
+class AsyncDatasetRecordsDAO:
+    """
+    Datasets records DAO awaiting es I/O for record searches and bulk indexing.
+
+    Index management operations (index creation, mappings updates) are rare and
+    keep running through the sync ``DatasetRecordsDAO`` in the server threadpool.
+    """
+
+    _INSTANCE = None
+
+    @classmethod
+    def get_instance(
+        cls,
+        es: AsyncElasticsearchWrapper = Depends(AsyncElasticsearchWrapper.get_instance),
+        dao: DatasetRecordsDAO = Depends(DatasetRecordsDAO.get_instance),
+    ) -> "AsyncDatasetRecordsDAO":
+        """
+        Creates an async dataset records dao instance
+
+        Parameters
+        ----------
+        es:
+            The async elasticsearch wrapper dependency
+        dao:
+            The dataset records dao, used for index management
+
+        """
+        if not cls._INSTANCE:
+            cls._INSTANCE = cls(es, dao=dao)
+        return cls._INSTANCE
+
+    def __init__(self, es: AsyncElasticsearchWrapper, dao: DatasetRecordsDAO):
+        self._es = es
+        self.__dao__ = dao
+
+    async def add_records(
+        self,
+        dataset: BaseDatasetDB,
+        records: List[BaseRecord],
+        record_class: Type[DBRecord],
+        refresh: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Add records to dataset. See ``DatasetRecordsDAO.add_records``
+
+        Parameters
+        ----------
+        dataset:
+            The dataset
+        records:
+            The list of records
+        record_class:
+            Record class used to convert records to
+        refresh:
+            If True, waits until the records are available for search
+        Returns
+        -------
+            The failed records, with their id, status and error reason
+
+        """
+        documents, metadata_values = await run_in_threadpool(
+            self.__dao__._records2documents, records, record_class
+        )
+
+        index_name = self.__dao__._ready_records_index(
+            dataset, metadata_values
+        ) or await run_in_threadpool(
+            self.__dao__._prepare_records_index, dataset, metadata_values
+        )
+        extra_failures = []
+        failures = await self._es.add_documents(
+            index=index_name,
+            documents=documents,
+            doc_id=lambda _record: _record.get("id"),
+            extra_actions=[self.__dao__._touch_dataset_action(dataset)],
+            refresh="wait_for" if refresh else False,
+            extra_failures=extra_failures,
+        )
+        self.__dao__._datasets_cache.invalidate(dataset.name)
+        self.__dao__._check_stale_dataset(dataset, failures, extra_failures)
+        return failures
+
+    async def search_records(
+        self,
+        dataset: BaseDatasetDB,
+        search: Optional[RecordSearch] = None,
+        size: int = 100,
+        record_from: int = 0,
+        exclude_fields: List[str] = None,
+        search_after: Optional[List[Any]] = None,
+    ) -> RecordSearchResults:
+        """
+        SearchRequest records under a dataset given a search parameters.
+        See ``DatasetRecordsDAO.search_records``
+
+        Parameters
+        ----------
+        dataset:
+            The dataset
+        search:
+            The search params
+        size:
+            Number of records to retrieve (for pagination)
+        record_from:
+            Record from which to retrieve the records (for pagination)
+        exclude_fields:
+            a list of fields to exclude from the result source. Wildcards are accepted
+        search_after:
+            The sort values of the last record of the previous page. If provided,
+            records are fetched after them (deep pagination) and ``record_from``
+            is ignored
+        Returns
+        -------
+            The search result
+
+        """
+        search = search or RecordSearch()
+        records_index = dataset_records_index(dataset.id)
+        es_query = self.__dao__._search_request(
+            search, record_from, exclude_fields, search_after=search_after
+        )
+
+        try:
+            results = await self._es.search(
+                index=records_index, query=es_query, size=size
+            )
+        except ClosedIndexError:
+            raise ClosedDatasetError(dataset.name)
+        except IndexNotFoundError:
+            raise MissingDatasetRecordsError(
+                f"No records index found for dataset {dataset.name}"
+            )
+
+        first_page = record_from == 0 and not search_after
+        if first_page and search.include_default_aggregations:
+            current_aggrs = results.get("aggregations", {})
+            default_aggregations = await run_in_threadpool(
+                self.__dao__._default_aggregations, dataset
+            )
+            for aggr in default_aggregations:
+                aggr_results = await self._es.search(
+                    index=records_index,
+                    query={"query": es_query["query"], "aggs": aggr},
+                )
+                current_aggrs.update(aggr_results["aggregations"])
+            results["aggregations"] = current_aggrs
+
+        return self.__dao__._search_results(results, search, size=size)
+
+
 _instance: Optional[DatasetRecordsDAO] = None
 
 
@@ -58,6 +58,9 @@ class RecordSearchResults(BaseModel):
         Metadata fields aggregations
     metrics: Optional[List[DatasetMetricResults]]
         Calculated metrics for search
+    next_search_after: Optional[List[Any]]
+        The sort values of the last returned record, used to fetch the next page.
+        None if there are no more records
     """
 
     total: int
@@ -65,3 +68,4 @@ class RecordSearchResults(BaseModel):
     aggregations: Optional[Dict[str, Dict[str, Any]]] = Field(default_factory=dict)
     words: Optional[Dict[str, int]] = None
     metadata: Optional[Dict[str, int]] = None
+    next_search_after: Optional[List[Any]] = None
@@ -3,6 +3,7 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, Query, Security
 from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 
 from rubrix.server.commons.api import CommonTaskQueryParams
 from rubrix.server.datasets.service import DatasetsService
@@ -108,7 +109,7 @@ def configure_metrics_endpoints(router: APIRouter, cfg: TaskConfig):
         operation_id=f"metric_summary",
         name="metric_summary",
     )
-    def metric_summary(
+    async def metric_summary(
         name: str,
         metric: str,
         query: cfg.query,
@@ -145,10 +146,14 @@ def configure_metrics_endpoints(router: APIRouter, cfg: TaskConfig):
             The metric summary for a given dataset
 
         """
-        dataset = datasets.find_by_name(
-            name, task=cfg.task, user=current_user, workspace=teams_query.workspace
+        dataset = await run_in_threadpool(
+            datasets.find_by_name,
+            name,
+            task=cfg.task,
+            user=current_user,
+            workspace=teams_query.workspace,
         )
-        return metrics.summarize_metric(
+        return await metrics.async_summarize_metric(
             dataset=dataset,
             owner=current_user.check_workspace(teams_query.workspace),
             metric=metric,
@@ -1,11 +1,17 @@
-from typing import Any, Dict, List, Optional, TypeVar
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
 
 from fastapi import Depends
+from starlette.concurrency import run_in_threadpool
 
 from rubrix.server.commons.errors import EntityNotFoundError, WrongInputParamError
 from rubrix.server.datasets.model import BaseDatasetDB
 from rubrix.server.tasks.commons import BaseRecord, TaskType
-from rubrix.server.tasks.commons.dao.dao import DatasetRecordsDAO, dataset_records_dao
+from rubrix.server.tasks.commons.dao.dao import (
+    AsyncDatasetRecordsDAO,
+    DatasetRecordsDAO,
+    dataset_records_dao,
+)
 from rubrix.server.tasks.commons.dao.model import RecordSearch
 from rubrix.server.tasks.commons.metrics.model.base import (
     BaseMetric,
@@ -24,11 +30,16 @@ class MetricsService:
 
     _INSTANCE = None
 
+    __LOGGER__ = logging.getLogger(__name__)
+
     @classmethod
     def get_instance(
         cls,
         dao: DatasetRecordsDAO = Depends(dataset_records_dao),
         query_builder: EsQueryBuilder = Depends(EsQueryBuilder.get_instance),
+        async_dao: AsyncDatasetRecordsDAO = Depends(
+            AsyncDatasetRecordsDAO.get_instance
+        ),
     ) -> "MetricsService":
         """
         Creates the service instance.
@@ -37,6 +48,8 @@ class MetricsService:
         ----------
         dao:
             The dataset records dao
+        async_dao:
+            The async dataset records dao
 
         Returns
         -------
@@ -44,10 +57,15 @@ class MetricsService:
 
         """
         if not cls._INSTANCE:
-            cls._INSTANCE = cls(dao, query_builder=query_builder)
+            cls._INSTANCE = cls(dao, query_builder=query_builder, async_dao=async_dao)
         return cls._INSTANCE
 
-    def __init__(self, dao: DatasetRecordsDAO, query_builder: EsQueryBuilder):
+    def __init__(
+        self,
+        dao: DatasetRecordsDAO,
+        query_builder: EsQueryBuilder,
+        async_dao: Optional[AsyncDatasetRecordsDAO] = None,
+    ):
         """
         Creates a service instance
 
@@ -55,8 +73,11 @@ class MetricsService:
         ----------
         dao:
             The dataset records dao
+        async_dao:
+            The async dataset records dao, used by async summarizations
         """
         self.__dao__ = dao
+        self.__async_dao__ = async_dao
         self.__query_builder__ = query_builder
 
     @staticmethod
@@ -128,6 +149,264 @@ class MetricsService:
 
         raise WrongInputParamError(f"Cannot process {metric} of type {type(_metric)}")
 
+    async def async_summarize_metric(
+        self,
+        dataset: BaseDatasetDB,
+        metric: str,
+        query: Optional[GenericQuery],
+        **metric_params,
+    ) -> Dict[str, Any]:
+        """
+        Same as ``summarize_metric``, but awaiting the es search request.
+        Python metrics, which scan the dataset records, run in the threadpool
+
+        Parameters
+        ----------
+        dataset:
+            The records dataset
+        metric:
+            The metric id
+        query:
+            An optional query passed for records filtering
+        metric_params:
+            Related metrics parameters
+
+        Returns
+        -------
+            The metric summarization info
+        """
+        _metric = self.find_metric_by_id(metric, task=dataset.task)
+        if not isinstance(_metric, ElasticsearchMetric):
+            return await run_in_threadpool(
+                self.summarize_metric,
+                dataset=dataset,
+                metric=metric,
+                query=query,
+                **metric_params,
+            )
+
+        # Building some aggregation requests involves sync es calls
+        search = await run_in_threadpool(
+            self._metric_search, _metric, metric_params, dataset, query
+        )
+        results = await self.__async_dao__.search_records(
+            dataset, size=0, search=search
+        )
+        return _metric.aggregation_result(
+            results.aggregations.get(_metric.id, results.aggregations)
+        )
+
+    def summarize_metrics(
+        self,
+        dataset: BaseDatasetDB,
+        metrics: Iterable[str],
+        query: Optional[GenericQuery],
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Applies several metric summarizations over the same records filter.
+
+        Aggregations for all elasticsearch metrics are merged and resolved with
+        a single search request. Metrics that cannot be summarized will be logged
+        and returned as an empty dict.
+
+        Parameters
+        ----------
+        dataset:
+            The records dataset
+        metrics:
+            The metric ids
+        query:
+            An optional query passed for records filtering
+
+        Returns
+        -------
+            The metric summarizations, by metric id
+        """
+        results, single_metrics, es_metrics, aggregation_requests = self._plan_metrics(
+            dataset, metrics
+        )
+        aggregations = None
+        if es_metrics:
+            try:
+                aggregations = self.__dao__.search_records(
+                    dataset,
+                    size=0,
+                    search=self._metrics_search(
+                        query=self.__query_builder__(dataset, query=query)
+                        if query
+                        else None,
+                        aggregations=aggregation_requests,
+                    ),
+                ).aggregations
+            except Exception as ex:
+                self.__LOGGER__.warning(
+                    "Cannot compute metrics %s in a single request. Error: %s",
+                    list(es_metrics),
+                    ex,
+                )
+                single_metrics.extend(es_metrics)
+
+        for metric_id in single_metrics:
+            results[metric_id] = self._safe_summarize_metric(
+                dataset, metric=metric_id, query=query
+            )
+        if aggregations is not None:
+            results.update(self._metrics_results(es_metrics, aggregations))
+        return results
+
+    async def async_summarize_metrics(
+        self,
+        dataset: BaseDatasetDB,
+        metrics: Iterable[str],
+        query: Optional[GenericQuery],
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Same as ``summarize_metrics``, but awaiting the es search request.
+
+        Parameters
+        ----------
+        dataset:
+            The records dataset
+        metrics:
+            The metric ids
+        query:
+            An optional query passed for records filtering
+
+        Returns
+        -------
+            The metric summarizations, by metric id
+        """
+        (
+            results,
+            single_metrics,
+            es_metrics,
+            aggregation_requests,
+        ) = await run_in_threadpool(self._plan_metrics, dataset, metrics)
+        aggregations = None
+        if es_metrics:
+            try:
+                es_query = (
+                    await run_in_threadpool(self.__query_builder__, dataset, query)
+                    if query
+                    else None
+                )
+                search_results = await self.__async_dao__.search_records(
+                    dataset,
+                    size=0,
+                    search=self._metrics_search(
+                        query=es_query, aggregations=aggregation_requests
+                    ),
+                )
+                aggregations = search_results.aggregations
+            except Exception as ex:
+                self.__LOGGER__.warning(
+                    "Cannot compute metrics %s in a single request. Error: %s",
+                    list(es_metrics),
+                    ex,
+                )
+                single_metrics.extend(es_metrics)
+
+        for metric_id in single_metrics:
+            results[metric_id] = await run_in_threadpool(
+                self._safe_summarize_metric, dataset, metric_id, query
+            )
+        if aggregations is not None:
+            results.update(self._metrics_results(es_metrics, aggregations))
+        return results
+
+    def _plan_metrics(
+        self, dataset: BaseDatasetDB, metrics: Iterable[str]
+    ) -> Tuple[
+        Dict[str, Dict[str, Any]],
+        List[str],
+        Dict[str, Tuple[ElasticsearchMetric, Set[str]]],
+        Dict[str, Any],
+    ]:
+        """
+        Splits a metrics summarization into the elasticsearch metrics that can be
+        resolved with a single request and the metrics that must be summarized on
+        their own.
+
+        Returns
+        -------
+            A tuple with the already failed metrics results, the metrics to summarize one
+            by one, the elasticsearch metrics (with their aggregation names) and the merged
+            aggregations request
+        """
+        results = {}
+        single_metrics = []
+        es_metrics = {}
+        aggregation_requests = {}
+        for metric_id in metrics:
+            _metric = self.find_metric_by_id(metric_id, task=dataset.task)
+            if not isinstance(_metric, ElasticsearchMetric):
+                single_metrics.append(metric_id)
+                continue
+            try:
+                metric_aggregation = _metric.aggregation_request(
+                    **self._filter_metric_params(
+                        _metric, {"dataset": dataset, "dao": self.__dao__}
+                    )
+                )
+            except Exception as ex:
+                self.__LOGGER__.warning(
+                    "Cannot compute metric [%s]. Error: %s", metric_id, ex
+                )
+                results[metric_id] = {}
+                continue
+            if aggregation_requests.keys() & metric_aggregation.keys():
+                # Aggregation names must be unique along the request
+                single_metrics.append(metric_id)
+                continue
+            aggregation_requests.update(metric_aggregation)
+            es_metrics[metric_id] = (_metric, set(metric_aggregation))
+        return results, single_metrics, es_metrics, aggregation_requests
+
+    @staticmethod
+    def _metrics_search(
+        query: Optional[Dict[str, Any]], aggregations: Dict[str, Any]
+    ) -> RecordSearch:
+        """The search resolving a merged metrics aggregations request"""
+        return RecordSearch(
+            query=query,
+            aggregations=aggregations,
+            include_default_aggregations=False,
+        )
+
+    def _metrics_results(
+        self,
+        es_metrics: Dict[str, Tuple[ElasticsearchMetric, Set[str]]],
+        aggregations: Optional[Dict[str, Any]],
+    ) -> Dict[str, Dict[str, Any]]:
+        """Dispatches each metric its own aggregations from a merged request results"""
+        results = {}
+        for metric_id, (_metric, aggregation_names) in es_metrics.items():
+            metric_aggregations = {
+                name: value
+                for name, value in (aggregations or {}).items()
+                if name in aggregation_names
+            }
+            try:
+                results[metric_id] = _metric.aggregation_result(
+                    metric_aggregations.get(_metric.id, metric_aggregations)
+                )
+            except Exception as ex:
+                self.__LOGGER__.warning(
+                    "Cannot compute metric [%s]. Error: %s", metric_id, ex
+                )
+                results[metric_id] = {}
+        return results
+
+    def _safe_summarize_metric(
+        self, dataset: BaseDatasetDB, metric: str, query: Optional[GenericQuery]
+    ) -> Dict[str, Any]:
+        """Summarizes a metric, returning an empty summary on errors"""
+        try:
+            return self.summarize_metric(dataset=dataset, metric=metric, query=query)
+        except Exception as ex:
+            self.__LOGGER__.warning("Cannot compute metric [%s]. Error: %s", metric, ex)
+            return {}
+
     def _handle_elasticsearch_metric(
         self,
         metric: ElasticsearchMetric,
@@ -153,23 +432,32 @@ class MetricsService:
             The metric summary result
 
         """
-        metric_params = self._filter_metric_params(
-            metric, {**metric_params, "dataset": dataset, "dao": self.__dao__}
-        )
-        metric_aggregation = metric.aggregation_request(**metric_params)
         results = self.__dao__.search_records(
             dataset,
             size=0,  # No records at all
-            search=RecordSearch(
-                query=self.__query_builder__(dataset, query=query) if query else None,
-                aggregations=metric_aggregation,
-                include_default_aggregations=False,
-            ),
+            search=self._metric_search(metric, metric_params, dataset, query),
         )
         return metric.aggregation_result(
             results.aggregations.get(metric.id, results.aggregations)
         )
 
+    def _metric_search(
+        self,
+        metric: ElasticsearchMetric,
+        metric_params: Dict[str, Any],
+        dataset: BaseDatasetDB,
+        query: GenericQuery,
+    ) -> RecordSearch:
+        """The search resolving an elasticsearch metric summary"""
+        metric_params = self._filter_metric_params(
+            metric, {**metric_params, "dataset": dataset, "dao": self.__dao__}
+        )
+        return RecordSearch(
+            query=self.__query_builder__(dataset, query=query) if query else None,
+            aggregations=metric.aggregation_request(**metric_params),
+            include_default_aggregations=False,
+        )
+
     @staticmethod
     def get_dataset_metrics(dataset: BaseDatasetDB) -> List[BaseMetric]:
         """
@@ -65,3 +65,4 @@ class SearchResults(BaseModel):
 
     records: List[Record]
     metrics: Dict[str, Any] = Field(default_factory=dict)
+    next_cursor: Optional[str] = None
@@ -1,12 +1,19 @@
+import base64
+import json
 import logging
-from typing import Iterable, List, Optional, Set, Type
+from typing import Any, Dict, Iterable, List, Optional, Set, Type
 
 from fastapi import Depends
+from starlette.concurrency import run_in_threadpool
 
+from rubrix.server.commons.errors import WrongInputParamError
 from rubrix.server.commons.es_helpers import sort_by2elasticsearch
 from rubrix.server.datasets.model import Dataset
 from rubrix.server.tasks.commons import BaseRecord, EsRecordDataFieldNames
-from rubrix.server.tasks.commons.dao.dao import DatasetRecordsDAO
+from rubrix.server.tasks.commons.dao.dao import (
+    AsyncDatasetRecordsDAO,
+    DatasetRecordsDAO,
+)
 from rubrix.server.tasks.commons.dao.model import RecordSearch
 from rubrix.server.tasks.commons.metrics.service import MetricsService
 from rubrix.server.tasks.search.model import (
@@ -31,9 +38,17 @@ class SearchRecordsService:
         dao: DatasetRecordsDAO = Depends(DatasetRecordsDAO.get_instance),
         metrics: MetricsService = Depends(MetricsService.get_instance),
         query_builder: EsQueryBuilder = Depends(EsQueryBuilder.get_instance),
+        async_dao: AsyncDatasetRecordsDAO = Depends(
+            AsyncDatasetRecordsDAO.get_instance
+        ),
     ):
         if not cls._INSTANCE:
-            cls._INSTANCE = cls(dao=dao, metrics=metrics, query_builder=query_builder)
+            cls._INSTANCE = cls(
+                dao=dao,
+                metrics=metrics,
+                query_builder=query_builder,
+                async_dao=async_dao,
+            )
         return cls._INSTANCE
 
     def __init__(
@@ -41,8 +56,10 @@ class SearchRecordsService:
         dao: DatasetRecordsDAO,
         metrics: MetricsService,
         query_builder: EsQueryBuilder,
+        async_dao: Optional[AsyncDatasetRecordsDAO] = None,
     ):
         self.__dao__ = dao
+        self.__async_dao__ = async_dao
         self.__metrics__ = metrics
         self.__query_builder__ = query_builder
 
@@ -56,55 +73,126 @@ class SearchRecordsService:
         size: int = 100,
         exclude_metrics: bool = True,
         metrics: Optional[Set[str]] = None,
+        cursor: Optional[str] = None,
     ) -> SearchResults:
 
-        if record_from > 0:
+        search_after = self._decode_cursor(cursor)
+        if record_from > 0 or search_after:
             metrics = None
 
-        sort_config = sort_config or SortConfig()
-        exclude_fields = ["metrics.*"] if exclude_metrics else None
         results = self.__dao__.search_records(
             dataset,
-            search=RecordSearch(
-                query=self.__query_builder__(dataset, query),
-                sort=sort_by2elasticsearch(
-                    sort_config.sort_by,
-                    valid_fields=[
-                        "metadata",
-                        EsRecordDataFieldNames.last_updated,
-                        EsRecordDataFieldNames.score,
-                        EsRecordDataFieldNames.predicted,
-                        EsRecordDataFieldNames.predicted_as,
-                        EsRecordDataFieldNames.predicted_by,
-                        EsRecordDataFieldNames.annotated_as,
-                        EsRecordDataFieldNames.annotated_by,
-                        EsRecordDataFieldNames.status,
-                        EsRecordDataFieldNames.event_timestamp,
-                    ],
-                ),
-                include_default_aggregations=False,
+            search=self._records_search(
+                es_query=self.__query_builder__(dataset, query),
+                sort_config=sort_config,
             ),
             size=size,
             record_from=record_from,
-            exclude_fields=exclude_fields,
+            exclude_fields=["metrics.*"] if exclude_metrics else None,
+            search_after=search_after,
+        )
+        metrics_results = (
+            self.__metrics__.summarize_metrics(
+                dataset=dataset, metrics=metrics, query=query
+            )
+            if metrics
+            else {}
         )
-        metrics_results = {}
-        for metric_id in metrics or []:
-            try:
-                metrics = self.__metrics__.summarize_metric(
-                    dataset=dataset, metric=metric_id, query=query
-                )
-                metrics_results[metric_id] = metrics
-            except Exception as ex:
-                self.__LOGGER__.warning(
-                    "Cannot compute metric [%s]. Error: %s", metric_id, ex
-                )
-                metrics_results[metric_id] = {}
 
         return SearchResults(
             total=results.total,
             records=[record_type.parse_obj(r) for r in results.records],
-            metrics=metrics_results if metrics_results else {},
+            metrics=metrics_results,
+            next_cursor=self._encode_cursor(results.next_search_after),
+        )
+
+    async def async_search(
+        self,
+        dataset: Dataset,
+        record_type: Type[BaseRecord],
+        query: Optional[BaseSearchQuery] = None,
+        sort_config: Optional[SortConfig] = None,
+        record_from: int = 0,
+        size: int = 100,
+        exclude_metrics: bool = True,
+        metrics: Optional[Set[str]] = None,
+        cursor: Optional[str] = None,
+    ) -> SearchResults:
+        """Same as ``search``, but awaiting the es requests"""
+        search_after = self._decode_cursor(cursor)
+        if record_from > 0 or search_after:
+            metrics = None
+
+        es_query = await run_in_threadpool(self.__query_builder__, dataset, query)
+        results = await self.__async_dao__.search_records(
+            dataset,
+            search=self._records_search(es_query=es_query, sort_config=sort_config),
+            size=size,
+            record_from=record_from,
+            exclude_fields=["metrics.*"] if exclude_metrics else None,
+            search_after=search_after,
+        )
+        metrics_results = (
+            await self.__metrics__.async_summarize_metrics(
+                dataset=dataset, metrics=metrics, query=query
+            )
+            if metrics
+            else {}
+        )
+
+        return SearchResults(
+            total=results.total,
+            records=[record_type.parse_obj(r) for r in results.records],
+            metrics=metrics_results,
+            next_cursor=self._encode_cursor(results.next_search_after),
+        )
+
+    @staticmethod
+    def _encode_cursor(search_after: Optional[List[Any]]) -> Optional[str]:
+        """Encodes the sort values of a page last record as an opaque cursor"""
+        if not search_after:
+            return None
+        return base64.urlsafe_b64encode(
+            json.dumps(search_after, separators=(",", ":")).encode("utf-8")
+        ).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor: Optional[str]) -> Optional[List[Any]]:
+        """Decodes a cursor into the sort values to search after"""
+        if not cursor:
+            return None
+        try:
+            search_after = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except ValueError:
+            search_after = None
+        if not isinstance(search_after, list) or not search_after:
+            raise WrongInputParamError(f"Invalid search cursor {cursor}")
+        return search_after
+
+    @staticmethod
+    def _records_search(
+        es_query: Dict[str, Any], sort_config: Optional[SortConfig]
+    ) -> RecordSearch:
+        """Builds the records search for a given query and sort config"""
+        sort_config = sort_config or SortConfig()
+        return RecordSearch(
+            query=es_query,
+            sort=sort_by2elasticsearch(
+                sort_config.sort_by,
+                valid_fields=[
+                    "metadata",
+                    EsRecordDataFieldNames.last_updated,
+                    EsRecordDataFieldNames.score,
+                    EsRecordDataFieldNames.predicted,
+                    EsRecordDataFieldNames.predicted_as,
+                    EsRecordDataFieldNames.predicted_by,
+                    EsRecordDataFieldNames.annotated_as,
+                    EsRecordDataFieldNames.annotated_by,
+                    EsRecordDataFieldNames.status,
+                    EsRecordDataFieldNames.event_timestamp,
+                ],
+            ),
+            include_default_aggregations=False,
         )
 
     def scan_records(
@@ -118,3 +206,7 @@ class SearchRecordsService:
             dataset, search=RecordSearch(query=self.__query_builder__(dataset, query))
         ):
             yield record_type.parse_obj(doc)
+
+    def fields_schema(self, dataset: Dataset, field_name: str) -> Dict[str, str]:
+        """Returns the stored data type of dataset fields matching the field name pattern"""
+        return self.__dao__.get_fields_schema(dataset, field_name=field_name)
@@ -0,0 +1,158 @@
+#  coding=utf-8
+#  Copyright 2021-present, the Recognai S.L. team.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+import math
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Type
+
+from starlette.concurrency import run_in_threadpool
+
+from rubrix.server.commons.settings import settings
+from rubrix.server.tasks.commons import BaseRecord, TaskType
+from rubrix.server.tasks.commons.metrics.model.base import BaseTaskMetrics
+
+
+def _compute_records_metrics(
+    metrics: Type[BaseTaskMetrics], records: List[BaseRecord]
+) -> List[Dict[str, Any]]:
+    """Computes the record metrics of a chunk of records. Runs in the worker processes"""
+    return [metrics.record_metrics(record) for record in records]
+
+
+class RecordMetricsExecutor:
+    """
+    Computes record metrics during records ingestion. For the tasks configured in
+    ``settings.record_metrics_parallel_tasks``, big enough bulks are split in chunks
+    computed in parallel by a processes pool. Metrics are computed in the caller
+    thread otherwise.
+    """
+
+    _INSTANCE: "RecordMetricsExecutor" = None
+
+    @classmethod
+    def get_instance(cls) -> "RecordMetricsExecutor":
+        if not cls._INSTANCE:
+            cls._INSTANCE = cls(
+                workers=settings.record_metrics_workers,
+                parallel_tasks=settings.record_metrics_parallel_tasks,
+                min_records=settings.record_metrics_min_records,
+            )
+        return cls._INSTANCE
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        parallel_tasks: Optional[List[str]] = None,
+        min_records: int = 1,
+    ):
+        """
+        Parameters
+        ----------
+        workers:
+            The number of worker processes. Defaults to the number of cpus
+        parallel_tasks:
+            The tasks which record metrics are computed in the processes pool
+        min_records:
+            The min number of records to compute in parallel
+        """
+        self._workers = workers or multiprocessing.cpu_count()
+        self._parallel_tasks = {TaskType(task) for task in parallel_tasks or []}
+        self._min_records = min_records
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def compute(
+        self,
+        task: TaskType,
+        metrics: Type[BaseTaskMetrics],
+        records: List[BaseRecord],
+    ):
+        """Computes and sets the metrics of each record"""
+        if not self._run_in_parallel(task, records):
+            for record in records:
+                record.metrics = metrics.record_metrics(record)
+            return
+
+        chunks = self._chunks(records)
+        results = self.pool.map(
+            _compute_records_metrics, [metrics] * len(chunks), chunks
+        )
+        self._set_metrics(chunks, results)
+
+    async def async_compute(
+        self,
+        task: TaskType,
+        metrics: Type[BaseTaskMetrics],
+        records: List[BaseRecord],
+    ):
+        """Same as ``compute``, but awaiting the processes pool without blocking the event loop"""
+        if not self._run_in_parallel(task, records):
+            return await run_in_threadpool(self.compute, task, metrics, records)
+
+        loop = asyncio.get_event_loop()
+        chunks = self._chunks(records)
+        results = await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    self.pool, _compute_records_metrics, metrics, chunk
+                )
+                for chunk in chunks
+            ]
+        )
+        self._set_metrics(chunks, results)
+
+    @property
+    def pool(self) -> Executor:
+        """The processes pool, created on first use"""
+        with self._lock:
+            if self._pool is None:
+                # Forking a process with running threads (the server ones) is not safe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def close(self):
+        """Shutdowns the processes pool, if any"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def _run_in_parallel(self, task: TaskType, records: List[BaseRecord]) -> bool:
+        return (
+            self._workers > 1
+            and task in self._parallel_tasks
+            and len(records) >= self._min_records
+        )
+
+    def _chunks(self, records: List[BaseRecord]) -> List[List[BaseRecord]]:
+        chunk_size = math.ceil(len(records) / self._workers)
+        return [
+            records[idx : idx + chunk_size]
+            for idx in range(0, len(records), chunk_size)
+        ]
+
+    @staticmethod
+    def _set_metrics(
+        chunks: List[List[BaseRecord]], results: List[List[Dict[str, Any]]]
+    ):
+        for chunk, chunk_metrics in zip(chunks, results):
+            for record, record_metrics in zip(chunk, chunk_metrics):
+                record.metrics = record_metrics
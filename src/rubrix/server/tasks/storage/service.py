@@ -1,11 +1,15 @@
-from typing import List, Type
+from typing import Any, Dict, List, Optional, Type
 
 from fastapi import Depends
 
 from rubrix.server.datasets.model import BaseDatasetDB
 from rubrix.server.tasks.commons import BaseRecord, Record, TaskType
-from rubrix.server.tasks.commons.dao.dao import DatasetRecordsDAO
+from rubrix.server.tasks.commons.dao.dao import (
+    AsyncDatasetRecordsDAO,
+    DatasetRecordsDAO,
+)
 from rubrix.server.tasks.commons.task_factory import TaskFactory
+from rubrix.server.tasks.storage.record_metrics import RecordMetricsExecutor
 
 
 class RecordsStorageService:
@@ -16,13 +20,30 @@ class RecordsStorageService:
     def get_instance(
         cls,
         dao: DatasetRecordsDAO = Depends(DatasetRecordsDAO.get_instance),
+        async_dao: AsyncDatasetRecordsDAO = Depends(
+            AsyncDatasetRecordsDAO.get_instance
+        ),
+        metrics_executor: RecordMetricsExecutor = Depends(
+            RecordMetricsExecutor.get_instance
+        ),
     ) -> "RecordsStorageService":
         if not cls._INSTANCE:
-            cls._INSTANCE = cls(dao)
+            cls._INSTANCE = cls(
+                dao, async_dao=async_dao, metrics_executor=metrics_executor
+            )
         return cls._INSTANCE
 
-    def __init__(self, dao: DatasetRecordsDAO):
+    def __init__(
+        self,
+        dao: DatasetRecordsDAO,
+        async_dao: Optional[AsyncDatasetRecordsDAO] = None,
+        metrics_executor: Optional[RecordMetricsExecutor] = None,
+    ):
         self.__dao__ = dao
+        self.__async_dao__ = async_dao
+        self.__metrics_executor__ = (
+            metrics_executor or RecordMetricsExecutor.get_instance()
+        )
 
         for task in [
             TaskType.text2text,
@@ -38,18 +59,39 @@ class RecordsStorageService:
         dataset: BaseDatasetDB,
         records: List[Record],
         record_type: Type[BaseRecord],
-    ) -> int:
-        """Store a set of records"""
+        refresh: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Store a set of records. If refresh is False, does not wait until records are searchable"""
         self._compute_record_metrics(dataset, records)
         return self.__dao__.add_records(
             dataset=dataset,
             records=records,
             record_class=record_type,
+            refresh=refresh,
+        )
+
+    async def async_store_records(
+        self,
+        dataset: BaseDatasetDB,
+        records: List[Record],
+        record_type: Type[BaseRecord],
+        refresh: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Store a set of records, awaiting the record metrics and the es bulk request"""
+        metrics = TaskFactory.get_task_metrics(dataset.task)
+        if metrics:
+            await self.__metrics_executor__.async_compute(
+                dataset.task, metrics, records
+            )
+        return await self.__async_dao__.add_records(
+            dataset=dataset,
+            records=records,
+            record_class=record_type,
+            refresh=refresh,
         )
 
     def _compute_record_metrics(self, dataset: BaseDatasetDB, records: List[Record]):
         """Computes metrics for each record"""
         metrics = TaskFactory.get_task_metrics(dataset.task)
         if metrics:
-            for record in records:
-                record.metrics = metrics.record_metrics(record)
+            self.__metrics_executor__.compute(dataset.task, metrics, records)
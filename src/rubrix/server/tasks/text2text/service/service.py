@@ -13,17 +13,18 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-from typing import Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 from fastapi import Depends
 
 from rubrix.server.datasets.model import Dataset
 from rubrix.server.tasks.commons import (
+    BulkError,
     BulkResponse,
     EsRecordDataFieldNames,
     SortableField,
 )
-from rubrix.server.tasks.search.model import SortConfig
+from rubrix.server.tasks.search.model import SearchResults, SortConfig
 from rubrix.server.tasks.search.service import SearchRecordsService
 from rubrix.server.tasks.storage.service import RecordsStorageService
 from rubrix.server.tasks.text2text.api.model import (
@@ -66,13 +67,44 @@ class Text2TextService:
         self,
         dataset: Dataset,
         records: List[CreationText2TextRecord],
+        refresh: bool = True,
     ):
-        failed = self.__storage__.store_records(
+        failures = self.__storage__.store_records(
             dataset=dataset,
             records=records,
             record_type=Text2TextRecordDB,
+            refresh=refresh,
+        )
+        return self._bulk_response(dataset, records, failures)
+
+    async def async_add_records(
+        self,
+        dataset: Dataset,
+        records: List[CreationText2TextRecord],
+        refresh: bool = True,
+    ):
+        """Same as ``add_records``, but awaiting the records storage"""
+        failures = await self.__storage__.async_store_records(
+            dataset=dataset,
+            records=records,
+            record_type=Text2TextRecordDB,
+            refresh=refresh,
+        )
+        return self._bulk_response(dataset, records, failures)
+
+    @staticmethod
+    def _bulk_response(
+        dataset: Dataset,
+        records: List[CreationText2TextRecord],
+        failures: List[Dict[str, Any]],
+    ) -> BulkResponse:
+        errors = [BulkError(**failure) for failure in failures]
+        return BulkResponse(
+            dataset=dataset.name,
+            processed=len(records),
+            failed=len(errors),
+            errors=errors or None,
         )
-        return BulkResponse(dataset=dataset.name, processed=len(records), failed=failed)
 
     def search(
         self,
@@ -82,6 +114,7 @@ class Text2TextService:
         record_from: int = 0,
         size: int = 100,
         exclude_metrics: bool = True,
+        cursor: Optional[str] = None,
     ) -> Text2TextSearchResults:
         """
         Run a search in a dataset
@@ -98,6 +131,9 @@ class Text2TextService:
             The record from return results
         size:
             The max number of records to return
+        cursor:
+            The cursor returned by a previous search. If provided, the records
+            following the cursor are returned instead of the ``record_from`` ones
 
         Returns
         -------
@@ -107,6 +143,51 @@ class Text2TextService:
 
         results = self.__search__.search(
             dataset,
+            **self._search_params(
+                query,
+                sort_by=sort_by,
+                record_from=record_from,
+                size=size,
+                exclude_metrics=exclude_metrics,
+            ),
+            cursor=cursor,
+        )
+        return self._search_results(results)
+
+    async def async_search(
+        self,
+        dataset: Dataset,
+        query: Text2TextQuery,
+        sort_by: List[SortableField],
+        record_from: int = 0,
+        size: int = 100,
+        exclude_metrics: bool = True,
+        cursor: Optional[str] = None,
+    ) -> Text2TextSearchResults:
+        """Same as ``search``, but awaiting the es requests"""
+        results = await self.__search__.async_search(
+            dataset,
+            **self._search_params(
+                query,
+                sort_by=sort_by,
+                record_from=record_from,
+                size=size,
+                exclude_metrics=exclude_metrics,
+            ),
+            cursor=cursor,
+        )
+        return self._search_results(results)
+
+    @staticmethod
+    def _search_params(
+        query: Text2TextQuery,
+        sort_by: List[SortableField],
+        record_from: int,
+        size: int,
+        exclude_metrics: bool,
+    ) -> Dict[str, Any]:
+        """The records search service params for a text2text search"""
+        return dict(
             query=query,
             size=size,
             record_from=record_from,
@@ -135,6 +216,9 @@ class Text2TextService:
             },
         )
 
+    @staticmethod
+    def _search_results(results: SearchResults) -> Text2TextSearchResults:
+        """Converts the records search results into text2text search results"""
         if results.metrics:
             results.metrics["words"] = results.metrics["words_cloud"]
             results.metrics["status"] = results.metrics["status_distribution"]
@@ -145,6 +229,7 @@ class Text2TextService:
             aggregations=Text2TextSearchAggregations.parse_obj(results.metrics)
             if results.metrics
             else None,
+            next_cursor=results.next_cursor,
         )
 
     def read_dataset(
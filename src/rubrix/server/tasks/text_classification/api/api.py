@@ -14,23 +14,38 @@
 #  limitations under the License.
 
 import itertools
-from typing import Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 from fastapi import APIRouter, Depends, Query, Security
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
-from rubrix.server.commons.api import CommonTaskQueryParams
+from rubrix.server.commons.api import CommonTaskQueryParams, FastJsonRoute
+from rubrix.server.commons.errors import StaleDatasetError
+from rubrix.server.commons.helpers import flatten_dict
 from rubrix.server.datasets.model import CreationDatasetRequest, Dataset
 from rubrix.server.datasets.service import DatasetsService
 from rubrix.server.security import auth
 from rubrix.server.security.model import User
-from rubrix.server.tasks.commons.api import BulkResponse, PaginationParams, TaskType
+from rubrix.server.tasks.commons.api import (
+    BulkResponse,
+    IngestMode,
+    PaginationParams,
+    TaskType,
+)
+from rubrix.server.tasks.commons.arrow import (
+    arrow_data_response,
+    es_field_type2arrow,
+    import_pyarrow,
+)
 from rubrix.server.tasks.commons.helpers import takeuntil
 from rubrix.server.tasks.text_classification.api.model import (
     CreateLabelingRule,
     DatasetLabelingRulesMetricsSummary,
     LabelingRule,
     LabelingRuleMetricsSummary,
+    LabelingRulesMatchingIds,
+    LabelingRulesMatchingIdsRequest,
     TextClassificationBulkData,
     TextClassificationQuery,
     TextClassificationRecord,
@@ -46,7 +61,7 @@ TASK_TYPE = TaskType.text_classification
 BASE_ENDPOINT = "/{name}/" + TASK_TYPE
 NEW_BASE_ENDPOINT = f"/{TASK_TYPE}/{{name}}"
 
-router = APIRouter(tags=[TASK_TYPE], prefix="/datasets")
+router = APIRouter(tags=[TASK_TYPE], prefix="/datasets", route_class=FastJsonRoute)
 
 
 @router.post(
@@ -55,10 +70,14 @@ router = APIRouter(tags=[TASK_TYPE], prefix="/datasets")
     response_model=BulkResponse,
     response_model_exclude_none=True,
 )
-def bulk_records(
+async def bulk_records(
     name: str,
     bulk: TextClassificationBulkData,
     common_params: CommonTaskQueryParams = Depends(),
+    ingest_mode: IngestMode = Query(
+        IngestMode.default,
+        description="With `bulk`, the request does not wait until records are available for search",
+    ),
     service: TextClassificationService = Depends(
         TextClassificationService.get_instance
     ),
@@ -76,6 +95,8 @@ def bulk_records(
         The bulk data
     common_params:
         Common query params
+    ingest_mode:
+        The records ingestion mode
     service:
         the Service
     datasets:
@@ -89,20 +110,31 @@ def bulk_records(
     """
 
     task = TASK_TYPE
-    dataset = datasets.upsert(
-        CreationDatasetRequest(**{**bulk.dict(), "name": name}),
-        task=task,
-        user=current_user,
-        workspace=common_params.workspace,
-    )
-    result = service.add_records(
-        dataset=dataset,
-        records=bulk.records,
-    )
+    # Records bulked with stale dataset info, deleted by another server process,
+    # are sent again once the dataset is upserted through the slow path
+    for retry in (True, False):
+        dataset = await run_in_threadpool(
+            datasets.upsert,
+            CreationDatasetRequest(**{**bulk.dict(exclude={"records"}), "name": name}),
+            task=task,
+            user=current_user,
+            workspace=common_params.workspace,
+        )
+        try:
+            result = await service.async_add_records(
+                dataset=dataset,
+                records=bulk.records,
+                refresh=ingest_mode != IngestMode.bulk,
+            )
+            break
+        except StaleDatasetError:
+            if not retry:
+                raise
     return BulkResponse(
         dataset=name,
         processed=result.processed,
         failed=result.failed,
+        errors=result.errors,
     )
 
 
@@ -112,7 +144,7 @@ def bulk_records(
     response_model_exclude_none=True,
     operation_id="search_records",
 )
-def search_records(
+async def search_records(
     name: str,
     search: TextClassificationSearchRequest = None,
     common_params: CommonTaskQueryParams = Depends(),
@@ -156,15 +188,20 @@ def search_records(
 
     search = search or TextClassificationSearchRequest()
     query = search.query or TextClassificationQuery()
-    dataset = datasets.find_by_name(
-        name, task=TASK_TYPE, user=current_user, workspace=common_params.workspace
+    dataset = await run_in_threadpool(
+        datasets.find_by_name,
+        name,
+        task=TASK_TYPE,
+        user=current_user,
+        workspace=common_params.workspace,
     )
-    result = service.search(
+    result = await service.async_search(
         dataset=Dataset.parse_obj(dataset),
         query=query,
         sort_by=search.sort,
         record_from=pagination.from_,
         size=pagination.limit,
+        cursor=pagination.cursor,
         exclude_metrics=not include_metrics,
     )
 
@@ -252,6 +289,137 @@ async def stream_data(
     )
 
 
+def _arrow_schema(
+    record: Optional[TextClassificationRecord], fields_schema: Dict[str, str]
+) -> "pyarrow.Schema":
+    """
+    Builds the arrow schema for exported dataset records.
+
+    Inputs and metadata fields are read from the dataset fields schema, and the first
+    record is used to resolve list inputs and multi-label annotations.
+    """
+    pa = import_pyarrow()
+
+    inputs, metadata = {}, {}
+    for field, es_type in fields_schema.items():
+        prefix, field = field.split(".", 1)
+        if prefix == "inputs":
+            # Skip multi-fields, like inputs.text.exact
+            field = field.split(".", 1)[0]
+            is_list = record is not None and isinstance(record.inputs.get(field), list)
+            inputs[field] = pa.list_(pa.string()) if is_list else pa.string()
+        elif prefix == "metadata":
+            metadata[field] = es_field_type2arrow(es_type)
+
+    multi_label = record is not None and record.multi_label
+    fields = [
+        ("id", pa.string()),
+        ("inputs", pa.struct(list(inputs.items()))),
+        (
+            "prediction",
+            pa.list_(pa.struct([("label", pa.string()), ("score", pa.float64())])),
+        ),
+        ("prediction_agent", pa.string()),
+        ("annotation", pa.list_(pa.string()) if multi_label else pa.string()),
+        ("annotation_agent", pa.string()),
+        ("multi_label", pa.bool_()),
+        ("status", pa.string()),
+        ("event_timestamp", pa.timestamp("us")),
+    ]
+    if metadata:
+        fields.append(("metadata", pa.struct(list(metadata.items()))))
+    return pa.schema(fields)
+
+
+def _record2arrow_row(record: TextClassificationRecord) -> Dict[str, Any]:
+    """Converts a record into a row for the arrow export"""
+    annotation = (
+        [str(label.class_label) for label in record.annotation.labels]
+        if record.annotation
+        else None
+    )
+    if annotation and not record.multi_label:
+        annotation = annotation[0]
+
+    return {
+        "id": str(record.id),
+        "inputs": record.inputs,
+        "prediction": [
+            {"label": str(label.class_label), "score": label.score}
+            for label in record.prediction.labels
+        ]
+        if record.prediction
+        else None,
+        "prediction_agent": record.prediction.agent if record.prediction else None,
+        "annotation": annotation,
+        "annotation_agent": record.annotation.agent if record.annotation else None,
+        "multi_label": record.multi_label,
+        "status": record.status,
+        "event_timestamp": record.event_timestamp,
+        "metadata": flatten_dict(record.metadata or {}),
+    }
+
+
+@router.post(
+    BASE_ENDPOINT + "/data:arrow",
+    operation_id="stream_arrow_data",
+    response_class=StreamingResponse,
+)
+def stream_arrow_data(
+    name: str,
+    query: Optional[TextClassificationQuery] = None,
+    common_params: CommonTaskQueryParams = Depends(),
+    limit: Optional[int] = Query(None, description="Limit loaded records", gt=0),
+    service: TextClassificationService = Depends(
+        TextClassificationService.get_instance
+    ),
+    datasets: DatasetsService = Depends(DatasetsService.get_instance),
+    current_user: User = Security(auth.get_user, scopes=[]),
+) -> StreamingResponse:
+    """
+    Creates an Apache Arrow IPC stream over dataset records. Inputs, predictions,
+    annotations and metadata are exported as columns. Record explanations and metrics
+    are not included.
+
+    Parameters
+    ----------
+    name
+        The dataset name
+    query:
+        The stream data query
+    common_params:
+        Common query params
+    limit:
+        The load number of records limit. Optional
+    service:
+        The dataset records service
+    datasets:
+        The datasets service
+    current_user:
+        Request user
+
+    """
+    query = query or TextClassificationQuery()
+    dataset = Dataset.parse_obj(
+        datasets.find_by_name(
+            name, task=TASK_TYPE, user=current_user, workspace=common_params.workspace
+        )
+    )
+    data_stream = iter(service.read_dataset(dataset, query=query))
+    first_record = next(data_stream, None)
+    if first_record is not None:
+        data_stream = itertools.chain([first_record], data_stream)
+
+    return arrow_data_response(
+        data_stream=data_stream,
+        schema=_arrow_schema(
+            first_record, fields_schema=service.fields_schema(dataset)
+        ),
+        to_row=_record2arrow_row,
+        limit=limit,
+    )
+
+
 @router.get(
     f"{NEW_BASE_ENDPOINT}/labeling/rules",
     operation_id="list_labeling_rules",
@@ -334,18 +502,47 @@ async def compute_rule_metrics(
     datasets: DatasetsService = Depends(DatasetsService.get_instance),
     current_user: User = Security(auth.get_user, scopes=[]),
 ) -> LabelingRuleMetricsSummary:
-    dataset = datasets.find_by_name(
+    dataset = await run_in_threadpool(
+        datasets.find_by_name,
         name,
         task=TASK_TYPE,
         user=current_user,
         workspace=common_params.workspace,
     )
 
-    return service.compute_rule_metrics(
+    return await service.async_compute_rule_metrics(
         Dataset.parse_obj(dataset), rule_query=query, label=label
     )
 
 
+@router.post(
+    f"{NEW_BASE_ENDPOINT}/labeling/rules/matching_ids",
+    operation_id="find_rules_matching_ids",
+    description="Finds the ids of records matching a batch of rule queries",
+    response_model=LabelingRulesMatchingIds,
+)
+def find_rules_matching_ids(
+    name: str,
+    request: LabelingRulesMatchingIdsRequest,
+    common_params: CommonTaskQueryParams = Depends(),
+    service: TextClassificationService = Depends(
+        TextClassificationService.get_instance
+    ),
+    datasets: DatasetsService = Depends(DatasetsService.get_instance),
+    current_user: User = Security(auth.get_user, scopes=[]),
+) -> LabelingRulesMatchingIds:
+    dataset = datasets.find_by_name(
+        name,
+        task=TASK_TYPE,
+        user=current_user,
+        workspace=common_params.workspace,
+    )
+
+    return service.find_rules_matching_ids(
+        Dataset.parse_obj(dataset), rule_queries=request.queries
+    )
+
+
 @router.get(
     f"{NEW_BASE_ENDPOINT}/labeling/rules/metrics",
     operation_id="compute_dataset_rules_metrics",
@@ -362,14 +559,15 @@ async def compute_dataset_rules_metrics(
     datasets: DatasetsService = Depends(DatasetsService.get_instance),
     current_user: User = Security(auth.get_user, scopes=[]),
 ) -> DatasetLabelingRulesMetricsSummary:
-    dataset = datasets.find_by_name(
+    dataset = await run_in_threadpool(
+        datasets.find_by_name,
         name,
         task=TASK_TYPE,
         user=current_user,
         workspace=common_params.workspace,
     )
 
-    return service.compute_overall_rules_metrics(Dataset.parse_obj(dataset))
+    return await service.async_compute_overall_rules_metrics(Dataset.parse_obj(dataset))
 
 
 @router.delete(
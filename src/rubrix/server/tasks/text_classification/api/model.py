@@ -103,6 +103,18 @@ class LabelingRuleMetricsSummary(BaseModel):
     annotated_records: int
 
 
+class LabelingRulesMatchingIdsRequest(BaseModel):
+    """The rule queries to find the matching records for"""
+
+    queries: List[str] = Field(min_items=1)
+
+
+class LabelingRulesMatchingIds(BaseModel):
+    """The matching record ids, by rule query"""
+
+    ids: Dict[str, List[str]]
+
+
 class DatasetLabelingRulesMetricsSummary(BaseModel):
     coverage: Optional[float] = None
     coverage_annotated: Optional[float] = None
@@ -2,6 +2,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import Depends
 from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 
 from rubrix.server.commons.errors import (
     EntityAlreadyExistsError,
@@ -15,8 +16,8 @@ from ..api.model import (
     TextClassificationDatasetDB,
 )
 from ...commons import EsRecordDataFieldNames
-from ...commons.dao.dao import DatasetRecordsDAO
-from ...commons.dao.model import RecordSearch
+from ...commons.dao.dao import AsyncDatasetRecordsDAO, DatasetRecordsDAO
+from ...commons.dao.model import RecordSearch, RecordSearchResults
 from ...commons.metrics.model.base import ElasticsearchMetric
 
 
@@ -135,14 +136,23 @@ class LabelingService:
         cls,
         dao: DatasetsDAO = Depends(DatasetsDAO.get_instance),
         records: DatasetRecordsDAO = Depends(DatasetRecordsDAO.get_instance),
+        async_records: AsyncDatasetRecordsDAO = Depends(
+            AsyncDatasetRecordsDAO.get_instance
+        ),
     ):
         if cls._INSTANCE is None:
-            cls._INSTANCE = cls(dao, records)
+            cls._INSTANCE = cls(dao, records, async_records=async_records)
         return cls._INSTANCE
 
-    def __init__(self, dao: DatasetsDAO, records: DatasetRecordsDAO):
+    def __init__(
+        self,
+        dao: DatasetsDAO,
+        records: DatasetRecordsDAO,
+        async_records: Optional[AsyncDatasetRecordsDAO] = None,
+    ):
         self.__dao__ = dao
         self.__records__ = records
+        self.__async_records__ = async_records
 
     def _find_text_classification_dataset(
         self, dataset: BaseDatasetDB
@@ -187,60 +197,110 @@ class LabelingService:
 
         annotated_records = self._count_annotated_records(dataset)
         results = self.__records__.search_records(
-            dataset,
-            size=0,
-            search=RecordSearch(
-                include_default_aggregations=False,
-                aggregations=self.__rule_metrics__.aggregation_request(
-                    rule_query=rule_query, label=label
-                ),
+            dataset, size=0, search=self._rule_metrics_search(rule_query, label)
+        )
+        return results.total, annotated_records, self._rule_summary(results)
+
+    async def async_compute_rule_metrics(
+        self,
+        dataset: BaseDatasetDB,
+        rule_query: str,
+        label: Optional[str] = None,
+    ) -> Tuple[int, int, LabelingRuleSummary]:
+        """Same as ``compute_rule_metrics``, but awaiting the es search requests"""
+        annotated_records = await self._async_count_annotated_records(dataset)
+        results = await self.__async_records__.search_records(
+            dataset, size=0, search=self._rule_metrics_search(rule_query, label)
+        )
+        return results.total, annotated_records, self._rule_summary(results)
+
+    def _rule_metrics_search(
+        self, rule_query: str, label: Optional[str]
+    ) -> RecordSearch:
+        return RecordSearch(
+            include_default_aggregations=False,
+            aggregations=self.__rule_metrics__.aggregation_request(
+                rule_query=rule_query, label=label
             ),
         )
 
+    def _rule_summary(self, results: RecordSearchResults) -> LabelingRuleSummary:
         rule_metrics_summary = self.__rule_metrics__.aggregation_result(
             results.aggregations
         )
-
-        metrics = LabelingRuleSummary.parse_obj(rule_metrics_summary)
-
-        return results.total, annotated_records, metrics
+        return LabelingRuleSummary.parse_obj(rule_metrics_summary)
+
+    def rules_matching_ids(
+        self, dataset: BaseDatasetDB, rule_queries: List[str]
+    ) -> Dict[str, List[str]]:
+        """Finds the ids of the records matched by each rule query, with a single dataset scan"""
+        queries = dict(enumerate(rule_queries))
+        matching_ids = {query: [] for query in rule_queries}
+        for record_id, matched_queries in self.__records__.scan_matching_queries(
+            dataset,
+            queries={
+                str(idx): filters.text_query(query) for idx, query in queries.items()
+            },
+        ):
+            for idx in matched_queries:
+                matching_ids[queries[int(idx)]].append(record_id)
+        return matching_ids
 
     def _count_annotated_records(self, dataset: BaseDatasetDB) -> int:
         results = self.__records__.search_records(
-            dataset,
-            size=0,
-            search=RecordSearch(
-                query=filters.exists_field(EsRecordDataFieldNames.annotated_as),
-                include_default_aggregations=False,
-            ),
+            dataset, size=0, search=self._annotated_records_search()
+        )
+        return results.total
+
+    async def _async_count_annotated_records(self, dataset: BaseDatasetDB) -> int:
+        results = await self.__async_records__.search_records(
+            dataset, size=0, search=self._annotated_records_search()
         )
         return results.total
 
+    @staticmethod
+    def _annotated_records_search() -> RecordSearch:
+        return RecordSearch(
+            query=filters.exists_field(EsRecordDataFieldNames.annotated_as),
+            include_default_aggregations=False,
+        )
+
     def all_rules_metrics(
         self, dataset: BaseDatasetDB
     ) -> Tuple[int, int, DatasetLabelingRulesSummary]:
         rules = self.list_rules(dataset)
         annotated_records = self._count_annotated_records(dataset)
         results = self.__records__.search_records(
-            dataset,
-            size=0,
-            search=RecordSearch(
-                include_default_aggregations=False,
-                aggregations=self.__dataset_rules_metrics__.aggregation_request(
-                    all_rules=rules
-                ),
+            dataset, size=0, search=self._all_rules_metrics_search(rules)
+        )
+        return results.total, annotated_records, self._all_rules_summary(results)
+
+    async def async_all_rules_metrics(
+        self, dataset: BaseDatasetDB
+    ) -> Tuple[int, int, DatasetLabelingRulesSummary]:
+        """Same as ``all_rules_metrics``, but awaiting the es search requests"""
+        rules = await run_in_threadpool(self.list_rules, dataset)
+        annotated_records = await self._async_count_annotated_records(dataset)
+        results = await self.__async_records__.search_records(
+            dataset, size=0, search=self._all_rules_metrics_search(rules)
+        )
+        return results.total, annotated_records, self._all_rules_summary(results)
+
+    def _all_rules_metrics_search(self, rules: List[LabelingRule]) -> RecordSearch:
+        return RecordSearch(
+            include_default_aggregations=False,
+            aggregations=self.__dataset_rules_metrics__.aggregation_request(
+                all_rules=rules
             ),
         )
 
+    def _all_rules_summary(
+        self, results: RecordSearchResults
+    ) -> DatasetLabelingRulesSummary:
         rule_metrics_summary = self.__dataset_rules_metrics__.aggregation_result(
             results.aggregations
         )
-
-        return (
-            results.total,
-            annotated_records,
-            DatasetLabelingRulesSummary.parse_obj(rule_metrics_summary),
-        )
+        return DatasetLabelingRulesSummary.parse_obj(rule_metrics_summary)
 
     def find_rule_by_query(
         self, dataset: BaseDatasetDB, rule_query: str
@@ -13,18 +13,21 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-from typing import Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 from fastapi import Depends
+from starlette.concurrency import run_in_threadpool
 
 from rubrix.server.commons.errors import MissingDatasetRecordsError
+from rubrix.server.datasets.ingest_state import DatasetIngestStates
 from rubrix.server.datasets.model import Dataset
 from rubrix.server.tasks.commons import (
+    BulkError,
     BulkResponse,
     EsRecordDataFieldNames,
     SortableField,
 )
-from rubrix.server.tasks.search.model import SortConfig
+from rubrix.server.tasks.search.model import SearchResults, SortConfig
 from rubrix.server.tasks.search.service import SearchRecordsService
 from rubrix.server.tasks.storage.service import RecordsStorageService
 from rubrix.server.tasks.text_classification.api.model import (
@@ -32,6 +35,7 @@ from rubrix.server.tasks.text_classification.api.model import (
     DatasetLabelingRulesMetricsSummary,
     LabelingRule,
     LabelingRuleMetricsSummary,
+    LabelingRulesMatchingIds,
     TextClassificationQuery,
     TextClassificationRecord,
     TextClassificationRecordDB,
@@ -39,6 +43,8 @@ from rubrix.server.tasks.text_classification.api.model import (
     TextClassificationSearchResults,
 )
 from rubrix.server.tasks.text_classification.service.labeling_service import (
+    DatasetLabelingRulesSummary,
+    LabelingRuleSummary,
     LabelingService,
 )
 
@@ -57,9 +63,12 @@ class TextClassificationService:
         storage: RecordsStorageService = Depends(RecordsStorageService.get_instance),
         labeling: LabelingService = Depends(LabelingService.get_instance),
         search: SearchRecordsService = Depends(SearchRecordsService.get_instance),
+        ingest_states: DatasetIngestStates = Depends(DatasetIngestStates.get_instance),
     ) -> "TextClassificationService":
         if not cls._INSTANCE:
-            cls._INSTANCE = cls(storage, labeling=labeling, search=search)
+            cls._INSTANCE = cls(
+                storage, labeling=labeling, search=search, ingest_states=ingest_states
+            )
         return cls._INSTANCE
 
     def __init__(
@@ -67,25 +76,61 @@ class TextClassificationService:
         storage: RecordsStorageService,
         search: SearchRecordsService,
         labeling: LabelingService,
+        ingest_states: Optional[DatasetIngestStates] = None,
     ):
         self.__storage__ = storage
         self.__search__ = search
         self.__labeling__ = labeling
+        self.__ingest_states__ = ingest_states or DatasetIngestStates.get_instance()
 
     def add_records(
         self,
         dataset: Dataset,
         records: List[CreationTextClassificationRecord],
+        refresh: bool = True,
     ):
         # TODO(@frascuchon): This will moved to dataset settings validation once DatasetSettings join the game!
         self._check_multi_label_integrity(dataset, records)
 
-        failed = self.__storage__.store_records(
+        failures = self.__storage__.store_records(
+            dataset=dataset,
+            records=records,
+            record_type=TextClassificationRecordDB,
+            refresh=refresh,
+        )
+        self._keep_multi_label(dataset, records)
+        errors = [BulkError(**failure) for failure in failures]
+        return BulkResponse(
+            dataset=dataset.name,
+            processed=len(records),
+            failed=len(errors),
+            errors=errors or None,
+        )
+
+    async def async_add_records(
+        self,
+        dataset: Dataset,
+        records: List[CreationTextClassificationRecord],
+        refresh: bool = True,
+    ):
+        """Same as ``add_records``, but awaiting the records storage"""
+        # The integrity check may query es on an ingest state miss
+        await run_in_threadpool(self._check_multi_label_integrity, dataset, records)
+
+        failures = await self.__storage__.async_store_records(
             dataset=dataset,
             records=records,
             record_type=TextClassificationRecordDB,
+            refresh=refresh,
+        )
+        self._keep_multi_label(dataset, records)
+        errors = [BulkError(**failure) for failure in failures]
+        return BulkResponse(
+            dataset=dataset.name,
+            processed=len(records),
+            failed=len(errors),
+            errors=errors or None,
         )
-        return BulkResponse(dataset=dataset.name, processed=len(records), failed=failed)
 
     def search(
         self,
@@ -95,6 +140,7 @@ class TextClassificationService:
         record_from: int = 0,
         size: int = 100,
         exclude_metrics: bool = True,
+        cursor: Optional[str] = None,
     ) -> TextClassificationSearchResults:
         """
         Run a search in a dataset
@@ -111,6 +157,9 @@ class TextClassificationService:
             The record from return results
         size:
             The max number of records to return
+        cursor:
+            The cursor returned by a previous search. If provided, the records
+            following the cursor are returned instead of the ``record_from`` ones
 
         Returns
         -------
@@ -120,6 +169,51 @@ class TextClassificationService:
 
         results = self.__search__.search(
             dataset,
+            **self._search_params(
+                query,
+                sort_by=sort_by,
+                record_from=record_from,
+                size=size,
+                exclude_metrics=exclude_metrics,
+            ),
+            cursor=cursor,
+        )
+        return self._search_results(results)
+
+    async def async_search(
+        self,
+        dataset: Dataset,
+        query: TextClassificationQuery,
+        sort_by: List[SortableField],
+        record_from: int = 0,
+        size: int = 100,
+        exclude_metrics: bool = True,
+        cursor: Optional[str] = None,
+    ) -> TextClassificationSearchResults:
+        """Same as ``search``, but awaiting the es requests"""
+        results = await self.__search__.async_search(
+            dataset,
+            **self._search_params(
+                query,
+                sort_by=sort_by,
+                record_from=record_from,
+                size=size,
+                exclude_metrics=exclude_metrics,
+            ),
+            cursor=cursor,
+        )
+        return self._search_results(results)
+
+    @staticmethod
+    def _search_params(
+        query: TextClassificationQuery,
+        sort_by: List[SortableField],
+        record_from: int,
+        size: int,
+        exclude_metrics: bool,
+    ) -> Dict[str, Any]:
+        """The records search service params for a text classification search"""
+        return dict(
             query=query,
             record_type=TextClassificationRecord,
             record_from=record_from,
@@ -153,6 +247,9 @@ class TextClassificationService:
             ),
         )
 
+    @staticmethod
+    def _search_results(results: SearchResults) -> TextClassificationSearchResults:
+        """Converts the records search results into text classification search results"""
         if results.metrics:
             results.metrics["words"] = results.metrics["words_cloud"]
             results.metrics["status"] = results.metrics["status_distribution"]
@@ -165,6 +262,7 @@ class TextClassificationService:
             aggregations=TextClassificationSearchAggregations.parse_obj(results.metrics)
             if results.metrics
             else None,
+            next_cursor=results.next_cursor,
         )
 
     def read_dataset(
@@ -188,10 +286,32 @@ class TextClassificationService:
             dataset, query=query, record_type=TextClassificationRecord
         )
 
+    def fields_schema(self, dataset: Dataset) -> Dict[str, str]:
+        """
+        Returns the inputs and metadata fields of dataset records
+
+        Parameters
+        ----------
+        dataset:
+            The dataset
+
+        Returns
+        -------
+            A dictionary with full field name as key and its stored data type as value
+        """
+        return {
+            **self.__search__.fields_schema(dataset, field_name="inputs.*"),
+            **self.__search__.fields_schema(dataset, field_name="metadata.*"),
+        }
+
     def _check_multi_label_integrity(
         self, dataset: Dataset, records: List[CreationTextClassificationRecord]
     ):
-        is_multi_label_dataset = self._is_dataset_multi_label(dataset)
+        state = self.__ingest_states__.get(dataset.id)
+        if state and state.multi_label is not None:
+            is_multi_label_dataset = state.multi_label
+        else:
+            is_multi_label_dataset = self._is_dataset_multi_label(dataset)
         if is_multi_label_dataset is not None:
             is_multi_label = records[0].multi_label
             assert is_multi_label == is_multi_label_dataset, (
@@ -201,6 +321,14 @@ class TextClassificationService:
                 )
             )
 
+    def _keep_multi_label(
+        self, dataset: Dataset, records: List[CreationTextClassificationRecord]
+    ):
+        """Keeps the multi-label flag of stored records in the dataset ingest state"""
+        state = self.__ingest_states__.get(dataset.id)
+        if state and records:
+            state.multi_label = records[0].multi_label
+
     def _is_dataset_multi_label(self, dataset: Dataset) -> Optional[bool]:
         try:
             results = self.__search__.search(
@@ -345,17 +473,40 @@ class TextClassificationService:
         """
 
         rule_query = rule_query.strip()
+        label = self._rule_label(dataset, rule_query, label)
+        total, annotated, metrics = self.__labeling__.compute_rule_metrics(
+            dataset, rule_query=rule_query, label=label
+        )
+        return self._rule_metrics_summary(total, annotated, metrics)
+
+    async def async_compute_rule_metrics(
+        self,
+        dataset: Dataset,
+        rule_query: str,
+        label: Optional[str],
+    ) -> LabelingRuleMetricsSummary:
+        """Same as ``compute_rule_metrics``, but awaiting the es search requests"""
+        rule_query = rule_query.strip()
+        label = await run_in_threadpool(self._rule_label, dataset, rule_query, label)
+        total, annotated, metrics = await self.__labeling__.async_compute_rule_metrics(
+            dataset, rule_query=rule_query, label=label
+        )
+        return self._rule_metrics_summary(total, annotated, metrics)
 
+    def _rule_label(
+        self, dataset: Dataset, rule_query: str, label: Optional[str]
+    ) -> Optional[str]:
+        """The provided label, or the label of the stored rule with the same query"""
         if label is None:
             for rule in self.get_labeling_rules(dataset):
                 if rule.query == rule_query:
-                    label = rule.label
-                    break
-
-        total, annotated, metrics = self.__labeling__.compute_rule_metrics(
-            dataset, rule_query=rule_query, label=label
-        )
+                    return rule.label
+        return label
 
+    @staticmethod
+    def _rule_metrics_summary(
+        total: int, annotated: int, metrics: LabelingRuleSummary
+    ) -> LabelingRuleMetricsSummary:
         coverage = metrics.covered_records / total if total > 0 else None
         coverage_annotated = (
             metrics.annotated_covered_records / annotated if annotated > 0 else None
@@ -370,8 +521,44 @@ class TextClassificationService:
             precision=metrics.precision if annotated > 0 else None,
         )
 
+    def find_rules_matching_ids(
+        self, dataset: Dataset, rule_queries: List[str]
+    ) -> LabelingRulesMatchingIds:
+        """
+        Finds the records matched by a batch of rule queries. Only record ids are
+        retrieved, so rules can be applied without fetching the records data.
+
+        Parameters
+        ----------
+        dataset:
+            The dataset
+        rule_queries:
+            The rule queries
+
+        Returns
+        -------
+            The matching record ids, by rule query
+
+        """
+        return LabelingRulesMatchingIds(
+            ids=self.__labeling__.rules_matching_ids(dataset, rule_queries=rule_queries)
+        )
+
     def compute_overall_rules_metrics(self, dataset: Dataset):
         total, annotated, metrics = self.__labeling__.all_rules_metrics(dataset)
+        return self._overall_rules_metrics_summary(total, annotated, metrics)
+
+    async def async_compute_overall_rules_metrics(self, dataset: Dataset):
+        """Same as ``compute_overall_rules_metrics``, but awaiting the es search requests"""
+        total, annotated, metrics = await self.__labeling__.async_all_rules_metrics(
+            dataset
+        )
+        return self._overall_rules_metrics_summary(total, annotated, metrics)
+
+    @staticmethod
+    def _overall_rules_metrics_summary(
+        total: int, annotated: int, metrics: DatasetLabelingRulesSummary
+    ) -> DatasetLabelingRulesMetricsSummary:
         coverage = metrics.covered_records / total if total else None
         coverage_annotated = (
             metrics.annotated_covered_records / annotated if annotated else None
@@ -18,14 +18,17 @@ from typing import Iterable, Optional
 
 from fastapi import APIRouter, Depends, Query, Security
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
-from rubrix.server.commons.api import CommonTaskQueryParams
+from rubrix.server.commons.api import CommonTaskQueryParams, FastJsonRoute
+from rubrix.server.commons.errors import StaleDatasetError
 from rubrix.server.datasets.model import CreationDatasetRequest, Dataset
 from rubrix.server.datasets.service import DatasetsService
 from rubrix.server.security import auth
 from rubrix.server.security.model import User
 from rubrix.server.tasks.commons import (
     BulkResponse,
+    IngestMode,
     PaginationParams,
     TaskType,
 )
@@ -45,7 +48,7 @@ from rubrix.server.tasks.token_classification.service.service import (
 TASK_TYPE = TaskType.token_classification
 BASE_ENDPOINT = "/{name}/" + TASK_TYPE
 
-router = APIRouter(tags=[TASK_TYPE], prefix="/datasets")
+router = APIRouter(tags=[TASK_TYPE], prefix="/datasets", route_class=FastJsonRoute)
 
 
 @router.post(
@@ -54,10 +57,14 @@ router = APIRouter(tags=[TASK_TYPE], prefix="/datasets")
     response_model=BulkResponse,
     response_model_exclude_none=True,
 )
-def bulk_records(
+async def bulk_records(
     name: str,
     bulk: TokenClassificationBulkData,
     common_params: CommonTaskQueryParams = Depends(),
+    ingest_mode: IngestMode = Query(
+        IngestMode.default,
+        description="With `bulk`, the request does not wait until records are available for search",
+    ),
     service: TokenClassificationService = Depends(token_classification_service),
     datasets: DatasetsService = Depends(DatasetsService.get_instance),
     current_user: User = Security(auth.get_user, scopes=[]),
@@ -73,6 +80,8 @@ def bulk_records(
         The bulk data
     common_params:
         Common query params
+    ingest_mode:
+        The records ingestion mode
     service:
         the Service
     datasets:
@@ -85,20 +94,31 @@ def bulk_records(
         Bulk response data
     """
 
-    dataset = datasets.upsert(
-        CreationDatasetRequest(**{**bulk.dict(), "name": name}),
-        user=current_user,
-        workspace=common_params.workspace,
-        task=TASK_TYPE,
-    )
-    result = service.add_records(
-        dataset=dataset,
-        records=bulk.records,
-    )
+    # Records bulked with stale dataset info, deleted by another server process,
+    # are sent again once the dataset is upserted through the slow path
+    for retry in (True, False):
+        dataset = await run_in_threadpool(
+            datasets.upsert,
+            CreationDatasetRequest(**{**bulk.dict(exclude={"records"}), "name": name}),
+            user=current_user,
+            workspace=common_params.workspace,
+            task=TASK_TYPE,
+        )
+        try:
+            result = await service.async_add_records(
+                dataset=dataset,
+                records=bulk.records,
+                refresh=ingest_mode != IngestMode.bulk,
+            )
+            break
+        except StaleDatasetError:
+            if not retry:
+                raise
     return BulkResponse(
         dataset=name,
         processed=result.processed,
         failed=result.failed,
+        errors=result.errors,
     )
 
 
@@ -108,7 +128,7 @@ def bulk_records(
     response_model_exclude_none=True,
     operation_id="search_records",
 )
-def search_records(
+async def search_records(
     name: str,
     search: TokenClassificationSearchRequest = None,
     common_params: CommonTaskQueryParams = Depends(),
@@ -151,15 +171,20 @@ def search_records(
     search = search or TokenClassificationSearchRequest()
     query = search.query or TokenClassificationQuery()
 
-    dataset = datasets.find_by_name(
-        name, task=TASK_TYPE, user=current_user, workspace=common_params.workspace
+    dataset = await run_in_threadpool(
+        datasets.find_by_name,
+        name,
+        task=TASK_TYPE,
+        user=current_user,
+        workspace=common_params.workspace,
     )
-    result = service.search(
+    result = await service.async_search(
         dataset=Dataset.parse_obj(dataset),
         query=query,
         sort_by=search.sort,
         record_from=pagination.from_,
         size=pagination.limit,
+        cursor=pagination.cursor,
         exclude_metrics=not include_metrics,
     )
 
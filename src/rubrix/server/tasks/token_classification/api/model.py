@@ -12,7 +12,8 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-from collections import defaultdict
+from array import array
+from bisect import bisect_right
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Set, Tuple
 
@@ -107,8 +108,8 @@ class CreationTokenClassificationRecord(BaseRecord[TokenClassificationAnnotation
     text: str = Field()
     _raw_text: Optional[str] = Field(alias="raw_text")
 
-    __chars2tokens__: Dict[int, int] = None
-    __tokens2chars__: Dict[int, Tuple[int, int]] = None
+    __token_starts__: array = None
+    __token_ends__: array = None
 
     @root_validator(pre=True)
     def accept_old_fashion_text_field(cls, values):
@@ -121,75 +122,91 @@ class CreationTokenClassificationRecord(BaseRecord[TokenClassificationAnnotation
     def __init__(self, **data):
         super().__init__(**data)
 
-        self.__chars2tokens__, self.__tokens2chars__ = self.__build_indices_map__()
+        self.__offsets_index__()
 
         self.check_annotation(self.prediction)
         self.check_annotation(self.annotation)
 
     def char_id2token_id(self, char_idx: int) -> Optional[int]:
-        return self.__chars2tokens__.get(char_idx)
+        """The token idx where the ``char_idx`` character belongs to, if any"""
+        if not 0 <= char_idx < len(self.text):
+            return None
+        token_starts, _ = self.__offsets_index__()
+        token_idx = bisect_right(token_starts, char_idx) - 1
+        if token_idx < 0:
+            return None
+
+        token = self.tokens[token_idx]
+        relative_idx = char_idx - token_starts[token_idx]
+        if relative_idx < len(token) and self.text[char_idx] == token[relative_idx]:
+            return token_idx
+        return None
 
     def token_span(self, token_idx: int) -> Tuple[int, int]:
-        if token_idx not in self.__tokens2chars__:
+        """The first and last char idx of a token"""
+        token_starts, token_ends = self.__offsets_index__()
+        if not 0 <= token_idx < len(token_ends):
+            raise IndexError(f"Token id {token_idx} out of bounds")
+        start, end = token_starts[token_idx], token_ends[token_idx]
+        if end < 0:
             raise IndexError(f"Token id {token_idx} out of bounds")
-        return self.__tokens2chars__[token_idx]
+        if self.text[start] != self.tokens[token_idx][0]:
+            # Only the first token can start with a not aligned char
+            start = next(
+                idx
+                for idx in range(start, end + 1)
+                if self.char_id2token_id(idx) == token_idx
+            )
+        return start, end
 
     @validator("text")
     def check_text_content(cls, text: str):
         assert text and text.strip(), "No text or empty text provided"
         return text
 
-    def __build_indices_map__(
-        self,
-    ) -> Tuple[Dict[int, int], Dict[int, Tuple[int, int]]]:
+    def __offsets_index__(self) -> Tuple[array, array]:
         """
-        Build the indices mapping between text characters and tokens where belongs to,
-        and vice versa.
+        The tokens offsets index. Built on first use for records created
+        with ``construct``, which skips ``__init__``
+        """
+        if self.__token_starts__ is None:
+            self.__token_starts__, self.__token_ends__ = self.__build_offsets_index__()
+        return self.__token_starts__, self.__token_ends__
 
-        chars2tokens index contains is the token idx where i char is contained (if any).
+    def __build_offsets_index__(self) -> Tuple[array, array]:
+        """
+        Build the tokens offsets index, as two arrays with the text offset where each
+        token starts and the last text offset matching the token chars (-1 if none).
 
-        Out-of-token characters won't be included in this map,
-        so access should be using ``chars2tokens_map.get(i)``
-        instead of ``chars2tokens_map[i]``.
+        Tokens are aligned with the text greedily: the first token starts at the text
+        beginning and each following token starts at the first occurrence of its first
+        char after the end of the previous token. Tokens that cannot be aligned are
+        not included in the index.
 
+        Lookups are resolved with a binary search over the token starts,
+        so the text characters are never indexed one by one.
         """
-
-        def chars2tokens_index():
-            chars_map = {}
-            current_token = 0
-            current_token_char_start = 0
-            for idx, char in enumerate(self.text):
-                relative_idx = idx - current_token_char_start
-                if (
-                    relative_idx < len(self.tokens[current_token])
-                    and char == self.tokens[current_token][relative_idx]
-                ):
-                    chars_map[idx] = current_token
-                elif (
-                    current_token + 1 < len(self.tokens)
-                    and relative_idx >= len(self.tokens[current_token])
-                    and char == self.tokens[current_token + 1][0]
-                ):
-                    current_token += 1
-                    current_token_char_start += relative_idx
-                    chars_map[idx] = current_token
-
-            return chars_map
-
-        def tokens2chars_index(
-            chars2tokens: Dict[int, int]
-        ) -> Dict[int, Tuple[int, int]]:
-            tokens2chars_map = defaultdict(list)
-            for c, t in chars2tokens.items():
-                tokens2chars_map[t].append(c)
-
-            return {
-                token_idx: (min(chars), max(chars))
-                for token_idx, chars in tokens2chars_map.items()
-            }
-
-        chars2tokens_idx = chars2tokens_index()
-        return chars2tokens_idx, tokens2chars_index(chars2tokens_idx)
+        starts, ends = array("i"), array("i")
+
+        start = 0
+        for idx, token in enumerate(self.tokens):
+            if idx > 0:
+                start = self.text.find(token[0], start + len(self.tokens[idx - 1]))
+                if start < 0:
+                    break
+            end = start + len(token) - 1
+            if self.text[start : end + 1] != token:
+                # Partially aligned token: keep the last matching char
+                matching_chars = [
+                    char_idx
+                    for char_idx in range(start, min(end + 1, len(self.text)))
+                    if self.text[char_idx] == token[char_idx - start]
+                ]
+                end = matching_chars[-1] if matching_chars else -1
+            starts.append(start)
+            ends.append(end)
+
+        return starts, ends
 
     def check_annotation(
         self,
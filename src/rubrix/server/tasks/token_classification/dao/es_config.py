@@ -17,6 +17,24 @@ def mentions_mappings():
     }
 
 
+def compact_tokens_mappings():
+    """
+    Mappings for the compact tokens metrics. Only fields used by metrics
+    aggregations are indexed, the rest are just kept in the source
+    """
+    not_indexed = {"index": False, "doc_values": False}
+    return {
+        "properties": {
+            "value": mappings.keyword_field(),
+            "length": {"type": "integer"},
+            "capitalness": mappings.keyword_field(),
+            "char_start": {"type": "integer", **not_indexed},
+            "char_end": {"type": "integer", **not_indexed},
+            "tag": {"type": "keyword", **not_indexed},
+        }
+    }
+
+
 def token_classification_mappings():
     metrics_mentions_mappings = nested_mappings_from_base_model(MentionMetrics)
     _mentions_mappings = mentions_mappings()
@@ -43,6 +61,7 @@ def token_classification_mappings():
             "mentions": _mentions_mappings,
             "tokens": mappings.keyword_field(),
             "metrics.tokens": nested_mappings_from_base_model(TokenMetrics),
+            "metrics.compact_tokens": compact_tokens_mappings(),
             "metrics.predicted.mentions": metrics_mentions_mappings,
             "metrics.annotated.mentions": metrics_mentions_mappings,
         },
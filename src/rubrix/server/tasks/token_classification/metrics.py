@@ -3,6 +3,7 @@ from typing import Any, ClassVar, Dict, Iterable, List, Optional, Set, Tuple
 from pydantic import BaseModel, Field
 
 from rubrix.server.commons.es_helpers import aggregations
+from rubrix.server.commons.settings import settings
 from rubrix.server.tasks.commons.metrics import CommonTasksMetrics
 from rubrix.server.tasks.commons.metrics.model.base import (
     BaseMetric,
@@ -314,6 +315,7 @@ class TokenClassificationMetrics(BaseTaskMetrics[TokenClassificationRecord]):
     _ANNOTATED_MENTIONS_NAMESPACE = "metrics.annotated.mentions"
 
     _TOKENS_NAMESPACE = "metrics.tokens"
+    _COMPACT_TOKENS_NAMESPACE = "metrics.compact_tokens"
 
     @staticmethod
     def density(value: int, sentence_length: int) -> float:
@@ -417,12 +419,51 @@ class TokenClassificationMetrics(BaseTaskMetrics[TokenClassificationRecord]):
             for char_start, char_end in [record.token_span(token_idx)]
         ]
 
+    @classmethod
+    def build_compact_tokens_metrics(
+        cls, record: TokenClassificationRecord
+    ) -> Dict[str, List[Any]]:
+        """
+        Same info as ``build_tokens_metrics``, but stored as parallel arrays,
+        one per token field, instead of a nested object per token
+        """
+        spans = (
+            record.prediction.entities
+            if record.prediction
+            else (record.annotation.entities if record.annotation else None)
+        )
+        tags = cls.spans2iob(spans, record)
+        char_starts, char_ends = zip(
+            *[record.token_span(token_idx) for token_idx in range(len(record.tokens))]
+        )
+
+        return {
+            "value": record.tokens,
+            "char_start": list(char_starts),
+            "char_end": list(char_ends),
+            "length": [
+                1 + (char_end - char_start)
+                for char_start, char_end in zip(char_starts, char_ends)
+            ],
+            "capitalness": [cls.capitalness(token) for token in record.tokens],
+            "tag": tags or None,
+        }
+
     @classmethod
     def record_metrics(cls, record: TokenClassificationRecord) -> Dict[str, Any]:
-        """Compute metrics at record level"""
+        """
+        Compute metrics at record level. If ``settings.compact_token_metrics``
+        is enabled, tokens metrics are stored as parallel arrays
+        """
+        if settings.compact_token_metrics:
+            tokens_metrics = {
+                "compact_tokens": cls.build_compact_tokens_metrics(record)
+            }
+        else:
+            tokens_metrics = {"tokens": cls.build_tokens_metrics(record)}
 
         return {
-            "tokens": cls.build_tokens_metrics(record),
+            **tokens_metrics,
             "tokens_length": len(record.tokens),
             **cls.build_mentions_metrics(record),
         }
@@ -468,6 +509,30 @@ class TokenClassificationMetrics(BaseTaskMetrics[TokenClassificationRecord]):
             ),
         ),
     ]
+    # With compact tokens metrics, token fields are not nested, so the
+    # terms and histogram aggregations count records instead of tokens
+    _COMPACT_TOKENS_METRICS = [
+        _TOKENS_METRICS[0],
+        TermsAggregation(
+            id="token_frequency",
+            name="Tokens frequency distribution",
+            description="Computes the number of records containing each token",
+            field=f"{_COMPACT_TOKENS_NAMESPACE}.value",
+        ),
+        HistogramAggregation(
+            id="token_length",
+            name="Token length distribution",
+            description="Computes the number of records containing tokens of each length in number of characters",
+            field=f"{_COMPACT_TOKENS_NAMESPACE}.length",
+            fixed_interval=1,
+        ),
+        TermsAggregation(
+            id="token_capitalness",
+            name="Token capitalness distribution",
+            description="Computes the number of records containing tokens of each capitalization",
+            field=f"{_COMPACT_TOKENS_NAMESPACE}.capitalness",
+        ),
+    ]
     _PREDICTED_METRICS = [
         EntityDensity(
             id="predicted_entity_density",
@@ -583,7 +648,11 @@ class TokenClassificationMetrics(BaseTaskMetrics[TokenClassificationRecord]):
             name="Annotated labels distribution",
             field="annotated_as",
         ),
-        *_TOKENS_METRICS,
+        *(
+            _COMPACT_TOKENS_METRICS
+            if settings.compact_token_metrics
+            else _TOKENS_METRICS
+        ),
         *_PREDICTED_METRICS,
         *_ANNOTATED_METRICS,
         F1Metric(
@@ -13,12 +13,13 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-from typing import Iterable, List
+from typing import Any, Dict, Iterable, List, Optional
 
 from fastapi import Depends
 
 from rubrix.server.datasets.model import Dataset
 from rubrix.server.tasks.commons import (
+    BulkError,
     BulkResponse,
     EsRecordDataFieldNames,
     SortableField,
@@ -27,7 +28,7 @@ from rubrix.server.tasks.commons import (
 from rubrix.server.tasks.commons.dao.dao import DatasetRecordsDAO, dataset_records_dao
 from rubrix.server.tasks.commons.dao.model import RecordSearch
 from rubrix.server.tasks.commons.metrics.service import MetricsService
-from rubrix.server.tasks.search.model import SortConfig
+from rubrix.server.tasks.search.model import SearchResults, SortConfig
 from rubrix.server.tasks.search.service import SearchRecordsService
 from rubrix.server.tasks.storage.service import RecordsStorageService
 from rubrix.server.tasks.token_classification.api.model import (
@@ -73,13 +74,44 @@ class TokenClassificationService:
         self,
         dataset: Dataset,
         records: List[CreationTokenClassificationRecord],
+        refresh: bool = True,
     ):
-        failed = self.__storage__.store_records(
+        failures = self.__storage__.store_records(
             dataset=dataset,
             records=records,
             record_type=TokenClassificationRecordDB,
+            refresh=refresh,
+        )
+        return self._bulk_response(dataset, records, failures)
+
+    async def async_add_records(
+        self,
+        dataset: Dataset,
+        records: List[CreationTokenClassificationRecord],
+        refresh: bool = True,
+    ):
+        """Same as ``add_records``, but awaiting the records storage"""
+        failures = await self.__storage__.async_store_records(
+            dataset=dataset,
+            records=records,
+            record_type=TokenClassificationRecordDB,
+            refresh=refresh,
+        )
+        return self._bulk_response(dataset, records, failures)
+
+    @staticmethod
+    def _bulk_response(
+        dataset: Dataset,
+        records: List[CreationTokenClassificationRecord],
+        failures: List[Dict[str, Any]],
+    ) -> BulkResponse:
+        errors = [BulkError(**failure) for failure in failures]
+        return BulkResponse(
+            dataset=dataset.name,
+            processed=len(records),
+            failed=len(errors),
+            errors=errors or None,
         )
-        return BulkResponse(dataset=dataset.name, processed=len(records), failed=failed)
 
     def search(
         self,
@@ -89,6 +121,7 @@ class TokenClassificationService:
         record_from: int = 0,
         size: int = 100,
         exclude_metrics: bool = True,
+        cursor: Optional[str] = None,
     ) -> TokenClassificationSearchResults:
         """
         Run a search in a dataset
@@ -105,6 +138,9 @@ class TokenClassificationService:
             The record from return results
         size:
             The max number of records to return
+        cursor:
+            The cursor returned by a previous search. If provided, the records
+            following the cursor are returned instead of the ``record_from`` ones
 
         Returns
         -------
@@ -114,6 +150,51 @@ class TokenClassificationService:
 
         results = self.__search__.search(
             dataset,
+            **self._search_params(
+                query,
+                sort_by=sort_by,
+                record_from=record_from,
+                size=size,
+                exclude_metrics=exclude_metrics,
+            ),
+            cursor=cursor,
+        )
+        return self._search_results(results)
+
+    async def async_search(
+        self,
+        dataset: Dataset,
+        query: TokenClassificationQuery,
+        sort_by: List[SortableField],
+        record_from: int = 0,
+        size: int = 100,
+        exclude_metrics: bool = True,
+        cursor: Optional[str] = None,
+    ) -> TokenClassificationSearchResults:
+        """Same as ``search``, but awaiting the es requests"""
+        results = await self.__search__.async_search(
+            dataset,
+            **self._search_params(
+                query,
+                sort_by=sort_by,
+                record_from=record_from,
+                size=size,
+                exclude_metrics=exclude_metrics,
+            ),
+            cursor=cursor,
+        )
+        return self._search_results(results)
+
+    @staticmethod
+    def _search_params(
+        query: TokenClassificationQuery,
+        sort_by: List[SortableField],
+        record_from: int,
+        size: int,
+        exclude_metrics: bool,
+    ) -> Dict[str, Any]:
+        """The records search service params for a token classification search"""
+        return dict(
             query=query,
             record_type=TokenClassificationRecord,
             size=size,
@@ -149,6 +230,9 @@ class TokenClassificationService:
             ),
         )
 
+    @staticmethod
+    def _search_results(results: SearchResults) -> TokenClassificationSearchResults:
+        """Converts the records search results into token classification search results"""
         if results.metrics:
             results.metrics["words"] = results.metrics["words_cloud"]
             results.metrics["status"] = results.metrics["status_distribution"]
@@ -167,6 +251,7 @@ class TokenClassificationService:
             aggregations=TokenClassificationAggregations.parse_obj(results.metrics)
             if results.metrics
             else None,
+            next_cursor=results.next_cursor,
         )
 
     def read_dataset(
@@ -22,7 +22,7 @@ from rubrix.client.models import (
 )
 from rubrix.client.models import TokenAttributions
 from rubrix.client.sdk.commons.models import BulkResponse
-from rubrix.client.sdk.text_classification.api import bulk, data
+from rubrix.client.sdk.text_classification.api import bulk, data, search_stream
 from rubrix.client.sdk.text_classification.models import (
     CreationTextClassificationRecord,
     TextClassificationBulkData,
@@ -85,3 +85,18 @@ def test_data(mocked_client, limit, expected, bulk_data, sdk_client, monkeypatch
     response = data(sdk_client, name=dataset_name, limit=limit)
     assert isinstance(response.parsed[0], TextClassificationRecord)
     assert len(response.parsed) == expected
+
+
+def test_search_stream(mocked_client, bulk_data, sdk_client, monkeypatch):
+    monkeypatch.setattr(httpx, "post", mocked_client.post)
+
+    dataset_name = "test_dataset"
+    mocked_client.delete(f"/api/datasets/{dataset_name}")
+    mocked_client.post(
+        f"/api/datasets/{dataset_name}/TextClassification:bulk",
+        json=bulk_data.dict(by_alias=True),
+    )
+
+    records = list(search_stream(sdk_client, name=dataset_name, page_size=2))
+    assert all(isinstance(record, TextClassificationRecord) for record in records)
+    assert sorted(record.id for record in records) == [0, 1, 2]
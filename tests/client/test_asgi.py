@@ -13,9 +13,11 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import asyncio
 import time
 from typing import Any, Dict
 
+import pytest
 from fastapi import FastAPI
 from starlette.applications import Starlette
 from starlette.responses import JSONResponse, PlainTextResponse
@@ -24,9 +26,18 @@ from starlette.testclient import TestClient
 import rubrix
 from rubrix import TextClassificationRecord, TokenClassificationRecord
 from rubrix.monitoring.asgi import RubrixLogHTTPMiddleware, token_classification_mapper
+from rubrix.monitoring.log_buffer import MonitorLogBuffer
 
 
-def test_rubrix_middleware_for_text_classification(monkeypatch):
+@pytest.fixture
+def log_buffer(monkeypatch):
+    buffer = MonitorLogBuffer()
+    monkeypatch.setattr(MonitorLogBuffer, "_INSTANCE", buffer)
+    yield buffer
+    buffer.close()
+
+
+def test_rubrix_middleware_for_text_classification(monkeypatch, log_buffer):
 
     expected_endpoint = "/predict"
     expected_dataset_name = "mlmodel_v3_monitor_ds"
@@ -72,15 +83,17 @@ def test_rubrix_middleware_for_text_classification(monkeypatch):
             {"a": "The data input for A", "b": "The data input for B"},
         ],
     )
-
-    assert mock_log.was_called
     time.sleep(0.200)
+    log_buffer.flush()
+    assert mock_log.was_called
+
     mock_log.was_called = False
     mock.get("/another/predict/route")
+    log_buffer.flush()
     assert not mock_log.was_called
 
 
-def test_rubrix_middleware_for_token_classification(monkeypatch):
+def test_rubrix_middleware_for_token_classification(monkeypatch, log_buffer):
 
     expected_endpoint = "/predict"
     expected_dataset_name = "mlmodel_v3_monitor_ds"
@@ -124,6 +137,7 @@ def test_rubrix_middleware_for_token_classification(monkeypatch):
         json=[{"text": "The main text data"}, {"text": "The main text data"}],
     )
     time.sleep(0.2)
+    log_buffer.flush()
     assert mock_log.was_called
 
     mock_log.was_called = False
@@ -131,3 +145,117 @@ def test_rubrix_middleware_for_token_classification(monkeypatch):
 
     time.sleep(0.2)
     assert not mock_log.was_called
+
+
+def asgi_scope(path: str = "/predict", headers=None):
+    return {
+        "type": "http",
+        "method": "POST",
+        "scheme": "http",
+        "server": ("test", 80),
+        "path": path,
+        "query_string": b"",
+        "headers": headers or [(b"content-type", b"application/json")],
+    }
+
+
+def predict_app(response_chunks):
+    async def app(scope, receive, send):
+        message = await receive()
+        assert message["body"] == b'[{"text": "The text"}]'
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        for i, chunk in enumerate(response_chunks):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": i < len(response_chunks) - 1,
+                }
+            )
+
+    return app
+
+
+def test_capture_sampled_requests(monkeypatch, log_buffer):
+    logged = []
+    monkeypatch.setattr(
+        rubrix, "log", lambda records, name, **kwargs: logged.extend(records)
+    )
+    response_chunks = [b'[{"labels": ["A", "B"], ', b'"scores": [0.9, 0.1]}]']
+    middleware = RubrixLogHTTPMiddleware(
+        app=predict_app(response_chunks), api_endpoint="/predict", dataset="ds"
+    )
+
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b'[{"text": "The text"}]'}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(asgi_scope(), receive, send))
+    middleware._executor.shutdown(wait=True)
+    log_buffer.flush()
+
+    assert [message.get("body") for message in sent[1:]] == response_chunks
+    assert len(logged) == 1
+    assert logged[0].inputs == {"text": "The text"}
+    assert logged[0].prediction == [("A", 0.9), ("B", 0.1)]
+    assert logged[0].prediction_agent == "http://test/predict"
+
+
+def test_unsampled_requests_pass_through():
+    received = []
+
+    async def app(scope, receive, send):
+        received.append((receive, send))
+
+    middleware = RubrixLogHTTPMiddleware(
+        app=app,
+        api_endpoint="/predict",
+        dataset="ds",
+        sample_rate=0.5,
+        sampling_key=lambda request: request.headers.get("x-user"),
+    )
+
+    async def receive():
+        pass
+
+    async def send(message):
+        pass
+
+    keys = [f"user-{i}" for i in range(1000)]
+    sampled = [
+        key
+        for key in keys
+        if middleware._is_request_sampled(
+            asgi_scope(headers=[(b"x-user", key.encode())])
+        )
+    ]
+    assert 400 < len(sampled) < 600
+    assert sampled == [
+        key
+        for key in keys
+        if middleware._is_request_sampled(
+            asgi_scope(headers=[(b"x-user", key.encode())])
+        )
+    ]
+
+    unsampled_key = next(key for key in keys if key not in sampled)
+    scopes = [
+        asgi_scope(path="/another/path"),
+        asgi_scope(headers=[(b"x-user", unsampled_key.encode())]),
+        asgi_scope(headers=[(b"x-user", sampled[0].encode())]),
+    ]
+    for scope in scopes:
+        asyncio.run(middleware(scope, receive, send))
+
+    # The last request is sampled, but it is not a JSON request. All pass straight through
+    assert received == [(receive, send)] * 3
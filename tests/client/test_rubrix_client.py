@@ -31,7 +31,9 @@ from rubrix import (
     Text2TextRecord,
     TextClassificationRecord,
 )
+from rubrix.client import rubrix_client
 from rubrix.client.rubrix_client import InputValueError
+from rubrix.client.sdk.commons.models import BulkResponse, Response
 from rubrix.client.sdk.commons.errors import (
     AlreadyExistsApiError,
     ForbiddenApiError,
@@ -112,6 +114,61 @@ def test_log_without_name(mocked_client):
         )
 
 
+def test_log_with_bulk_ingest_mode(mocked_client):
+    dataset = "test_log_with_bulk_ingest_mode"
+    mocked_client.delete(f"/api/datasets/{dataset}")
+
+    records = [
+        TextClassificationRecord(inputs={"text": "This is a test"}, id=idx)
+        for idx in range(25)
+    ]
+    response = rubrix.log(records, name=dataset, chunk_size=10, ingest_mode="bulk")
+    assert response.processed == 25
+    assert len(rubrix.load(dataset)) == 25
+
+    with pytest.raises(InputValueError, match="Ingest mode 'fast' not supported"):
+        rubrix.log(records, name=dataset, ingest_mode="fast")
+
+
+def test_log_with_bulk_ingest_mode_errors(mocked_client, monkeypatch, caplog):
+    sent_chunks = []
+
+    def mock_bulk(client, name, json_body, **kwargs):
+        sent_chunks.append(kwargs)
+        if len(sent_chunks) > 1:
+            raise ValueError("chunk error")
+        return Response(
+            status_code=200,
+            content=b"",
+            headers={},
+            parsed=BulkResponse(dataset=name, processed=len(json_body.records)),
+        )
+
+    def mock_end_bulk_load(client, name):
+        raise ValueError("end error")
+
+    monkeypatch.setattr(rubrix_client, "text_classification_bulk", mock_bulk)
+    monkeypatch.setattr(
+        rubrix_client,
+        "start_bulk_load",
+        lambda client, name: Response(status_code=200, content=b"", headers={}),
+    )
+    monkeypatch.setattr(rubrix_client, "end_bulk_load", mock_end_bulk_load)
+
+    records = [
+        TextClassificationRecord(inputs={"text": "This is a test"}, id=idx)
+        for idx in range(25)
+    ]
+    with pytest.raises(ValueError, match="chunk error"):
+        rubrix.log(records, name="ds", chunk_size=10, ingest_mode="bulk")
+    assert sent_chunks == [{}, {"ingest_mode": "bulk"}]
+    assert "end error" in caplog.text
+
+    sent_chunks.clear()
+    with pytest.raises(ValueError, match="end error"):
+        rubrix.log(records[:5], name="ds", chunk_size=10, ingest_mode="bulk")
+
+
 def test_log_passing_empty_records_list(mocked_client):
 
     with pytest.raises(
@@ -475,3 +532,56 @@ def test_load_sort(mocked_client):
     assert list(df.id) == [1, 2, 11]
     df = rubrix.load(name=dataset, ids=["1str", "2str", "11str"])
     assert list(df.id) == ["11str", "1str", "2str"]
+
+
+def test_iter_records(mocked_client):
+    dataset = "test_iter_records"
+    mocked_client.delete(f"/api/datasets/{dataset}")
+
+    expected_data = 50
+    create_some_data_for_text_classification(mocked_client, dataset, n=expected_data)
+
+    records = rubrix.iter_records(name=dataset)
+    assert not isinstance(records, list)
+    records = list(records)
+    assert all(isinstance(record, TextClassificationRecord) for record in records)
+    assert sorted(record.id for record in records) == list(rubrix.load(name=dataset).id)
+
+    assert len(list(rubrix.iter_records(name=dataset, limit=10))) == 10
+    assert len(list(rubrix.iter_records(name=dataset, ids=[3, 5]))) == 2
+
+    batches = list(rubrix.iter_records(name=dataset, batch_size=20))
+    assert [len(batch) for batch in batches[:-1]] == [20] * (len(batches) - 1)
+    assert sum(map(len, batches)) == len(records)
+
+
+def test_load_arrow(mocked_client):
+    dataset = "test_load_arrow"
+    mocked_client.delete(f"/api/datasets/{dataset}")
+
+    create_some_data_for_text_classification(mocked_client, dataset, n=50)
+
+    df = rubrix.load(name=dataset, format="arrow")
+    assert isinstance(df, pandas.DataFrame)
+    assert sorted(df.id) == list(rubrix.load(name=dataset).id)
+    assert len(rubrix.load(name=dataset, format="arrow", limit=10)) == 10
+
+    ds = rubrix.load(name=dataset, format="arrow", as_pandas=False)
+    assert ds.num_rows == len(df)
+    assert "inputs" in ds.column_names
+
+    with pytest.raises(InputValueError):
+        rubrix.load(name=dataset, format="parquet")
+
+
+def test_get_dataset(mocked_client):
+    dataset = "test_get_dataset"
+    mocked_client.delete(f"/api/datasets/{dataset}")
+
+    record = rubrix.TextClassificationRecord(inputs={"text": "This is a test"})
+    rubrix.log(record, name=dataset)
+    client = rubrix._client_instance()
+    first_update = client.get_dataset(dataset).last_updated
+
+    rubrix.log(record, name=dataset)
+    assert client.get_dataset(dataset).last_updated > first_update
@@ -21,7 +21,7 @@ from rubrix.client.sdk.text_classification.models import (
     CreationTextClassificationRecord,
     TextClassificationBulkData,
 )
-from rubrix.labeling.text_classification import Rule, load_rules
+from rubrix.labeling.text_classification import Rule, apply_rules, load_rules
 from rubrix.labeling.text_classification.rule import RuleNotAppliedError
 from rubrix.server.commons.errors import EntityNotFoundError
 
@@ -95,7 +95,7 @@ def test_apply(monkeypatch, mocked_client, log_dataset):
     monkeypatch.setattr(httpx, "stream", mocked_client.stream)
 
     rule.apply(log_dataset)
-    assert rule._matching_ids == {1: None}
+    assert rule._matching_ids == {"1": None}
 
 
 def test_call(monkeypatch, mocked_client, log_dataset):
@@ -247,3 +247,16 @@ def delete_rule_silently(client, dataset: str, rule: Rule):
         )
     except EntityNotFoundError:
         pass
+
+
+def test_apply_rules(monkeypatch, mocked_client, log_dataset):
+    monkeypatch.setattr(httpx, "post", mocked_client.post)
+
+    rules = [
+        Rule(query="inputs.text:(NOT positive)", label="negative"),
+        Rule(query="inputs.text:positive", label="positive"),
+    ]
+    apply_rules(log_dataset, rules)
+
+    assert rules[0]._matching_ids == {"1": None}
+    assert rules[1]._matching_ids == {"2": None}
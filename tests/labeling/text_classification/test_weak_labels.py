@@ -12,6 +12,10 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import os
+import time
+from datetime import datetime
+from types import SimpleNamespace
 from typing import Callable, List, Optional
 
 import httpx
@@ -20,6 +24,8 @@ import pandas as pd
 import pytest
 
 from rubrix import TextClassificationRecord
+from rubrix.client.sdk.datasets.models import Dataset as DatasetInfo
+from rubrix.client.sdk.datasets.models import TaskType
 from rubrix.client.sdk.text_classification.models import (
     CreationTextClassificationRecord,
     TextClassificationBulkData,
@@ -32,8 +38,11 @@ from rubrix.labeling.text_classification.weak_labels import (
     NoRecordsFoundError,
     NoRulesFoundError,
     WeakLabels,
+    _sparse_weak_label_matrix,
 )
 
+_RUN_BENCHMARKS = os.getenv("RUBRIX_RUN_BENCHMARKS")
+
 
 @pytest.fixture
 def log_dataset(mocked_client) -> str:
@@ -80,10 +89,14 @@ def rules(monkeypatch) -> List[Callable]:
 
     rule2.__name__ = ""
 
-    def mock_apply(self, *args, **kwargs):
-        self._matching_ids = {1: None, 2: None}
+    def mock_apply_rules(dataset, rules):
+        for rule in rules:
+            rule._matching_ids = {"1": None, "2": None}
 
-    monkeypatch.setattr(Rule, "apply", mock_apply)
+    monkeypatch.setattr(
+        "rubrix.labeling.text_classification.weak_labels.apply_rules",
+        mock_apply_rules,
+    )
 
     rubrix_rule = Rule(query="mock", label="positive", name="rubrix_rule")
 
@@ -187,8 +200,8 @@ def test_apply(
 
     weak_labels = WeakLabels(rules=rules, dataset=log_dataset, label2int=label2int)
 
-    # check that all `Rule.apply`s are called
-    assert weak_labels._rules[-1]._matching_ids == {1: None, 2: None}
+    # check that all rules are applied
+    assert weak_labels._rules[-1]._matching_ids == {"1": None, "2": None}
 
     assert weak_labels.label2int == expected_label2int
     assert weak_labels.int2label == {v: k for k, v in expected_label2int.items()}
@@ -326,6 +339,121 @@ def test_summary(monkeypatch, rules):
     pd.testing.assert_frame_equal(summary, expected)
 
 
+def test_sparse(monkeypatch, rules):
+    def mock_load(*args, **kwargs):
+        return [
+            TextClassificationRecord(inputs=text, annotation=annotation, id=idx)
+            for text, annotation, idx in zip(
+                ["negative", "positive", "positive negative", "none", "positive"],
+                ["negative", None, "positive", None, "negative"],
+                range(5),
+            )
+        ]
+
+    monkeypatch.setattr(
+        "rubrix.labeling.text_classification.weak_labels.load", mock_load
+    )
+
+    weak_labels = WeakLabels(rules=rules, dataset="mock")
+    sparse_weak_labels = WeakLabels(rules=rules, dataset="mock", sparse=True)
+
+    assert sparse_weak_labels.label2int == weak_labels.label2int
+    assert (sparse_weak_labels.matrix() == weak_labels.matrix()).all()
+    assert (
+        sparse_weak_labels.matrix(has_annotation=False)
+        == weak_labels.matrix(has_annotation=False)
+    ).all()
+
+    sparse_matrix = sparse_weak_labels.matrix(sparse=True)
+    assert sparse_matrix.nnz == (weak_labels.matrix() != -1).sum()
+    assert (sparse_matrix != weak_labels.matrix(sparse=True)).nnz == 0
+
+    for kwargs in [
+        {},
+        {"normalize_by_coverage": True},
+        {"annotation": np.array([1, -1, 0, 1, -1])},
+    ]:
+        pd.testing.assert_frame_equal(
+            sparse_weak_labels.summary(**kwargs), weak_labels.summary(**kwargs)
+        )
+
+    pd.testing.assert_frame_equal(
+        sparse_weak_labels.show_records(labels=["positive"], rules=["rubrix_rule"]),
+        weak_labels.show_records(labels=["positive"], rules=["rubrix_rule"]),
+    )
+
+    new_mapping = {None: -10, "negative": 0, "positive": 5}
+    weak_labels.change_mapping(new_mapping)
+    sparse_weak_labels.change_mapping(new_mapping)
+    assert (sparse_weak_labels.matrix() == weak_labels.matrix()).all()
+
+
+def test_cache(monkeypatch, rules, tmp_path):
+    dataset_info = DatasetInfo(
+        name="mock", task=TaskType.text_classification, last_updated=datetime.now()
+    )
+    monkeypatch.setattr(
+        "rubrix.labeling.text_classification.cache.client",
+        lambda: SimpleNamespace(get_dataset=lambda name: dataset_info),
+    )
+
+    load_calls, applied_rules = [], []
+
+    def mock_load(*args, **kwargs):
+        load_calls.append(args)
+        return [
+            TextClassificationRecord(
+                inputs=text,
+                id=idx,
+                prediction=[("positive", 0.5)],
+                metadata={"idx": idx},
+                event_timestamp=datetime(2022, 1, 1),
+            )
+            for text, idx in zip(
+                ["negative", "positive", "positive negative"], range(3)
+            )
+        ]
+
+    def mock_apply_rules(dataset, rules):
+        applied_rules.extend(rules)
+        for rule in rules:
+            rule._matching_ids = {"1": None, "2": None}
+
+    monkeypatch.setattr(
+        "rubrix.labeling.text_classification.weak_labels.load", mock_load
+    )
+    monkeypatch.setattr(
+        "rubrix.labeling.text_classification.weak_labels.apply_rules",
+        mock_apply_rules,
+    )
+
+    weak_labels = WeakLabels(rules=rules, dataset="mock", cache_dir=tmp_path)
+    assert len(load_calls) == 1 and applied_rules == [rules[2]]
+    # the string ids returned by the server match the loaded records
+    assert weak_labels.matrix()[:, 2].tolist() == [
+        -1,
+        weak_labels.label2int[rules[2].label],
+        weak_labels.label2int[rules[2].label],
+    ]
+
+    new_rule = Rule(query="mock2", label="negative")
+    cached_weak_labels = WeakLabels(
+        rules=rules + [new_rule], dataset="mock", cache_dir=tmp_path
+    )
+    assert len(load_calls) == 1 and applied_rules == [rules[2], new_rule]
+    assert (cached_weak_labels.matrix()[:, :3] == weak_labels.matrix()).all()
+    # records are cached as data, not pickled
+    assert list(cached_weak_labels.records()) == list(weak_labels.records())
+    assert not list(tmp_path.glob("**/*.pkl"))
+    assert cached_weak_labels.label2int == weak_labels.label2int
+
+    dataset_info.last_updated = datetime.now()
+    WeakLabels(rules=rules, dataset="mock", cache_dir=tmp_path)
+    assert len(load_calls) == 2 and applied_rules == [rules[2], new_rule, rules[2]]
+    assert len(list((tmp_path / "mock").iterdir())) == 1
+    assert len(list(next((tmp_path / "mock").iterdir()).iterdir())) == 1
+
+
 def test_show_records(monkeypatch, rules):
     def mock_load(*args, **kwargs):
         return [TextClassificationRecord(inputs="test", id=i) for i in range(5)]
@@ -439,3 +567,47 @@ def test_norulesfounderror(monkeypatch):
 
     with pytest.raises(NoRulesFoundError, match="No rules were found"):
         WeakLabels("mock")
+
+
+@pytest.mark.skipif(
+    _RUN_BENCHMARKS is None,
+    reason="Set RUBRIX_RUN_BENCHMARKS to run the wall-clock benchmarks",
+)
+@pytest.mark.parametrize("sparse", [False, True])
+def test_summary_scales_linearly(monkeypatch, rules, sparse):
+    """Benchmark: the time per record of the summary must not grow with the number of records"""
+    record = TextClassificationRecord(inputs="test", annotation="negative")
+    n_records = 0
+
+    monkeypatch.setattr(
+        "rubrix.labeling.text_classification.weak_labels.load",
+        lambda *args, **kwargs: [record] * n_records,
+    )
+
+    def mock_apply(self, *args, **kwargs):
+        rng = np.random.default_rng(seed=43)
+        weak_label_matrix = rng.integers(
+            -1, 3, size=(n_records, len(self._rules)), dtype=np.short
+        )
+        annotation_array = rng.integers(-1, 3, size=n_records, dtype=np.short)
+        label2int = {None: -1, "negative": 0, "positive": 1, "neutral": 2}
+        if self._sparse:
+            rows, cols = np.nonzero(weak_label_matrix != -1)
+            weak_label_matrix = _sparse_weak_label_matrix(
+                rows, cols, weak_label_matrix[rows, cols], weak_label_matrix.shape
+            )
+        return weak_label_matrix, annotation_array, label2int
+
+    monkeypatch.setattr(WeakLabels, "_apply_rules", mock_apply)
+
+    seconds_per_record = []
+    for n_records in [100_000, 1_000_000, 10_000_000]:
+        weak_labels = WeakLabels(rules=rules, dataset="mock", sparse=sparse)
+        start = time.perf_counter()
+        weak_labels.summary()
+        seconds_per_record.append((time.perf_counter() - start) / n_records)
+        del weak_labels
+
+    # a super-linear implementation would be ~10 times slower per record at 10M rows,
+    # small sizes are dominated by constant overheads, so only compare the two largest
+    assert seconds_per_record[2] < 3 * seconds_per_record[1]
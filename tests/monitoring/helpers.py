@@ -1,5 +1,10 @@
 from rubrix.monitoring.base import BaseMonitor
+from rubrix.monitoring.log_buffer import MonitorLogBuffer
 
 
 def mock_monitor(monitor: BaseMonitor, monkeypatch):
-    monkeypatch.setattr(monitor, "log_async", monitor._log2rubrix)
+    def log_sync(*args, **kwargs):
+        monitor._log2rubrix(*args, **kwargs)
+        MonitorLogBuffer.get_instance().flush()
+
+    monkeypatch.setattr(monitor, "log_async", log_sync)
@@ -0,0 +1,245 @@
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+import rubrix
+from rubrix import TextClassificationRecord
+from rubrix.monitoring.log_buffer import MonitorLogBuffer
+
+
+@pytest.fixture
+def logged(monkeypatch):
+    calls = []
+
+    def mock_log(records, name: str, tags=None, metadata=None, **kwargs):
+        calls.append((name, tags, len(records)))
+
+    monkeypatch.setattr(rubrix, "log", mock_log)
+    return calls
+
+
+def wait_for(condition, timeout: float = 2.0):
+    start = time.monotonic()
+    while not condition() and time.monotonic() - start < timeout:
+        time.sleep(0.01)
+
+
+def records(n: int):
+    return [TextClassificationRecord(inputs=f"text {i}") for i in range(n)]
+
+
+def test_flush_by_batch_size(logged):
+    buffer = MonitorLogBuffer(max_batch_size=5, max_latency_ms=60000)
+    try:
+        buffer.add(records(2), name="ds")
+        buffer.add(records(2), name="ds")
+        time.sleep(0.1)
+        assert logged == []
+
+        buffer.add(records(1), name="ds")
+        wait_for(lambda: logged)
+        assert logged == [("ds", None, 5)]
+    finally:
+        buffer.close()
+
+
+def test_flush_by_latency(logged):
+    buffer = MonitorLogBuffer(max_batch_size=1000, max_latency_ms=50)
+    try:
+        buffer.add(records(2), name="ds")
+        buffer.add(records(3), name="ds")
+        wait_for(lambda: logged)
+        assert logged == [("ds", None, 5)]
+    finally:
+        buffer.close()
+
+
+def test_group_by_dataset_and_tags(logged):
+    buffer = MonitorLogBuffer(max_batch_size=1000, max_latency_ms=60000)
+    try:
+        buffer.add(records(1), name="ds", tags={"a": "1"})
+        buffer.add(records(2), name="ds", tags={"a": "1"})
+        buffer.add(records(1), name="ds", tags={"a": "2"})
+        buffer.add(records(1), name="other")
+        buffer.flush()
+
+        assert sorted(logged, key=str) == sorted(
+            [("ds", {"a": "1"}, 3), ("ds", {"a": "2"}, 1), ("other", None, 1)],
+            key=str,
+        )
+    finally:
+        buffer.close()
+
+
+def test_close_logs_pending_records(logged):
+    buffer = MonitorLogBuffer(max_batch_size=1000, max_latency_ms=60000)
+    buffer.add(records(3), name="ds")
+    buffer.close()
+    assert logged == [("ds", None, 3)]
+
+    buffer.add(records(1), name="ds")
+    assert logged == [("ds", None, 3), ("ds", None, 1)]
+
+
+def test_submit_calls_in_background(logged):
+    buffer = MonitorLogBuffer(max_batch_size=1000, max_latency_ms=60000)
+    try:
+        for _ in range(3):
+            buffer.submit(buffer.add, records(2), name="ds")
+        buffer.flush()
+
+        assert logged == [("ds", None, 6)]
+        assert buffer.stats() == {
+            "backlog": 0,
+            "pending": 0,
+            "in_flight": 0,
+            "logged": 6,
+            "failed": 0,
+            "dropped_calls": 0,
+            "dropped_records": 0,
+        }
+    finally:
+        buffer.close()
+
+
+@pytest.mark.parametrize(
+    "overflow, expected_calls",
+    [("drop_new", ["blocking", "a", "b"]), ("drop_oldest", ["blocking", "b", "c"])],
+)
+def test_calls_overflow(logged, overflow, expected_calls):
+    buffer = MonitorLogBuffer(max_pending=2, overflow=overflow)
+    running, release = threading.Event(), threading.Event()
+    calls = []
+
+    def blocking_call():
+        calls.append("blocking")
+        running.set()
+        release.wait()
+
+    try:
+        buffer.submit(blocking_call)
+        running.wait()
+        accepted = [buffer.submit(calls.append, call) for call in ["a", "b", "c"]]
+        assert buffer.stats()["backlog"] == 2
+        assert buffer.stats()["dropped_calls"] == 1
+        assert accepted == [True, True, overflow != "drop_new"]
+
+        release.set()
+        buffer.flush()
+        assert calls == expected_calls
+    finally:
+        release.set()
+        buffer.close()
+
+
+@pytest.mark.parametrize(
+    "overflow, expected_texts",
+    [
+        ("drop_new", ["text 0", "text 1", "text 0"]),
+        ("drop_oldest", ["text 1", "text 0", "text 1"]),
+    ],
+)
+def test_records_overflow(monkeypatch, overflow, expected_texts):
+    logged_texts = []
+    monkeypatch.setattr(
+        rubrix,
+        "log",
+        lambda records, **kwargs: logged_texts.extend(
+            r.inputs["text"] for r in records
+        ),
+    )
+    buffer = MonitorLogBuffer(
+        max_batch_size=1000, max_latency_ms=60000, max_pending=3, overflow=overflow
+    )
+    try:
+        buffer.add(records(2), name="ds")
+        buffer.add(records(2), name="ds")
+        assert buffer.stats()["pending"] == 3
+        assert buffer.stats()["dropped_records"] == 1
+
+        buffer.flush()
+        assert logged_texts == expected_texts
+    finally:
+        buffer.close()
+
+
+@pytest.mark.parametrize(
+    "overflow, expected_texts",
+    [
+        ("drop_new", ["text 0", "text 0", "text 1"]),
+        ("drop_oldest", ["text 5", "text 6", "text 7"]),
+    ],
+)
+def test_oversized_add_overflow(monkeypatch, overflow, expected_texts):
+    logged_texts = []
+    monkeypatch.setattr(
+        rubrix,
+        "log",
+        lambda records, **kwargs: logged_texts.extend(
+            r.inputs["text"] for r in records
+        ),
+    )
+    buffer = MonitorLogBuffer(
+        max_batch_size=1000, max_latency_ms=60000, max_pending=3, overflow=overflow
+    )
+    try:
+        buffer.add(records(1), name="ds")
+        buffer.add(records(8), name="ds")
+        assert buffer.stats()["pending"] == 3
+        assert buffer.stats()["dropped_records"] == 6
+
+        buffer.flush()
+        assert logged_texts == expected_texts
+    finally:
+        buffer.close()
+
+
+def test_failed_logs_are_counted(monkeypatch):
+    def failing_log(*args, **kwargs):
+        raise ConnectionError()
+
+    monkeypatch.setattr(rubrix, "log", failing_log)
+    buffer = MonitorLogBuffer(max_batch_size=2, max_latency_ms=60000)
+    try:
+        buffer.add(records(2), name="ds")
+        wait_for(lambda: buffer.stats()["failed"])
+        assert buffer.stats()["failed"] == 2
+        assert buffer.stats()["logged"] == 0
+    finally:
+        buffer.close()
+
+
+def test_log_pending_calls_at_exit():
+    # on the interpreter exit, executors are shut down before the buffer is closed
+    script = textwrap.dedent(
+        """
+        import time
+
+        import rubrix
+        from rubrix import TextClassificationRecord
+        from rubrix.monitoring.log_buffer import MonitorLogBuffer
+
+        def mock_log(records, **kwargs):
+            print(len(records), flush=True)
+
+        def add(buffer, n):
+            time.sleep(0.001)
+            buffer.add([TextClassificationRecord(inputs=f"text {n}")], name="ds")
+
+        rubrix.log = mock_log
+        buffer = MonitorLogBuffer(max_batch_size=5, max_latency_ms=10)
+        for n in range(500):
+            buffer.submit(add, buffer, n)
+        """
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, timeout=60
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "Traceback" not in result.stderr
+    assert sum(map(int, result.stdout.split())) == 500
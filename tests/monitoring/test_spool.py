@@ -0,0 +1,219 @@
+import os
+import time
+
+import pytest
+
+import rubrix
+from rubrix import TextClassificationRecord, TokenClassificationRecord
+from rubrix.client.sdk.commons.errors import BadRequestApiError
+from rubrix.monitoring.log_buffer import MonitorLogBuffer
+from rubrix.monitoring.spool import MonitorSpool
+
+
+class MockLog:
+    def __init__(self, failures: int = 0, error: Exception = ConnectionError()):
+        self.failures = failures
+        self.error = error
+        self.calls = []
+
+    def __call__(self, records, name: str, tags=None, metadata=None, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise self.error
+        self.calls.append((name, tags, records))
+
+
+@pytest.fixture
+def mock_log(monkeypatch):
+    mock = MockLog()
+    monkeypatch.setattr(rubrix, "log", mock)
+    return mock
+
+
+def wait_for(condition, timeout: float = 5.0):
+    start = time.monotonic()
+    while not condition() and time.monotonic() - start < timeout:
+        time.sleep(0.01)
+
+
+def segments(spool: MonitorSpool):
+    return sorted(
+        file_name
+        for file_name in os.listdir(spool.segments_directory)
+        if file_name != MonitorSpool.LOCK_FILE_NAME
+    )
+
+
+def test_ship_spooled_records(tmpdir, mock_log):
+    spool = MonitorSpool(str(tmpdir), min_backoff=0.01)
+    try:
+        spool.write(
+            [TextClassificationRecord(inputs="text", prediction=[("A", 0.9)])],
+            name="ds",
+            tags={"tag": "value"},
+        )
+        spool.write(
+            [
+                TokenClassificationRecord(text="a text", tokens=["a", "text"]),
+                TextClassificationRecord(inputs="other text"),
+            ],
+            name="ds",
+            tags={"tag": "value"},
+        )
+        wait_for(lambda: spool.stats()["shipped_records"] == 3)
+
+        assert spool.stats()["spooled_bytes"] == 0
+        assert segments(spool) == []
+        logged = {type(records[0]): records for _, _, records in mock_log.calls}
+        assert [r.inputs for r in logged[TextClassificationRecord]] == [
+            {"text": "text"},
+            {"text": "other text"},
+        ]
+        assert logged[TextClassificationRecord][0].prediction == [("A", 0.9)]
+        assert logged[TokenClassificationRecord][0].tokens == ["a", "text"]
+        assert all(call[:2] == ("ds", {"tag": "value"}) for call in mock_log.calls)
+    finally:
+        spool.close()
+
+
+def test_retry_failed_shipments(tmpdir, mock_log):
+    mock_log.failures = 2
+    spool = MonitorSpool(str(tmpdir), min_backoff=0.01, max_backoff=0.02)
+    try:
+        spool.write([TextClassificationRecord(inputs="text")], name="ds")
+        wait_for(lambda: spool.stats()["shipped_records"])
+
+        assert spool.stats()["failed_shipments"] == 2
+        assert spool.stats()["shipped_records"] == 1
+        assert len(mock_log.calls) == 1
+    finally:
+        spool.close()
+
+
+def test_skip_truncated_segment_lines(tmpdir, mock_log):
+    mock_log.failures = 10000
+    spool = MonitorSpool(str(tmpdir), min_backoff=10)
+    spool.write([TextClassificationRecord(inputs="text")], name="ds")
+    spool.close()
+    (segment,) = segments(spool)
+    with open(os.path.join(spool.segments_directory, segment), "a") as segment_file:
+        segment_file.write('{"name": "ds", "type": "TextClassificat')
+    # a later, good segment
+    spool = MonitorSpool(str(tmpdir), min_backoff=10)
+    spool.write([TextClassificationRecord(inputs="other text")], name="ds")
+    spool.close()
+
+    mock_log.failures = 0
+    spool = MonitorSpool(str(tmpdir), min_backoff=0.01)
+    try:
+        wait_for(lambda: spool.stats()["shipped_records"] == 2)
+        assert spool.stats()["skipped_lines"] == 1
+        assert spool.stats()["failed_shipments"] == 0
+        assert segments(spool) == []
+    finally:
+        spool.close()
+
+
+@pytest.mark.parametrize(
+    "error, expected_failures",
+    [(BadRequestApiError(detail="bad"), 1), (ConnectionError(), 3)],
+)
+def test_quarantine_failing_segments(tmpdir, mock_log, error, expected_failures):
+    mock_log.failures, mock_log.error = 10000, error
+    spool = MonitorSpool(
+        str(tmpdir), min_backoff=0.01, max_backoff=0.02, max_attempts=3
+    )
+    try:
+        spool.write([TextClassificationRecord(inputs="text")], name="ds")
+        wait_for(lambda: spool.stats()["quarantined_segments"])
+        mock_log.failures = 0
+        spool.write([TextClassificationRecord(inputs="other text")], name="ds")
+        wait_for(lambda: spool.stats()["shipped_records"])
+
+        assert spool.stats()["failed_shipments"] == expected_failures
+        assert [r.inputs for _, _, records in mock_log.calls for r in records] == [
+            {"text": "other text"}
+        ]
+        (segment,) = segments(spool)
+        assert segment.endswith(MonitorSpool.FAILED_SEGMENT_SUFFIX)
+        assert spool.stats()["spooled_bytes"] == os.path.getsize(
+            os.path.join(spool.segments_directory, segment)
+        )
+    finally:
+        spool.close()
+
+
+def test_bounded_disk_usage(tmpdir, mock_log):
+    mock_log.failures = 10000
+    spool = MonitorSpool(
+        str(tmpdir), max_segment_bytes=200, max_total_bytes=1000, min_backoff=10
+    )
+    try:
+        for _ in range(50):
+            spool.write([TextClassificationRecord(inputs="text")], name="ds")
+
+        stats = spool.stats()
+        assert stats["dropped_segments"] > 0
+        assert stats["spooled_bytes"] <= 1000
+        assert stats["spooled_bytes"] == sum(
+            os.path.getsize(os.path.join(spool.segments_directory, file_name))
+            for file_name in segments(spool)
+        )
+    finally:
+        spool.close()
+
+
+def test_records_survive_restarts(tmpdir, mock_log):
+    mock_log.failures = 10000
+    spool = MonitorSpool(str(tmpdir), min_backoff=10)
+    spool.write([TextClassificationRecord(inputs="text")], name="ds")
+    spool.close()
+    assert spool.stats()["spooled_bytes"] > 0
+
+    mock_log.failures = 0
+    spool = MonitorSpool(str(tmpdir), min_backoff=0.01)
+    try:
+        wait_for(lambda: spool.stats()["shipped_records"])
+        assert len(mock_log.calls) == 1
+    finally:
+        spool.close()
+
+
+def test_shared_spool_directory(tmpdir, mock_log):
+    mock_log.failures = 10000
+    spool = MonitorSpool(str(tmpdir), min_backoff=10)
+    other_spool = MonitorSpool(str(tmpdir), min_backoff=0.01)
+    try:
+        assert spool.segments_directory != other_spool.segments_directory
+        spool.write([TextClassificationRecord(inputs="text")], name="ds")
+
+        # the segments of a live spool are not touched by the other one
+        time.sleep(0.1)
+        assert len(segments(spool)) == 1
+        assert segments(other_spool) == []
+
+        # once closed, as if its process died, they are adopted and shipped
+        spool.close()
+        mock_log.failures = 0
+        wait_for(lambda: other_spool.stats()["shipped_records"])
+        assert [r.inputs for _, _, records in mock_log.calls for r in records] == [
+            {"text": "text"}
+        ]
+        assert not os.path.exists(spool.segments_directory)
+    finally:
+        other_spool.close()
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_log_buffer_with_spool(tmpdir, mock_log):
+    spool = MonitorSpool(str(tmpdir), min_backoff=0.01)
+    buffer = MonitorLogBuffer(max_batch_size=1000, max_latency_ms=60000, spool=spool)
+    try:
+        buffer.add([TextClassificationRecord(inputs="text")] * 3, name="ds")
+        buffer.flush()
+        assert buffer.stats()["logged"] == 3
+
+        wait_for(lambda: spool.stats()["shipped_records"])
+        assert [len(records) for _, _, records in mock_log.calls] == [3]
+    finally:
+        buffer.close()
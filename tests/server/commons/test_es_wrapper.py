@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from opensearchpy.serializer import JSONSerializer
+
+from rubrix.server.commons import es_wrapper
+from rubrix.server.commons.es_wrapper import (
+    AsyncElasticsearchWrapper,
+    _bulk_batches,
+    _bulk_failures,
+)
+from rubrix.server.commons.settings import settings
+
+
+def test_bulk_batches_by_size():
+    actions = [
+        {"_index": "index", "_id": i, "_source": {"text": "x" * 100}} for i in range(50)
+    ]
+    batches = list(_bulk_batches(actions, JSONSerializer(), max_bytes=1000))
+
+    assert len(batches) > 1
+    assert sum(map(len, batches)) == len(actions)
+    for batch in batches:
+        assert sum(len(line) + 1 for lines in batch for line in lines) <= 1000
+
+    action, data = batches[0][0]
+    assert action == '{"index":{"_id":0,"_index":"index"}}'
+    assert data == '{"text":"%s"}' % ("x" * 100)
+
+
+def test_bulk_failures():
+    extra_failures = []
+    failures = _bulk_failures(
+        "index",
+        [
+            {
+                "index": {
+                    "_index": "index",
+                    "_id": "1",
+                    "status": 400,
+                    "error": {"type": "mapper_parsing_exception", "reason": "bad"},
+                }
+            },
+            {
+                "update": {
+                    "_index": "other",
+                    "_id": "2",
+                    "status": 404,
+                    "error": {"type": "document_missing_exception", "reason": "nf"},
+                }
+            },
+        ],
+        logger=logging.getLogger(__name__),
+        extra_failures=extra_failures,
+    )
+    assert failures == [
+        {"id": "1", "status": 400, "reason": "mapper_parsing_exception: bad"}
+    ]
+    assert extra_failures == [
+        {
+            "index": "other",
+            "id": "2",
+            "status": 404,
+            "type": "document_missing_exception",
+        }
+    ]
+
+
+def test_async_add_documents_sends_batches_lazily(monkeypatch):
+    counts = {"serialized": 0, "sent": 0, "sending": 0, "max_sending": 0}
+
+    def mock_bulk_batches(actions, serializer):
+        for n in range(10):
+            counts["serialized"] += 1
+            yield [('{"index":{}}', str(n))]
+
+    async def mock_streaming_bulk(client, batch, **kwargs):
+        # batches are not serialized far ahead of the ones being sent
+        assert counts["serialized"] - counts["sent"] <= settings.es_bulk_threads + 1
+        counts["sending"] += 1
+        counts["max_sending"] = max(counts["max_sending"], counts["sending"])
+        await asyncio.sleep(0.01)
+        counts["sending"] -= 1
+        counts["sent"] += 1
+        ((_, doc_id),) = batch
+        yield False, {"index": {"_index": "index", "_id": doc_id, "status": 400}}
+
+    monkeypatch.setattr(es_wrapper, "_bulk_batches", mock_bulk_batches)
+    monkeypatch.setattr(
+        "opensearchpy.helpers.async_streaming_bulk", mock_streaming_bulk
+    )
+    monkeypatch.setattr(
+        AsyncElasticsearchWrapper,
+        "client",
+        SimpleNamespace(transport=SimpleNamespace(serializer=JSONSerializer())),
+    )
+    monkeypatch.setattr(settings, "es_bulk_threads", 2)
+
+    failures = asyncio.run(
+        AsyncElasticsearchWrapper().add_documents(index="index", documents=[])
+    )
+    assert [failure["id"] for failure in failures] == [str(n) for n in range(10)]
+    assert counts["max_sending"] == 2
@@ -1,10 +1,14 @@
 import pytest
 
-from rubrix.server.commons.errors import MissingDatasetRecordsError
+from rubrix.server.commons.errors import MissingDatasetRecordsError, StaleDatasetError
+from rubrix.server.commons.es_settings import DATASETS_INDEX_NAME
 from rubrix.server.commons.es_wrapper import ElasticsearchWrapper, IndexNotFoundError
+from rubrix.server.datasets.ingest_state import DatasetIngestStates
 from rubrix.server.datasets.model import DatasetDB
 from rubrix.server.tasks.commons import TaskType
 from rubrix.server.tasks.commons.dao.dao import DatasetRecordsDAO
+from rubrix.server.tasks.commons.dao.model import RecordSearch
+from rubrix.server.tasks.text_classification.api import TextClassificationRecordDB
 
 
 def test_raise_proper_error():
@@ -13,3 +17,73 @@ def test_raise_proper_error():
         dao.search_records(
             dataset=DatasetDB(name="mock-notfound", task=TaskType.text_classification)
         )
+
+
+def test_search_request_with_search_after():
+    search = RecordSearch(
+        query={"match_all": {}},
+        sort=[{"score": {"order": "desc"}}],
+        aggregations={"status": {"terms": {"field": "status"}}},
+    )
+
+    es_query = DatasetRecordsDAO._search_request(search, 0, None)
+    assert es_query["from"] == 0
+    assert es_query["aggs"] == search.aggregations
+    assert es_query["sort"] == [
+        {"score": {"order": "desc"}},
+        {"_id": {"order": "asc"}},
+    ]
+
+    es_query = DatasetRecordsDAO._search_request(
+        search, 0, None, search_after=[0.5, "some-id"]
+    )
+    assert "from" not in es_query
+    assert es_query["search_after"] == [0.5, "some-id"]
+    assert es_query["aggs"] == {}
+    assert search.sort == [{"score": {"order": "desc"}}]
+
+
+class MockEs:
+    def __init__(self, extra_failures):
+        self.extra_failures = extra_failures
+
+    def delete_index_template(self, index_template):
+        pass
+
+    def add_documents(self, extra_failures, **kwargs):
+        extra_failures.extend(self.extra_failures)
+        return []
+
+
+@pytest.mark.parametrize(
+    ("extra_failures", "stale"),
+    [
+        ([], False),
+        ([{"index": "other", "id": "1", "status": 404, "type": "anything"}], False),
+        (
+            [
+                {
+                    "index": DATASETS_INDEX_NAME,
+                    "id": "owner.mock",
+                    "status": 404,
+                    "type": "document_missing_exception",
+                }
+            ],
+            True,
+        ),
+    ],
+)
+def test_add_records_with_stale_dataset(extra_failures, stale):
+    states = DatasetIngestStates()
+    dataset = DatasetDB(name="mock", owner="owner", task=TaskType.text_classification)
+    states.register(dataset).index_ready = True
+    dao = DatasetRecordsDAO(MockEs(extra_failures), ingest_states=states)
+
+    if not stale:
+        dao.add_records(dataset, records=[], record_class=TextClassificationRecordDB)
+        assert states.get(dataset.id).index_ready
+        return
+
+    with pytest.raises(StaleDatasetError):
+        dao.add_records(dataset, records=[], record_class=TextClassificationRecordDB)
+    assert states.get(dataset.id) is None
@@ -22,3 +22,32 @@ def test_settings_namespace():
     assert (
         settings.dataset_records_index_name == ".rubrix.namespace.dataset.{}.records-v0"
     )
+
+
+def test_settings_es_connection_pool_maxsize(monkeypatch):
+    assert ApiSettings().es_connection_pool_maxsize == 10
+
+    monkeypatch.setenv("RUBRIX_ES_CONNECTION_POOL_MAXSIZE", "50")
+    assert ApiSettings().es_connection_pool_maxsize == 50
+
+    monkeypatch.setenv("RUBRIX_ES_CONNECTION_POOL_MAXSIZE", "0")
+    with pytest.raises(ValidationError):
+        ApiSettings()
+
+
+def test_settings_es_bulk(monkeypatch):
+    settings = ApiSettings()
+    assert settings.es_bulk_max_bytes == 10 * 1024 * 1024
+    assert settings.es_bulk_threads == 4
+    assert settings.es_bulk_max_retries == 3
+
+    monkeypatch.setenv("RUBRIX_ES_BULK_THREADS", "0")
+    with pytest.raises(ValidationError):
+        ApiSettings()
+
+
+def test_settings_record_metrics_parallel_tasks(monkeypatch):
+    assert ApiSettings().record_metrics_parallel_tasks == ["TokenClassification"]
+
+    monkeypatch.setenv("RUBRIX_RECORD_METRICS_PARALLEL_TASKS", "[]")
+    assert ApiSettings().record_metrics_parallel_tasks == []
@@ -14,7 +14,10 @@
 #  limitations under the License.
 
 from rubrix.server.datasets.model import Dataset
-from rubrix.server.tasks.text_classification import TextClassificationBulkData
+from rubrix.server.tasks.text_classification import (
+    TextClassificationBulkData,
+    TextClassificationRecord,
+)
 
 
 def test_delete_dataset(mocked_client):
@@ -137,6 +140,43 @@ def test_open_and_close_dataset(mocked_client):
     )
 
 
+def test_bulk_load_mode(mocked_client):
+    dataset = "test_bulk_load_mode"
+    delete_dataset(mocked_client, dataset)
+    create_mock_dataset(mocked_client, dataset)
+
+    assert (
+        mocked_client.put(
+            f"/api/datasets/{dataset}:start_bulk_load", params={"no_replicas": True}
+        ).status_code
+        == 200
+    )
+    response = mocked_client.post(
+        f"/api/datasets/{dataset}/TextClassification:bulk",
+        params={"ingest_mode": "bulk"},
+        json=TextClassificationBulkData(
+            records=[
+                TextClassificationRecord(id=idx, inputs={"text": "my data"})
+                for idx in range(10)
+            ],
+        ).dict(by_alias=True),
+    )
+    assert response.status_code == 200
+
+    assert (
+        mocked_client.put(
+            f"/api/datasets/{dataset}:end_bulk_load", params={"force_merge": True}
+        ).status_code
+        == 200
+    )
+    response = mocked_client.post(f"/api/datasets/{dataset}/TextClassification:search")
+    assert response.json()["total"] == 10
+
+    assert (
+        mocked_client.put("/api/datasets/not-found:start_bulk_load").status_code == 404
+    )
+
+
 def delete_dataset(client, dataset):
     assert client.delete(f"/api/datasets/{dataset}").status_code == 200
 
@@ -0,0 +1,66 @@
+#  coding=utf-8
+#  Copyright 2021-present, the Recognai S.L. team.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import time
+
+from rubrix.server.datasets.cache import DatasetsCache
+from rubrix.server.datasets.model import DatasetDB
+from rubrix.server.tasks.commons import TaskType
+
+
+def dataset(name: str, owner: str = "owner") -> DatasetDB:
+    return DatasetDB(name=name, owner=owner, task=TaskType.text_classification)
+
+
+def test_get_and_invalidate():
+    cache = DatasetsCache(max_size=10, ttl=60)
+
+    assert cache.get("owner", "mock") is None
+    cache.put("owner", "mock", dataset("mock"))
+    cache.put(None, "mock", dataset("mock"))
+    cache.put("owner", "other", dataset("other"))
+
+    found = cache.get("owner", "mock")
+    assert found == dataset("mock")
+    found.tags["changed"] = "value"
+    assert cache.get("owner", "mock").tags == {}
+
+    cache.invalidate("mock")
+    assert cache.get("owner", "mock") is None
+    assert cache.get(None, "mock") is None
+    assert cache.get("owner", "other") is not None
+
+    assert cache.stats() == {"hits": 3, "misses": 3, "size": 1}
+
+
+def test_max_size_and_ttl():
+    cache = DatasetsCache(max_size=2, ttl=0.1)
+    for name in ["a", "b"]:
+        cache.put("owner", name, dataset(name))
+    cache.get("owner", "a")
+    cache.put("owner", "c", dataset("c"))
+
+    assert cache.get("owner", "b") is None
+    assert cache.get("owner", "a") is not None
+    assert cache.get("owner", "c") is not None
+
+    time.sleep(0.1)
+    assert cache.get("owner", "a") is None
+    assert cache.stats()["size"] == 1
+
+
+def test_disabled_cache():
+    cache = DatasetsCache(ttl=0)
+    cache.put("owner", "mock", dataset("mock"))
+    assert cache.get("owner", "mock") is None
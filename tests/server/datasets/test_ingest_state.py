@@ -0,0 +1,68 @@
+#  coding=utf-8
+#  Copyright 2021-present, the Recognai S.L. team.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+import time
+
+from rubrix.server.datasets.ingest_state import DatasetIngestStates
+from rubrix.server.datasets.model import DatasetDB
+from rubrix.server.tasks.commons import TaskType
+
+
+def test_register_and_invalidate():
+    states = DatasetIngestStates()
+    dataset = DatasetDB(name="mock", owner="owner", task=TaskType.text_classification)
+
+    assert states.get(dataset.id) is None
+    state = states.register(dataset)
+    assert states.get("owner.mock") is state
+    assert not state.index_ready and state.multi_label is None
+
+    state.index_ready = True
+    state.metadata_fields.add("field")
+    state.multi_label = False
+
+    updated = dataset.copy(update={"tags": {"new": "tag"}})
+    state = states.register(updated)
+    assert state.dataset is updated
+    assert state.index_ready and state.metadata_fields == {"field"}
+    assert state.multi_label is False
+
+    state = states.register(
+        dataset.copy(update={"task": TaskType.token_classification})
+    )
+    assert not state.index_ready and state.multi_label is None
+
+    states.invalidate(dataset.id)
+    assert states.get(dataset.id) is None
+
+
+def test_expired_states(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    states = DatasetIngestStates(ttl=10)
+    dataset = DatasetDB(name="mock", owner="owner", task=TaskType.text_classification)
+
+    state = states.register(dataset)
+    state.index_ready = True
+    now += 5
+    assert states.get(dataset.id) is state
+    assert states.register(dataset).index_ready
+
+    now += 5
+    assert states.get(dataset.id) is None
+    assert not states.register(dataset).index_ready
+
+    states = DatasetIngestStates(ttl=0)
+    states.register(dataset)
+    assert states.get(dataset.id) is None
@@ -42,3 +42,5 @@ def test_api_status(mocked_client):
 
     # Checking that the first key into mem_info dictionary has a nont-none value
     assert "rss" in info.mem_info is not None
+
+    assert set(info.datasets_cache) == {"hits", "misses", "size"}
@@ -1,6 +1,9 @@
+import base64
+
 import pytest
 
 import rubrix
+from rubrix.server.commons.errors import WrongInputParamError
 from rubrix.server.commons.es_wrapper import ElasticsearchWrapper
 from rubrix.server.datasets.model import Dataset
 from rubrix.server.tasks.commons import TaskType
@@ -63,6 +66,92 @@ def test_failing_metrics(service, mocked_client):
 
     assert results.dict() == {
         "metrics": {"missing-metric": {}},
+        "next_cursor": None,
         "records": [],
         "total": 1,
     }
+
+
+def test_metrics_in_single_request(service, dao, mocked_client, monkeypatch):
+    dataset = Dataset(
+        name="test_metrics_in_single_request", task=TaskType.text_classification
+    )
+
+    rubrix.delete(dataset.name)
+    rubrix.log(
+        rubrix.TextClassificationRecord(
+            inputs="This is a text, yeah!",
+            annotation="A",
+            metadata={"field": "value"},
+        ),
+        name=dataset.name,
+    )
+
+    search_records = dao.search_records
+    calls = []
+
+    def counted_search_records(*args, **kwargs):
+        calls.append(kwargs.get("size"))
+        return search_records(*args, **kwargs)
+
+    monkeypatch.setattr(dao, "search_records", counted_search_records)
+    metrics = ["words_cloud", "annotated_as", "status_distribution", "metadata"]
+    results = service.search(
+        dataset=dataset,
+        query=TextClassificationQuery(),
+        sort_config=SortConfig(),
+        metrics=metrics,
+        size=0,
+        record_type=TextClassificationRecord,
+    )
+
+    assert calls == [0, 0]  # One for records, one for all metrics
+    assert set(results.metrics) == set(metrics)
+    assert results.metrics["annotated_as"] == {"A": 1}
+    assert "field" in results.metrics["metadata"]
+
+
+def test_search_with_cursor(service, mocked_client):
+    dataset = Dataset(name="test_search_with_cursor", task=TaskType.text_classification)
+
+    rubrix.delete(dataset.name)
+    rubrix.log(
+        [rubrix.TextClassificationRecord(id=i, inputs=f"text {i}") for i in range(5)],
+        name=dataset.name,
+    )
+
+    ids, cursor = [], None
+    while True:
+        results = service.search(
+            dataset=dataset,
+            query=TextClassificationQuery(),
+            sort_config=SortConfig(),
+            size=2,
+            cursor=cursor,
+            record_type=TextClassificationRecord,
+        )
+        ids.extend(record.id for record in results.records)
+        cursor = results.next_cursor
+        if not cursor:
+            break
+
+    assert sorted(ids) == list(range(5))
+    assert len(ids) == len(set(ids))
+
+
+def test_search_cursor_encoding():
+    search_after = [1.5, "2021-01-01", "record-id"]
+    cursor = SearchRecordsService._encode_cursor(search_after)
+
+    assert SearchRecordsService._decode_cursor(cursor) == search_after
+    assert SearchRecordsService._encode_cursor(None) is None
+    assert SearchRecordsService._decode_cursor(None) is None
+
+    wrong_cursors = [
+        "not-a-cursor",
+        base64.urlsafe_b64encode(b"[]").decode(),
+        base64.urlsafe_b64encode(b"{}").decode(),
+    ]
+    for wrong_cursor in wrong_cursors:
+        with pytest.raises(WrongInputParamError):
+            SearchRecordsService._decode_cursor(wrong_cursor)
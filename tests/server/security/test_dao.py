@@ -1,5 +1,8 @@
+import time
+
 import pytest
 
+from rubrix.server.security.auth_provider.local.users.dao import UsersDAO
 from rubrix.server.security.auth_provider.local.users.service import create_users_dao
 
 usersDAO = create_users_dao()
@@ -16,3 +19,26 @@ def test_get_user():
 async def test_get_user_by_api_key():
     user = await usersDAO.get_user_by_api_key(api_key="rubrix.apikey")
     assert user.username == "rubrix"
+
+
+@pytest.mark.asyncio
+async def test_reload_users_file(tmp_path):
+    users_file = tmp_path / "users.yml"
+    users_file.write_text(
+        "- username: user\n  hashed_password: hash\n  api_key: user.apikey\n"
+    )
+    dao = UsersDAO(str(users_file), reload_interval=0.01)
+    assert (await dao.get_user_by_api_key("user.apikey")).username == "user"
+    assert await dao.get_user_by_api_key("other.apikey") is None
+
+    users_file.write_text(
+        "- username: other\n  hashed_password: hash\n  api_key: other.apikey\n"
+    )
+    time.sleep(0.02)
+    assert dao.get_user("user") is None
+    assert (await dao.get_user_by_api_key("other.apikey")).username == "other"
+
+    # A wrong users file keeps the loaded users
+    users_file.write_text("- username: wrong\n")
+    time.sleep(0.02)
+    assert dao.get_user("other").username == "other"
@@ -1,3 +1,6 @@
+import time
+from datetime import timedelta
+
 import pytest
 from fastapi.security import SecurityScopes
 
@@ -34,3 +37,17 @@ def test_fetch_token_user():
     user = localAuth.fetch_token_user(token=access_token)
     assert user.username == "rubrix"
 
+
+def test_fetch_token_user_with_cached_claims():
+    access_token = localAuth._create_access_token(username="rubrix")
+    assert localAuth.fetch_token_user(token=access_token).username == "rubrix"
+    assert localAuth._decode_token(access_token) is localAuth._decode_token(
+        access_token
+    )
+
+    expired_token = localAuth._create_access_token(
+        username="rubrix", expires_delta=timedelta(seconds=1)
+    )
+    assert localAuth.fetch_token_user(token=expired_token).username == "rubrix"
+    time.sleep(1.1)
+    assert localAuth.fetch_token_user(token=expired_token) is None
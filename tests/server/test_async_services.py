@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from rubrix.server.datasets.model import Dataset
+from rubrix.server.tasks.commons import TaskType
+from rubrix.server.tasks.commons.dao.model import RecordSearchResults
+from rubrix.server.tasks.commons.metrics.service import MetricsService
+from rubrix.server.tasks.search.model import SearchResults
+from rubrix.server.tasks.text2text import Text2TextQuery
+from rubrix.server.tasks.text2text.service.service import Text2TextService
+from rubrix.server.tasks.text_classification.service.labeling_service import (
+    LabelingService,
+)
+from rubrix.server.tasks.text_classification.service.service import (
+    TextClassificationService,
+)
+from rubrix.server.tasks.token_classification import TokenClassificationQuery
+from rubrix.server.tasks.token_classification.service.service import (
+    TokenClassificationService,
+)
+
+
+class MockStorage:
+    failures = [{"id": "1", "status": 400, "reason": "bad"}]
+
+    def store_records(self, **kwargs):
+        return self.failures
+
+    async def async_store_records(self, **kwargs):
+        return self.failures
+
+
+class MockSearch:
+    def __init__(self):
+        self.calls = []
+
+    def search(self, dataset, **kwargs):
+        self.calls.append(kwargs)
+        return SearchResults(total=0, records=[])
+
+    async def async_search(self, dataset, **kwargs):
+        return self.search(dataset, **kwargs)
+
+
+class MockRecordsDAO:
+    def search_records(self, dataset, **kwargs):
+        return RecordSearchResults(
+            total=2,
+            records=[],
+            aggregations={
+                "status_distribution": {"Default": 2},
+                "labeling_rule": {
+                    "covered_records": 1,
+                    "annotated_covered_records": 1,
+                    "correct_records": 1,
+                    "incorrect_records": 0,
+                },
+            },
+        )
+
+
+class MockAsyncRecordsDAO:
+    async def search_records(self, dataset, **kwargs):
+        return MockRecordsDAO().search_records(dataset, **kwargs)
+
+
+@pytest.mark.parametrize(
+    ("service_class", "query", "task"),
+    [
+        (
+            TokenClassificationService,
+            TokenClassificationQuery(),
+            TaskType.token_classification,
+        ),
+        (Text2TextService, Text2TextQuery(), TaskType.text2text),
+    ],
+)
+def test_async_service_methods(service_class, query, task):
+    search = MockSearch()
+    service = service_class(MockStorage(), search)
+    dataset = Dataset(name="ds", task=task)
+    search_params = dict(query=query, sort_by=[], size=10, cursor=None)
+
+    assert asyncio.run(
+        service.async_add_records(dataset, records=[], refresh=False)
+    ) == service.add_records(dataset, records=[], refresh=False)
+    assert asyncio.run(
+        service.async_search(dataset, **search_params)
+    ) == service.search(dataset, **search_params)
+    assert search.calls[0] == search.calls[1]
+
+
+def test_async_summarize_metric():
+    service = MetricsService(
+        MockRecordsDAO(), query_builder=None, async_dao=MockAsyncRecordsDAO()
+    )
+    dataset = Dataset(name="ds", task=TaskType.text_classification)
+
+    assert asyncio.run(
+        service.async_summarize_metric(dataset, "status_distribution", query=None)
+    ) == service.summarize_metric(dataset, "status_distribution", query=None)
+
+
+def test_async_compute_rule_metrics():
+    labeling = LabelingService(
+        dao=None, records=MockRecordsDAO(), async_records=MockAsyncRecordsDAO()
+    )
+    service = TextClassificationService(
+        storage=MockStorage(), search=MockSearch(), labeling=labeling
+    )
+    dataset = Dataset(name="ds", task=TaskType.text_classification)
+
+    assert asyncio.run(
+        service.async_compute_rule_metrics(dataset, rule_query="a", label="A")
+    ) == service.compute_rule_metrics(dataset, rule_query="a", label="A")
@@ -0,0 +1,143 @@
+import json
+import os
+import time
+
+import pytest
+
+from rubrix.server.commons.api import json_loads
+from rubrix.server.tasks.commons.dao.dao import DatasetRecordsDAO
+from rubrix.server.tasks.text_classification.api.model import (
+    TextClassificationBulkData,
+    TextClassificationRecordDB,
+)
+from rubrix.server.tasks.token_classification.api.model import (
+    TokenClassificationBulkData,
+    TokenClassificationRecordDB,
+)
+
+_RUN_BENCHMARKS = os.getenv("RUBRIX_RUN_BENCHMARKS")
+
+TEXT = "This is a sentence long enough to look like a real record of the dataset"
+
+
+def text_classification_record(idx: int):
+    return {
+        "id": idx,
+        "inputs": {"text": TEXT},
+        "prediction": {
+            "agent": "test",
+            "labels": [{"class": "A", "score": 0.7}, {"class": "B", "score": 0.3}],
+        },
+        "annotation": {"agent": "test", "labels": [{"class": "A"}]},
+        "metadata": {"field": {"one": idx, "two": "value"}},
+    }
+
+
+def token_classification_record(idx: int):
+    return {
+        "id": idx,
+        "text": TEXT,
+        "tokens": TEXT.split(),
+        "prediction": {
+            "agent": "test",
+            "entities": [{"start": 0, "end": 4, "label": "A", "score": 0.5}],
+        },
+        "metadata": {"field": {"one": idx, "two": "value"}},
+    }
+
+
+def validated_decoding(body: bytes, bulk_class, record_class):
+    bulk = bulk_class.parse_obj(json.loads(body))
+    bulk.dict()
+    return [record_class.parse_obj(r).dict(exclude_none=False) for r in bulk.records]
+
+
+def fast_path_decoding(body: bytes, bulk_class, record_class):
+    bulk = bulk_class.parse_obj(json_loads(body))
+    bulk.dict(exclude={"records"})
+    documents, _ = DatasetRecordsDAO._records2documents(bulk.records, record_class)
+    return documents
+
+
+@pytest.mark.parametrize(
+    ("bulk_class", "record_class", "record"),
+    [
+        (
+            TextClassificationBulkData,
+            TextClassificationRecordDB,
+            text_classification_record,
+        ),
+        (
+            TokenClassificationBulkData,
+            TokenClassificationRecordDB,
+            token_classification_record,
+        ),
+    ],
+)
+def test_bulk_decoding_fast_path(bulk_class, record_class, record):
+    """The fast path produces the same documents as validating each record again"""
+    n_records = 100
+    body = json.dumps(
+        {"tags": {"env": "test"}, "records": [record(i) for i in range(n_records)]}
+    ).encode("utf-8")
+
+    for document, expected in zip(
+        fast_path_decoding(body, bulk_class, record_class),
+        validated_decoding(body, bulk_class, record_class),
+    ):
+        document.pop("last_updated")
+        expected.pop("last_updated")
+        assert document == expected
+
+
+def test_constructed_token_record_offsets():
+    record = TokenClassificationBulkData.parse_obj(
+        {"records": [token_classification_record(0)]}
+    ).records[0]
+    db_record = TokenClassificationRecordDB.construct(
+        _fields_set=record.__fields_set__, **record.__dict__
+    )
+
+    assert db_record.char_id2token_id(5) == 1
+    assert db_record.token_span(1) == record.token_span(1)
+
+
+@pytest.mark.skipif(
+    _RUN_BENCHMARKS is None,
+    reason="Set RUBRIX_RUN_BENCHMARKS to run the wall-clock benchmarks",
+)
+@pytest.mark.parametrize(
+    ("bulk_class", "record_class", "record"),
+    [
+        (
+            TextClassificationBulkData,
+            TextClassificationRecordDB,
+            text_classification_record,
+        ),
+        (
+            TokenClassificationBulkData,
+            TokenClassificationRecordDB,
+            token_classification_record,
+        ),
+    ],
+)
+def test_bulk_decoding_cpu_cost(bulk_class, record_class, record):
+    """Benchmark: the per-record cpu cost of the bulk decoding, before and after the fast path"""
+    n_records = 1000
+    body = json.dumps(
+        {"tags": {"env": "test"}, "records": [record(i) for i in range(n_records)]}
+    ).encode("utf-8")
+
+    def cpu_cost_per_record(decode) -> float:
+        start = time.process_time()
+        documents = decode(body, bulk_class, record_class)
+        assert len(documents) == n_records
+        return (time.process_time() - start) / n_records
+
+    # warm up
+    validated_decoding(body, bulk_class, record_class)
+    fast_path_decoding(body, bulk_class, record_class)
+    cost_before = min(cpu_cost_per_record(validated_decoding) for _ in range(3))
+    cost_after = min(cpu_cost_per_record(fast_path_decoding) for _ in range(3))
+
+    assert cost_after < cost_before
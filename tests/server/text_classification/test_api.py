@@ -178,6 +178,50 @@ def test_create_records_for_text_classification(mocked_client):
     }
 
 
+def test_bulk_ingest_state(mocked_client):
+    dataset = "test_bulk_ingest_state"
+    assert mocked_client.delete(f"/api/datasets/{dataset}").status_code == 200
+
+    def bulk(record_id: int, multi_label: bool = False, **kwargs):
+        return mocked_client.post(
+            f"/api/datasets/{dataset}/TextClassification:bulk",
+            json=TextClassificationBulkData(
+                records=[
+                    TextClassificationRecord(
+                        id=record_id,
+                        inputs={"data": "my data"},
+                        multi_label=multi_label,
+                    )
+                ],
+                **kwargs,
+            ).dict(by_alias=True),
+        )
+
+    def last_updated() -> datetime:
+        response = mocked_client.get(f"/api/datasets/{dataset}")
+        return Dataset.parse_obj(response.json()).last_updated
+
+    assert bulk(0, tags={"env": "test"}).status_code == 200
+    first_update = last_updated()
+
+    # steady state bulks still refresh the dataset last update
+    assert bulk(1, tags={"env": "test"}).status_code == 200
+    assert last_updated() > first_update
+    assert bulk(2, multi_label=True).status_code == 400
+
+    assert bulk(3, tags={"new": "tag"}).status_code == 200
+    response = mocked_client.get(f"/api/datasets/{dataset}")
+    assert Dataset.parse_obj(response.json()).tags == {"env": "test", "new": "tag"}
+
+    # deleting the dataset invalidates its ingest state
+    assert mocked_client.delete(f"/api/datasets/{dataset}").status_code == 200
+    assert bulk(4, multi_label=True, tags={"env": "test"}).status_code == 200
+    response = mocked_client.post(
+        f"/api/datasets/{dataset}/TextClassification:search", json={}
+    )
+    assert TextClassificationSearchResults.parse_obj(response.json()).total == 1
+
+
 def test_partial_record_update(mocked_client):
     name = "test_partial_record_update"
     assert mocked_client.delete(f"/api/datasets/{name}").status_code == 200
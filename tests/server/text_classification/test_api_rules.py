@@ -385,3 +385,18 @@ def test_search_records_with_uncovered_rules(mocked_client):
         json={"query": {"uncovered_by_rules": ["texto"]}},
     )
     assert len(response.json()["records"]) == 0
+
+
+def test_rules_matching_ids(mocked_client):
+    dataset = "test_rules_matching_ids"
+    log_some_records(mocked_client, dataset)
+
+    queries = ["ejemplo", "texto AND ejemplo", "missing"]
+    response = mocked_client.post(
+        f"/api/datasets/TextClassification/{dataset}/labeling/rules/matching_ids",
+        json={"queries": queries},
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "ids": {"ejemplo": ["0"], "texto AND ejemplo": ["0"], "missing": []}
+    }
@@ -203,3 +203,37 @@ def test_custom_tokens_splitting():
             ],
         ),
     )
+
+
+def test_tokens_offsets_index():
+    text = "A  long,text with   spaces. "
+    record = TokenClassificationRecord(
+        text=text, tokens=["A", "long", ",", "text", "with", "spaces", "."]
+    )
+
+    assert [record.token_span(idx) for idx in range(len(record.tokens))] == [
+        (0, 0),
+        (3, 6),
+        (7, 7),
+        (8, 11),
+        (13, 16),
+        (20, 25),
+        (26, 26),
+    ]
+    assert [record.char_id2token_id(idx) for idx in range(len(text))] == [
+        0,
+        *[None] * 2,
+        *[1] * 4,
+        2,
+        *[3] * 4,
+        None,
+        *[4] * 4,
+        *[None] * 3,
+        *[5] * 6,
+        6,
+        None,
+    ]
+    assert record.char_id2token_id(len(text)) is None
+
+    with pytest.raises(IndexError):
+        record.token_span(len(record.tokens))
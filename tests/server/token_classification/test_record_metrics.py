@@ -0,0 +1,97 @@
+import asyncio
+import threading
+
+import pytest
+
+from rubrix.server.commons.settings import settings
+from rubrix.server.tasks.commons import TaskType
+from rubrix.server.tasks.storage.record_metrics import RecordMetricsExecutor
+from rubrix.server.tasks.token_classification.api.model import (
+    CreationTokenClassificationRecord,
+)
+from rubrix.server.tasks.token_classification.metrics import TokenClassificationMetrics
+
+
+@pytest.fixture
+def records():
+    return [
+        CreationTokenClassificationRecord(
+            id=idx,
+            text="This is a text for Rubrix",
+            tokens=["This", "is", "a", "text", "for", "Rubrix"],
+            prediction={
+                "agent": "test",
+                "entities": [{"start": 19, "end": 25, "label": "ORG"}],
+            },
+        )
+        for idx in range(10)
+    ]
+
+
+@pytest.fixture
+def executor():
+    executor = RecordMetricsExecutor(
+        workers=2, parallel_tasks=[TaskType.token_classification], min_records=5
+    )
+    yield executor
+    executor.close()
+
+
+def test_compute_metrics_in_parallel(executor, records):
+    expected = [TokenClassificationMetrics.record_metrics(r) for r in records]
+
+    executor.compute(TaskType.token_classification, TokenClassificationMetrics, records)
+    assert executor._pool is not None
+    assert [r.metrics for r in records] == expected
+
+    for record in records:
+        record.metrics = {}
+    asyncio.run(
+        executor.async_compute(
+            TaskType.token_classification, TokenClassificationMetrics, records
+        )
+    )
+    assert [r.metrics for r in records] == expected
+
+
+def test_compute_small_bulks_in_thread(executor, records):
+    executor.compute(
+        TaskType.token_classification, TokenClassificationMetrics, records[:4]
+    )
+    assert executor._pool is None
+    assert all(r.metrics for r in records[:4])
+
+    executor.compute(TaskType.text2text, TokenClassificationMetrics, records)
+    assert executor._pool is None
+
+
+def test_async_compute_small_bulks_off_the_event_loop(executor, records):
+    class ThreadMetrics:
+        @staticmethod
+        def record_metrics(record):
+            return {"thread": threading.get_ident()}
+
+    asyncio.run(
+        executor.async_compute(
+            TaskType.token_classification, ThreadMetrics, records[:4]
+        )
+    )
+    assert executor._pool is None
+    assert all(r.metrics["thread"] != threading.get_ident() for r in records[:4])
+
+
+def test_compact_tokens_metrics(monkeypatch, records):
+    record = records[0]
+    metrics = TokenClassificationMetrics.record_metrics(record)
+
+    monkeypatch.setattr(settings, "compact_token_metrics", True)
+    compact_metrics = TokenClassificationMetrics.record_metrics(record)
+
+    tokens = metrics.pop("tokens")
+    compact_tokens = compact_metrics.pop("compact_tokens")
+    assert compact_metrics == metrics
+    assert compact_tokens == {
+        field: [getattr(token, field) for token in tokens]
+        for field in ["value", "char_start", "char_end", "length", "capitalness", "tag"]
+    }
+    assert compact_tokens["tag"] == ["O", "O", "O", "O", "O", "B-ORG"]
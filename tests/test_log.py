@@ -157,6 +157,71 @@ def test_text_classification(mock_response_text, mocked_client):
     )
 
 
+def test_text_classification_with_threads(monkeypatch, mock_response_200):
+    """Testing the pipelined log mode aggregates the responses of all chunks"""
+
+    http_clients = set()
+
+    def mock_bulk(*args, json_body, http_client=None, **kwargs):
+        http_clients.add(http_client)
+        return Response(
+            status_code=200,
+            content=b"",
+            headers={},
+            parsed=BulkResponse(
+                dataset="test", processed=len(json_body.records), failed=0
+            ),
+        )
+
+    monkeypatch.setattr(
+        "rubrix.client.rubrix_client.text_classification_bulk", mock_bulk
+    )
+
+    records = [
+        TextClassificationRecord(inputs={"text": f"test {i}"}, id=i)
+        for i in range(105)
+    ]
+
+    assert rubrix.log(
+        name="test", records=records, chunk_size=10, num_threads=3
+    ) == BulkResponse(dataset="test", processed=105, failed=0)
+    assert len(http_clients) == 1
+    assert isinstance(http_clients.pop(), httpx.Client)
+
+
+def test_log_records_generator(monkeypatch, mock_response_200):
+    """Testing records are consumed lazily, chunk by chunk"""
+
+    consumed = 0
+    consumed_on_bulk = []
+
+    def records_generator():
+        nonlocal consumed
+        for i in range(25):
+            consumed += 1
+            yield TextClassificationRecord(inputs={"text": f"test {i}"}, id=i)
+
+    def mock_bulk(*args, json_body, **kwargs):
+        consumed_on_bulk.append(consumed)
+        return Response(
+            status_code=200,
+            content=b"",
+            headers={},
+            parsed=BulkResponse(
+                dataset="test", processed=len(json_body.records), failed=0
+            ),
+        )
+
+    monkeypatch.setattr(
+        "rubrix.client.rubrix_client.text_classification_bulk", mock_bulk
+    )
+
+    assert rubrix.log(
+        name="test", records=records_generator(), chunk_size=10, total=25
+    ) == BulkResponse(dataset="test", processed=25, failed=0)
+    assert consumed_on_bulk == [10, 20, 25]
+
+
 def test_token_classification(mock_response_token):
     """Testing token classification with log function
 